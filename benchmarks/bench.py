@@ -0,0 +1,335 @@
+"""
+Performance benchmarks for the simulation framework.
+
+Usage:
+    python -m benchmarks.bench run [-o results.json] [--quick] [--filter world]
+    python -m benchmarks.bench compare baseline.json results.json [--threshold 0.2]
+
+`run` writes one JSON document with environment metadata and the timings of
+every benchmark; `compare` exits non-zero when a benchmark got slower than
+the baseline by more than the threshold.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+@dataclass
+class Benchmark:
+    """
+    One timed operation. `setup` runs untimed before every repeat and its
+    return value is passed to `run`; `items` is the amount of work per run
+    (points, samples, steps) used to report a rate. `warmup` adds one
+    untimed run first (lazy imports, first-call allocations).
+    """
+    name: str
+    group: str
+    run: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    items: int = 1
+    unit: str = "op"
+    params: Dict[str, Any] = field(default_factory=dict)
+    warmup: bool = False
+
+def _world(size: float, seed: int = 42, **kwargs):
+    from src.world.environment import World, MapConfig
+    return World(MapConfig(width=size, height=size, resolution=10.0, seed=seed, **kwargs))
+
+def _fixture(build: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Builds a shared fixture on first use only. Suites hand these to their
+    benchmarks' setup, so benchmarks excluded by --filter build nothing.
+    """
+    return functools.lru_cache(maxsize=None)(build)
+
+def world_benchmarks(quick: bool) -> List[Benchmark]:
+    sizes = [1000.0, 5000.0] if quick else [1000.0, 5000.0, 20000.0]
+    benchmarks = []
+    for generator in ("gaussian", "spectral"):
+        for size in sizes:
+            benchmarks.append(Benchmark(
+                f"world_construction[{generator},{size:g}m]", "world",
+                run=lambda _, size=size, generator=generator: _world(size, generator=generator),
+                items=int(size / 10.0) ** 2, unit="px",
+                params={"size_m": size, "resolution": 10.0, "generator": generator}, warmup=True))
+    return benchmarks
+
+def lookup_benchmarks(quick: bool) -> List[Benchmark]:
+    n_scalar = 2000 if quick else 20000
+    n_batch = 100000 if quick else 1000000
+
+    def build():
+        world = _world(5000.0)
+        world.get_magnetic_field_batch(np.zeros(1), np.zeros(1), np.full(1, 100.0)) # Warm the layer
+        xs, ys = np.random.default_rng(0).uniform(0.0, 5000.0, (2, n_batch))
+        return world, xs, ys, np.full(n_batch, 100.0)
+
+    fixture = _fixture(build)
+
+    def scalar(state):
+        world, xs, ys, _ = state
+        for i in range(n_scalar):
+            world.get_magnetic_field(xs[i], ys[i], 100.0)
+
+    def batch(state):
+        world, xs, ys, zs = state
+        return world.get_magnetic_field_batch(xs, ys, zs)
+
+    return [
+        Benchmark("lookup_scalar", "lookup", setup=fixture, run=scalar, items=n_scalar, unit="point",
+                  params={"points": n_scalar}),
+        Benchmark("lookup_batch", "lookup", setup=fixture, run=batch, items=n_batch, unit="point",
+                  params={"points": n_batch}),
+    ]
+
+def layer_benchmarks(quick: bool) -> List[Benchmark]:
+    size = 5000.0
+    benchmarks = []
+
+    # Spectral: "cold" includes the forward FFT of the ground map (first layer
+    # of a world), "warm" reuses the spectrum (every further altitude)
+    spectral = _fixture(lambda: _world(size, continuation="spectral"))
+
+    def cold():
+        world = spectral()
+        world.clear_layers(keep_spectrum=False)
+        return world
+
+    def warm():
+        world = spectral()
+        world.layer(300.0) # Builds the spectrum if a cold run dropped it
+        world.clear_layers()
+        return world
+
+    gaussian = _fixture(lambda: _world(size, continuation="gaussian"))
+
+    def gaussian_setup():
+        world = gaussian()
+        world.clear_layers()
+        return world
+
+    for name, setup, method in (("spectral,cold", cold, "spectral"), ("spectral,warm", warm, "spectral"),
+                                ("gaussian", gaussian_setup, "gaussian")):
+        benchmarks.append(Benchmark(
+            f"layer_creation[{name}]", "continuation", setup=setup,
+            run=lambda w: w.layer(300.0), items=int(size / 10.0) ** 2, unit="px",
+            params={"size_m": size, "altitude": 300.0, "method": method}))
+    return benchmarks
+
+def reconstruction_benchmarks(quick: bool) -> List[Benchmark]:
+    from src.world.reconstruction import MapReconstructor
+
+    counts = [1000, 10000, 100000] if quick else [1000, 10000, 100000, 1000000]
+    benchmarks = []
+    for seed, n in enumerate(counts):
+        def build(n=n, seed=seed):
+            x, y = np.random.default_rng(seed).uniform(0.0, 5000.0, (2, n))
+            return x, y, 50000.0 + 100.0 * np.sin(x / 300.0) * np.cos(y / 400.0)
+
+        samples = _fixture(build)
+        for engine in ("global", "tiled"):
+            benchmarks.append(Benchmark(
+                f"reconstruct[{engine},{n}]", "reconstruction", setup=samples,
+                run=lambda s, engine=engine: MapReconstructor.reconstruct(
+                    *s, (0.0, 5000.0, 0.0, 5000.0), 20.0, engine=engine),
+                items=n, unit="sample", params={"samples": n, "resolution": 20.0, "engine": engine}))
+    return benchmarks
+
+def scenario_benchmarks(quick: bool) -> List[Benchmark]:
+    from src.simulation import run_sim, run_nav_sim, run_agent_sim, run_survey
+
+    world = _fixture(lambda: _world(5000.0))
+    survey_world = _fixture(run_survey.make_survey_world)
+    passes = 25 if quick else 100
+
+    # Each scenario returns the number of simulated dt=0.5 steps
+    def sim(w):
+        return len(run_sim.run_simulation(w)[1])
+
+    def nav(w):
+        return len(run_nav_sim.run_simulation(w)[1])
+
+    def agent(w):
+        return len(run_agent_sim.run_agent_simulation(w)[1])
+
+    def survey(integrator):
+        # Samples are taken every second step
+        return lambda w: 2 * len(run_survey.fly_survey(w, passes, integrator=integrator)[0])
+
+    return [
+        Benchmark("scenario[run_sim]", "scenario", setup=world, run=sim, unit="step", warmup=True),
+        Benchmark("scenario[run_nav_sim]", "scenario", setup=world, run=nav, unit="step", warmup=True),
+        Benchmark("scenario[run_agent_sim]", "scenario", setup=world, run=agent, unit="step", warmup=True),
+        Benchmark("scenario[run_survey,fixed]", "scenario", setup=survey_world, run=survey("fixed"), unit="step",
+                  params={"passes": passes}, warmup=True),
+        Benchmark("scenario[run_survey,event]", "scenario", setup=survey_world, run=survey("event"), unit="step",
+                  params={"passes": passes}, warmup=True),
+    ]
+
+SUITES = [world_benchmarks, lookup_benchmarks, layer_benchmarks, reconstruction_benchmarks, scenario_benchmarks]
+
+def environment_metadata() -> Dict[str, Any]:
+    import scipy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+    }
+
+def time_benchmark(benchmark: Benchmark, repeats: int) -> Dict[str, Any]:
+    """
+    Times `repeats` runs (after setup) and summarizes them. A run that
+    returns an int overrides `items` (e.g. the steps a scenario simulated).
+    """
+    times = []
+    items = benchmark.items
+    if benchmark.warmup:
+        with contextlib.redirect_stdout(io.StringIO()):
+            benchmark.run(benchmark.setup())
+    for _ in range(repeats):
+        state = benchmark.setup()
+        # Scenario scripts print progress; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = benchmark.run(state)
+            times.append(time.perf_counter() - start)
+        if isinstance(result, (int, np.integer)) and not isinstance(result, bool):
+            items = int(result)
+    median = float(np.median(times))
+    return {
+        "name": benchmark.name,
+        "group": benchmark.group,
+        "params": benchmark.params,
+        "repeats": repeats,
+        "times": times,
+        "min": float(np.min(times)),
+        "median": median,
+        "items": items,
+        "unit": benchmark.unit,
+        "rate": items / median if median > 0 else float('inf'), # units per second
+    }
+
+def run_suite(quick: bool = False, repeats: Optional[int] = None, name_filter: Optional[str] = None,
+              log=print) -> Dict[str, Any]:
+    """
+    Runs every benchmark whose name contains `name_filter`.
+
+    Returns:
+        JSON-ready document {"schema", "metadata", "results"}.
+    """
+    repeats = repeats if repeats is not None else (1 if quick else 3)
+    results = []
+    for suite in SUITES:
+        for benchmark in suite(quick):
+            if name_filter and name_filter not in benchmark.name:
+                continue
+            result = time_benchmark(benchmark, repeats)
+            results.append(result)
+            log(f"{result['name']:40s} {result['median'] * 1e3:10.2f} ms  "
+                f"{result['rate']:12.4g} {result['unit']}/s")
+    metadata = environment_metadata()
+    metadata.update({"quick": quick, "repeats": repeats})
+    return {"schema": SCHEMA_VERSION, "metadata": metadata, "results": results}
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2,
+                    min_delta: float = 1e-3) -> List[Dict[str, Any]]:
+    """
+    Matches benchmarks by name and compares median times.
+
+    A benchmark is a regression when it is more than `threshold` (fraction)
+    slower than the baseline and the difference exceeds `min_delta` seconds
+    (so sub-millisecond jitter is not reported).
+
+    Returns:
+        One row per benchmark present in both runs, with ratio and status
+        ('regression', 'improvement' or 'ok').
+    """
+    base = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        ref = base.get(result["name"])
+        if ref is None:
+            continue
+        delta = result["median"] - ref["median"]
+        ratio = result["median"] / ref["median"] if ref["median"] > 0 else float('inf')
+        if ratio > 1.0 + threshold and delta > min_delta:
+            status = "regression"
+        elif ratio < 1.0 / (1.0 + threshold) and -delta > min_delta:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": result["name"], "baseline": ref["median"], "current": result["median"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write JSON results")
+    run.add_argument("-o", "--output", default="benchmark_results.json")
+    run.add_argument("--quick", action="store_true", help="Smaller sizes and one repeat")
+    run.add_argument("--repeats", type=int, default=None)
+    run.add_argument("--filter", default=None, help="Only benchmarks whose name contains this")
+
+    compare = commands.add_parser("compare", help="Flag regressions against a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown fraction")
+    compare.add_argument("--min-delta", type=float, default=1e-3, help="Ignore differences below this (s)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        document = run_suite(quick=args.quick, repeats=args.repeats, name_filter=args.filter)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Saved {args.output}")
+        return 0
+
+    baseline, current = _load(args.baseline), _load(args.current)
+    for key in ("hostname", "cpu_count", "python", "numpy"):
+        if baseline["metadata"].get(key) != current["metadata"].get(key):
+            print(f"warning: {key} differs from the baseline "
+                  f"({baseline['metadata'].get(key)} vs {current['metadata'].get(key)})")
+    rows = compare_results(baseline, current, args.threshold, args.min_delta)
+    for row in rows:
+        print(f"{row['name']:40s} {row['baseline'] * 1e3:10.2f} ms -> {row['current'] * 1e3:10.2f} ms  "
+              f"x{row['ratio']:5.2f}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from src.agent.context import AgentContext, NavigationMode, SituationContext
+
+class Order(Enum):
+    CONTINUE = "CONTINUE" # Fly the mission on the rule-based TTPs
+    SWITCH_MAG_NAV = "SWITCH_MAG_NAV" # Prefer MagNav even while GPS is healthy
+    SWITCH_GPS = "SWITCH_GPS" # Prefer GPS (the GPS-degraded TTP still takes precedence)
+    LOITER = "LOITER" # Hold position in a constant turn
+
+@dataclass
+class Decision:
+    """Strategic decision returned by a Brain."""
+    order: Order
+    altitude: Optional[float] = None # Commanded altitude override (m)
+    speed: Optional[float] = None # Commanded speed override (m/s)
+    reason: str = ""
+
+def conditions_key(situation: SituationContext, variance_step: float = 1.0) -> Tuple:
+    """
+    Discretized external conditions: sensor health, active threats and the
+    GPS variance in `variance_step` bins. Unlike situation_key() it leaves
+    out the navigation mode, which decisions themselves change.
+    """
+    health = tuple(sorted((name, status.value) for name, status in situation.sensor_health.items()))
+    return (health, tuple(sorted(situation.active_threats)), int(np.floor(situation.gps_variance / variance_step)))
+
+def situation_key(situation: SituationContext, variance_step: float = 1.0) -> Tuple:
+    """
+    Discretized situation used as the memo key: navigation mode plus
+    conditions_key(). Situations with the same key get the same strategic
+    decision.
+    """
+    return (situation.current_nav_mode.value,) + conditions_key(situation, variance_step)
+
+def context_snapshot(context: AgentContext) -> Dict[str, Any]:
+    """
+    JSON-serializable copy of the context a Brain decides on. The brain runs
+    on another thread, so it never sees the live (mutating) context.
+    """
+    situation = context.situation
+    state = situation.estimated_state
+    return {
+        "callsign": context.organization.callsign,
+        "objectives": list(context.mission.objectives),
+        "risk_tolerance": context.mission.risk_tolerance,
+        "max_speed": context.platform.max_speed,
+        "max_altitude": context.platform.max_altitude,
+        "current_mode": situation.current_nav_mode.value,
+        "gps_variance": situation.gps_variance,
+        "sensor_health": {name: status.value for name, status in situation.sensor_health.items()},
+        "active_threats": list(situation.active_threats),
+        "position": [state.x, state.y, state.z],
+    }
+
+class Brain(ABC):
+    """
+    Slow strategic layer (e.g. an LLM). decide() may block for seconds; it is
+    only ever called from DecisionPipeline worker threads.
+    """
+    @abstractmethod
+    def decide(self, context: Dict[str, Any]) -> Decision:
+        """
+        Args:
+            context: Snapshot from context_snapshot().
+
+        Returns:
+            The strategic Decision.
+        """
+        pass
+
+class MockBrain(Brain):
+    """
+    Local stand-in for an LLM brain: applies the Phase 3 prompt TTPs after a
+    configurable (optionally random) delay.
+    """
+    def __init__(self, latency: float = 1.0, jitter: float = 0.0, seed: Optional[int] = None,
+                 policy: Optional[Callable[[Dict[str, Any]], Decision]] = None):
+        """
+        Args:
+            latency: Mean response time (s).
+            jitter: Standard deviation of the response time (s).
+            seed: Seed for the jitter.
+            policy: Optional replacement for the built-in TTPs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+        self.policy = policy if policy is not None else self._ttp
+        self.calls = 0
+
+    def decide(self, context: Dict[str, Any]) -> Decision:
+        self.calls += 1
+        delay = self.latency + (self.rng.normal(0.0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return self.policy(context)
+
+    @staticmethod
+    def _ttp(context: Dict[str, Any]) -> Decision:
+        # If GPS variance > 5.0, GPS is unreliable: switch to MagNav and fly low
+        if context["gps_variance"] > 5.0:
+            return Decision(Order.SWITCH_MAG_NAV, altitude=50.0, reason="GPS unreliable")
+        if context["current_mode"] == NavigationMode.MAG_NAV.value:
+            return Decision(Order.SWITCH_GPS, reason="GPS healthy")
+        return Decision(Order.CONTINUE)
+
+class DecisionCache:
+    """
+    LRU memo of decisions keyed on situation_key().
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Decision]:
+        decision = self._entries.get(key)
+        if decision is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return decision
+
+    def put(self, key: Hashable, decision: Decision):
+        self._entries[key] = decision
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class DecisionPipeline:
+    """
+    Runs a Brain off the control loop.
+
+    request() never blocks: it answers from the memo cache or submits the
+    situation to a thread pool, cancelling the previous request if the
+    situation has changed since. poll() never blocks either: it returns a
+    finished decision if it is still for the current situation, and gives up
+    on requests older than `timeout` (a timed-out situation is not retried
+    until it changes). Results of abandoned requests that still complete are
+    kept in the cache.
+    """
+    def __init__(self, brain: Brain, timeout: float = 5.0, max_workers: int = 1, cache_size: int = 256,
+                 variance_step: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            brain: Strategic Brain.
+            timeout: Wall time (s) after which a request is abandoned.
+            max_workers: Worker threads calling the brain.
+            cache_size: Decisions memoized by situation key.
+            variance_step: GPS variance bin width of the situation key.
+            clock: Wall clock used for timeouts.
+        """
+        self.brain = brain
+        self.timeout = timeout
+        self.variance_step = variance_step
+        self.clock = clock
+        self.cache = DecisionCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="brain")
+        self._pending: Optional[Tuple[Hashable, Future, float]] = None # key, future, submit time
+        self._abandoned: List[Tuple[Hashable, Future]] = []
+        self._current_key: Optional[Hashable] = None
+        self._decided_key: Optional[Hashable] = None # Key of the last returned decision
+        self._failed_key: Optional[Hashable] = None # Key that timed out or errored
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0 # Pending requests superseded by a new situation
+        self.timeouts = 0
+        self.errors = 0 # Brain raised or returned something other than a Decision
+
+    def key(self, situation: SituationContext) -> Hashable:
+        return situation_key(situation, self.variance_step)
+
+    @property
+    def decided_key(self) -> Optional[Hashable]:
+        """Situation key of the decision most recently returned."""
+        return self._decided_key
+
+    def is_current(self, key: Hashable, situation: SituationContext) -> bool:
+        """
+        True while the conditions a decision was made for (`key`) still
+        hold. The mode is not compared, since applying a decision may
+        change it.
+        """
+        return key is not None and key[1:] == conditions_key(situation, self.variance_step)
+
+    def forget_decision(self):
+        """
+        Marks no decision as in effect (e.g. after the caller dropped a stale
+        one), so returning to its situation yields it again from the cache.
+        """
+        self._decided_key = None
+
+    def request(self, context: AgentContext) -> Optional[Decision]:
+        """
+        Asks for a decision on the current situation.
+
+        Returns:
+            The memoized decision if this situation was decided before
+            (and is not already the one in effect); otherwise None, and the
+            decision arrives through poll().
+        """
+        key = self.key(context.situation)
+        self._current_key = key
+        if self._pending is not None and self._pending[0] != key:
+            # The situation moved on: the pending answer would be stale
+            self._abandon()
+            self.cancelled += 1
+        if self._pending is not None or key == self._decided_key:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._decided_key = key
+            return cached
+        if key == self._failed_key:
+            return None
+        future = self.executor.submit(self.brain.decide, context_snapshot(context))
+        self._pending = (key, future, self.clock())
+        self.submitted += 1
+        return None
+
+    def poll(self) -> Optional[Decision]:
+        """
+        Returns the decision for the current situation if it has arrived,
+        else None.
+        """
+        self._harvest()
+        if self._pending is None:
+            return None
+        key, future, submitted_at = self._pending
+        if not future.done():
+            if self.clock() - submitted_at > self.timeout:
+                self._abandon()
+                self.timeouts += 1
+                self._failed_key = key
+            return None
+        self._pending = None
+        decision = self._result(key, future)
+        if decision is None:
+            self._failed_key = key
+            return None
+        if key != self._current_key:
+            return None
+        self._decided_key = key
+        return decision
+
+    def _result(self, key: Hashable, future: Future) -> Optional[Decision]:
+        try:
+            decision = future.result()
+        except Exception:
+            self.errors += 1
+            return None
+        # Output validation: only well-formed decisions are applied or cached
+        if not isinstance(decision, Decision) or not isinstance(decision.order, Order):
+            self.errors += 1
+            return None
+        self.completed += 1
+        self.cache.put(key, decision)
+        return decision
+
+    def _abandon(self):
+        key, future, _ = self._pending
+        self._pending = None
+        # A request still queued is dropped; a running one is left to finish
+        if not future.cancel():
+            self._abandoned.append((key, future))
+
+    def _harvest(self):
+        still_running = []
+        for key, future in self._abandoned:
+            if future.done():
+                self._result(key, future)
+            else:
+                still_running.append((key, future))
+        self._abandoned = still_running
+
+    @property
+    def busy(self) -> bool:
+        return self._pending is not None
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "completed": self.completed, "cancelled": self.cancelled,
+                "timeouts": self.timeouts, "errors": self.errors, "cache_hits": self.cache.hits,
+                "in_flight": int(self._pending is not None) + len(self._abandoned)}
+
+    def close(self):
+        """Stops the workers without waiting for a running brain call."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
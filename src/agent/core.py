@@ -1,14 +1,53 @@
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from src.core.metrics import Metrics, NULL_METRICS
+from src.core.telemetry import TelemetryRecorder, EventLevel, NULL_TELEMETRY
 from src.agent.context import AgentContext, SituationContext, SensorStatus, NavigationMode
 from src.vehicle.aircraft import Aircraft, State
 from src.navigation.base import NavigationCommand
-from src.navigation.waypoint import WaypointNavigator
+from src.navigation.waypoint import WaypointNavigator, LOITER_HEADING_STEP
+from src.agent.brain import Decision, DecisionPipeline, Order
 
 class Agent:
-    def __init__(self, context: AgentContext, aircraft: Aircraft):
+    def __init__(self, context: AgentContext, aircraft: Aircraft, world=None, magnetometer=None, estimator=None,
+                 metrics: Optional[Metrics] = None, telemetry: Optional[TelemetryRecorder] = None,
+                 pipeline: Optional[DecisionPipeline] = None):
+        """
+        Args:
+            context: Agent context (organization, platform, mission, situation).
+            aircraft: Controlled aircraft (truth state).
+            world: World sampled by the magnetometer (needed for MAG_NAV estimation).
+            magnetometer: Onboard Magnetometer.
+            estimator: Optional MagNav estimator (e.g. ParticleFilter) used while
+                       current_nav_mode is MAG_NAV. Without it the estimate is
+                       the truth state in every mode.
+            metrics: Optional Metrics receiving per-phase timers ("agent.monitor",
+                     "agent.estimate", "agent.decide", "agent.act") and mode
+                     switch counters; also passed to the agent's navigator.
+            telemetry: Optional TelemetryRecorder receiving the "state", "sensor"
+                       and "mode" channels every cycle plus alert and mode
+                       switch events.
+            pipeline: Optional DecisionPipeline for the slow strategic layer.
+                      decide() polls it and submits the situation without
+                      waiting; returned decisions are applied on top of the
+                      rule-based TTPs.
+        """
         self.context = context
         self.aircraft = aircraft
+        self.world = world
+        self.magnetometer = magnetometer
+        self.estimator = estimator
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.telemetry = telemetry if telemetry is not None else NULL_TELEMETRY
+        self.time = 0.0 # Simulation time (s), advanced by update()
+        self._last_reading = np.nan
+        if estimator is not None and (world is None or magnetometer is None):
+            raise ValueError("A MagNav estimator needs a world and a magnetometer")
+        self._last_command = None
+        self._estimate_time = 0.0 # Time of the last estimator update (s)
+        self.pipeline = pipeline
+        self.strategy: Optional[Decision] = None # Strategic decision in effect
+        self._strategy_key = None # Situation key it was decided for
         
         # Initialize sub-components
         # For now, we reuse the WaypointNavigator. 
@@ -17,33 +56,84 @@ class Agent:
             context.mission.waypoints, 
             speed=context.platform.max_speed * 0.8, # Cruising speed
             acceptance_radius=100.0,
-            loop=True 
+            loop=True,
+            metrics=self.metrics
         )
         
         # Initialize sensor health
         for sensor in self.context.platform.sensors_list:
             self.context.situation.sensor_health[sensor] = SensorStatus.OPERATIONAL
 
+        self.telemetry.channel("state", [("t", float), ("x", float), ("y", float), ("z", float), ("psi", float),
+                                         ("v", float), ("est_x", float), ("est_y", float)])
+        self.telemetry.channel("sensor", [("t", float), ("gps_variance", float), ("magnetometer", float)])
+        self.telemetry.channel("mode", [("t", float), ("mode", "U16")])
+
     def update(self, dt: float, external_gps_variance: float = 0.0):
         """
         Main Agent Cycle: Monitor -> Estimate -> Decide -> Act
         
+        Runs every phase once at the same rate. A multi-rate Scheduler calls
+        the phase methods below at their own rates instead.
+        
         Args:
             dt: Time step
             external_gps_variance: Injected simulation variance to test logic.
         """
-        
         # 1. Monitor (Senses)
-        self._monitor_sensors(external_gps_variance)
+        self.sense(external_gps_variance)
         
         # 2. Estimate (Fusion)
-        self._update_estimation()
+        self.estimate()
         
         # 3. Decide (Command)
-        command = self._make_decisions()
+        self.decide()
         
         # 4. Act (Control)
-        self.aircraft.update(dt, command.speed, command.heading, command.altitude)
+        self.act(dt)
+        self.metrics.inc("agent.updates")
+
+    @property
+    def last_command(self) -> Optional[NavigationCommand]:
+        """Command from the latest decide(); act() keeps flying it until the next one."""
+        return self._last_command
+
+    def sense(self, gps_variance: float = 0.0):
+        """Monitor phase: sensor health and jamming detection."""
+        with self.metrics.time("agent.monitor"):
+            self._monitor_sensors(gps_variance)
+
+    def estimate(self):
+        """Estimate phase: updates situation.estimated_state."""
+        with self.metrics.time("agent.estimate"):
+            self._update_estimation()
+
+    def decide(self) -> NavigationCommand:
+        """Decide phase: applies the TTPs and stores the resulting command."""
+        with self.metrics.time("agent.decide"):
+            self._last_command = self._make_decisions()
+        return self._last_command
+
+    def act(self, dt: float):
+        """
+        Act phase: flies the last decided command for dt seconds and advances
+        the agent's clock. Decides first if no command exists yet.
+        """
+        command = self._last_command if self._last_command is not None else self.decide()
+        with self.metrics.time("agent.act"):
+            self.aircraft.update(dt, command.speed, command.heading, command.altitude)
+        self.time += dt
+        if self.telemetry.enabled:
+            self._record_telemetry()
+
+    def _record_telemetry(self):
+        situation = self.context.situation
+        truth = self.aircraft.state
+        estimate = situation.estimated_state
+        self.telemetry.record("state", self.time, truth.x, truth.y, truth.z, truth.psi, truth.v,
+                              estimate.x, estimate.y)
+        self.telemetry.record("sensor", self.time, situation.gps_variance, self._last_reading)
+        self.telemetry.record("mode", self.time, situation.current_nav_mode.value)
 
     def _monitor_sensors(self, gps_variance: float):
         """
@@ -54,33 +144,72 @@ class Agent:
         # TTP: Detect GPS Jamming
         if gps_variance > 5.0:
             self.context.situation.sensor_health["GPS"] = SensorStatus.DEGRADED
-            print(f"AGENT ALERT: GPS Variance High ({gps_variance:.1f}). Marking GPS DEGRADED.")
+            self.metrics.inc("agent.gps_degraded")
+            # Rate limited: a jamming episode is one event with a repeat count
+            self.telemetry.event(self.time, "gps_degraded", "GPS variance high. Marking GPS DEGRADED.",
+                                 EventLevel.WARNING, variance=float(gps_variance))
         else:
             self.context.situation.sensor_health["GPS"] = SensorStatus.OPERATIONAL
 
     def _update_estimation(self):
         """
         Updates the estimated state.
-        Realistically this would be a Kalman Filter.
-        For now, we just pass through the aircraft Truth state, 
-        potentially degrading it if we wanted to simulate error.
+        In MAG_NAV mode with an estimator, the estimate comes from map matching:
+        the filter is propagated with the last command and weighted against a
+        magnetometer reading at the true position. Otherwise (GPS) we pass
+        through the aircraft Truth state.
         """
-        self.context.situation.estimated_state = self.aircraft.state
+        situation = self.context.situation
+        self._last_reading = np.nan
+        if self.estimator is None or situation.current_nav_mode != NavigationMode.MAG_NAV:
+            if self.estimator is not None:
+                self.estimator.initialized = False
+            situation.estimated_state = self.aircraft.state
+            return
+
+        truth = self.aircraft.state
+        elapsed = self.time - self._estimate_time
+        if not self.estimator.initialized:
+            # Seed the filter from the last (GPS) estimate
+            self.estimator.initialize(situation.estimated_state)
+        elif self._last_command is not None and elapsed > 0.0:
+            # Propagate over the time since the last estimate (several physics
+            # steps when estimation runs slower than the aircraft).
+            # Altitude comes from the altimeter, so the truth value is used
+            self.estimator.predict(elapsed, self._last_command.speed, self._last_command.heading, truth.z)
+        self._estimate_time = self.time
+
+        reading = self.magnetometer.read(self.world, truth.x, truth.y, truth.z)
+        self._last_reading = reading
+        self.estimator.update(reading)
+        situation.estimated_state = self.estimator.estimate()
 
     def _make_decisions(self) -> NavigationCommand:
         """
         Applies TTPs to generate commands.
         """
+        # Strategic layer: pick up a finished decision, never wait for one.
+        # A decision only holds while the conditions it was made for do; a
+        # slow brain must not keep e.g. a jamming order after jamming ends.
+        if self.pipeline is not None:
+            self._apply_strategy(self.pipeline.poll())
+            if self.strategy is not None and not self.pipeline.is_current(self._strategy_key, self.context.situation):
+                self._drop_strategy()
         
         # TTP: Select Navigation Mode based on Sensor Health
         if self.context.situation.sensor_health.get("GPS") == SensorStatus.DEGRADED:
             if self.context.situation.current_nav_mode != NavigationMode.MAG_NAV:
-                print("AGENT DECISION: Switching to MAG_NAV due to GPS degradation.")
-                self.context.situation.current_nav_mode = NavigationMode.MAG_NAV
+                self._switch_mode(NavigationMode.MAG_NAV, "Switching to MAG_NAV due to GPS degradation.")
+        elif self.strategy is not None and self.strategy.order == Order.SWITCH_MAG_NAV:
+            if self.context.situation.current_nav_mode != NavigationMode.MAG_NAV:
+                self._switch_mode(NavigationMode.MAG_NAV, "Strategy prefers MAG_NAV. Switching to MAG_NAV.")
         else:
             if self.context.situation.current_nav_mode != NavigationMode.GPS:
-                print("AGENT DECISION: GPS Healthy. Switching back to GPS.")
-                self.context.situation.current_nav_mode = NavigationMode.GPS
+                self._switch_mode(NavigationMode.GPS, "GPS Healthy. Switching back to GPS.")
+
+        # Submit the (possibly new) situation; a memoized decision applies at once
+        if self.pipeline is not None:
+            self._apply_strategy(self.pipeline.request(self.context))
                 
         # Execute Navigation Strategy based on Mode
         if self.context.situation.current_nav_mode == NavigationMode.MAG_NAV:
@@ -93,5 +222,39 @@ class Agent:
         else:
             # Standard Ops
             cmd = self.navigator.get_command(self.context.situation.estimated_state)
+
+        strategy = self.strategy
+        if strategy is not None:
+            if strategy.order == Order.LOITER:
+                cmd.heading = self.context.situation.estimated_state.psi + LOITER_HEADING_STEP
+            # Guardrail: overrides are clamped to the platform envelope
+            if strategy.altitude is not None:
+                cmd.altitude = float(np.clip(strategy.altitude, 0.0, self.context.platform.max_altitude))
+            if strategy.speed is not None:
+                cmd.speed = float(np.clip(strategy.speed, 0.0, self.context.platform.max_speed))
             
         return cmd
+
+    def _switch_mode(self, mode: NavigationMode, message: str):
+        self.telemetry.event(self.time, "mode_switch", message, min_interval=0.0, mode=mode.value)
+        self.context.situation.current_nav_mode = mode
+        self.metrics.inc("agent.mode_switch")
+        self.metrics.inc(f"agent.mode_switch.{mode.value}")
+
+    def _apply_strategy(self, decision: Optional[Decision]):
+        if decision is None:
+            return
+        self.strategy = decision
+        self._strategy_key = self.pipeline.decided_key
+        self.metrics.inc("agent.strategy")
+        self.telemetry.event(self.time, "strategy", f"Strategy {decision.order.value}: {decision.reason}",
+                             min_interval=0.0, order=decision.order.value, altitude=decision.altitude,
+                             speed=decision.speed)
+
+    def _drop_strategy(self):
+        self.telemetry.event(self.time, "strategy", f"Strategy {self.strategy.order.value} expired: situation changed",
+                             min_interval=0.0, order=self.strategy.order.value)
+        self.strategy = None
+        self._strategy_key = None
+        self.pipeline.forget_decision()
+        self.metrics.inc("agent.strategy_dropped")
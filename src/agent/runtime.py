@@ -0,0 +1,163 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from src.core.metrics import Metrics, NULL_METRICS
+from src.agent.bus import MessageBus, Topic
+from src.agent.core import Agent
+
+@dataclass
+class AgentStatus:
+    callsign: str
+    t: float # Simulation time (s)
+    x: float
+    y: float
+    z: float
+    psi: float
+    v: float
+    est_x: float # Estimated position the agent navigates on
+    est_y: float
+    mode: str
+    gps_variance: float
+
+@dataclass
+class ModeChange:
+    callsign: str
+    t: float
+    previous: str
+    mode: str
+
+STATUS_TOPIC = Topic("agent.status", AgentStatus, capacity=4096)
+MODE_TOPIC = Topic("agent.mode", ModeChange, capacity=1024)
+
+class AgentRuntime:
+    """
+    Advances many Agents sharing one World in a single asyncio task.
+
+    Every tick each agent runs one update() cycle, publishes a ModeChange
+    when its navigation mode switched and, every `status_every` ticks, an
+    AgentStatus. The bus is flushed once at the end of the tick, so
+    subscribers see one batch per topic per tick (e.g. the whole squadron's
+    status) instead of one call per agent. The loop yields to the event loop
+    after each tick so other coroutines (subscribers, slow planners) can run.
+    """
+    def __init__(self, world, tick: float, bus: Optional[MessageBus] = None, status_every: int = 1,
+                 gps_variance: Optional[Callable[[Agent, float], float]] = None,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            world: World shared by all agents.
+            tick: Update step (s).
+            bus: MessageBus to publish on (a new one by default).
+            status_every: Ticks between AgentStatus publications.
+            gps_variance: Function (agent, t) -> injected GPS variance.
+            metrics: Optional Metrics; the tick is timed as "runtime.tick".
+        """
+        if tick <= 0.0:
+            raise ValueError("tick must be positive")
+        if status_every < 1:
+            raise ValueError("status_every must be at least 1")
+        self.world = world
+        self.tick = tick
+        self.bus = bus if bus is not None else MessageBus(metrics=metrics)
+        self.status_every = status_every
+        self.gps_variance = gps_variance
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.agents: List[Agent] = []
+        self._callsigns: Dict[str, Agent] = {}
+        self.ticks = 0
+        self.wall_time = 0.0 # Wall time spent in run_async (s)
+        self.bus.register(STATUS_TOPIC)
+        self.bus.register(MODE_TOPIC)
+
+    @property
+    def time(self) -> float:
+        return self.ticks * self.tick
+
+    def add(self, agent: Agent) -> Agent:
+        """Adds an agent; callsigns must be unique and the agent must use the runtime's world."""
+        callsign = agent.context.organization.callsign
+        if callsign in self._callsigns:
+            raise ValueError(f"Duplicate callsign: {callsign}")
+        if agent.world is not None and agent.world is not self.world:
+            raise ValueError(f"Agent {callsign} uses a different World")
+        self._callsigns[callsign] = agent
+        self.agents.append(agent)
+        return agent
+
+    def agent(self, callsign: str) -> Agent:
+        return self._callsigns[callsign]
+
+    async def step_async(self):
+        """Runs one tick for every agent and flushes the bus."""
+        t = self.time
+        dt = self.tick
+        bus = self.bus
+        publish_status = self.ticks % self.status_every == 0
+        with self.metrics.time("runtime.tick"):
+            for agent in self.agents:
+                situation = agent.context.situation
+                previous = situation.current_nav_mode
+                variance = self.gps_variance(agent, t) if self.gps_variance is not None else 0.0
+                agent.update(dt, variance)
+                callsign = agent.context.organization.callsign
+                if situation.current_nav_mode != previous:
+                    await bus.publish(MODE_TOPIC, ModeChange(callsign, agent.time, previous.value,
+                                                             situation.current_nav_mode.value))
+                if publish_status:
+                    truth = agent.aircraft.state
+                    estimate = situation.estimated_state
+                    await bus.publish(STATUS_TOPIC, AgentStatus(
+                        callsign, agent.time, truth.x, truth.y, truth.z, truth.psi, truth.v,
+                        estimate.x, estimate.y, situation.current_nav_mode.value, variance))
+            await bus.flush()
+        self.ticks += 1
+
+    async def run_async(self, duration: Optional[float] = None, ticks: Optional[int] = None) -> int:
+        """
+        Runs for `duration` seconds or `ticks` ticks (whichever is given / first).
+
+        Returns:
+            Number of ticks executed.
+        """
+        if duration is None and ticks is None:
+            raise ValueError("Specify duration or ticks")
+        n = int(round(duration / self.tick)) if duration is not None else ticks
+        if ticks is not None:
+            n = min(n, ticks)
+        start = time.perf_counter()
+        for _ in range(n):
+            await self.step_async()
+            await asyncio.sleep(0)
+        self.wall_time += time.perf_counter() - start
+        return n
+
+    def run(self, duration: Optional[float] = None, ticks: Optional[int] = None) -> int:
+        """Synchronous entry point: runs run_async() in a fresh event loop."""
+        return asyncio.run(self.run_async(duration, ticks))
+
+    def stats(self) -> Dict:
+        """Agent-steps per wall second plus the bus topic stats."""
+        agent_steps = self.ticks * len(self.agents)
+        return {"agents": len(self.agents), "ticks": self.ticks, "wall_time": self.wall_time,
+                "agent_steps_per_s": agent_steps / self.wall_time if self.wall_time > 0 else 0.0,
+                "topics": self.bus.stats()}
+
+class StatusBoard:
+    """
+    Bus subscriber keeping the latest AgentStatus per callsign and the
+    ModeChange log, i.e. the squadron picture a commander would look at.
+    """
+    def __init__(self, bus: MessageBus):
+        self.latest: Dict[str, AgentStatus] = {}
+        self.mode_changes: List[ModeChange] = []
+        bus.subscribe(STATUS_TOPIC, self._on_status)
+        bus.subscribe(MODE_TOPIC, self.mode_changes.extend)
+
+    def _on_status(self, batch: List[AgentStatus]):
+        for status in batch:
+            self.latest[status.callsign] = status
+
+    def in_mode(self, mode: str) -> List[str]:
+        """Callsigns whose latest status reports `mode`."""
+        return [callsign for callsign, status in self.latest.items() if status.mode == mode]
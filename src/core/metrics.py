@@ -0,0 +1,181 @@
+import bisect
+import json
+import time
+from typing import Dict, List, Optional, Sequence
+
+# Default histogram bucket upper bounds for durations (s): 1 us .. ~10 s
+TIME_BUCKETS = [10.0 ** (e / 2.0) for e in range(-12, 3)]
+
+class Histogram:
+    """
+    Streaming summary of observed values: count, sum, min, max and counts
+    per bucket (upper bounds, plus an overflow bucket). Quantiles are
+    estimated from the buckets.
+    """
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets = sorted(buckets) if buckets is not None else list(TIME_BUCKETS)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (clamped to max)."""
+        if self.count == 0:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.bucket_counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> Dict:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": self.buckets,
+            "bucket_counts": list(self.bucket_counts),
+        }
+
+class _Timing:
+    """Context manager recording its wall time into a Histogram."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    """
+    Registry of named counters, timers and histograms.
+
+    Instrumented objects (Agent, World, Magnetometer, WaypointNavigator)
+    take an optional `metrics` argument and default to NULL_METRICS, whose
+    methods do nothing. Names are dotted, e.g. "agent.estimate".
+
+    Example:
+        metrics = Metrics()
+        agent = Agent(..., metrics=metrics)
+        ...
+        print(metrics.report())
+        metrics.export_json("metrics.json")
+    """
+    enabled = True
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, Histogram] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, n: int = 1):
+        """Adds n to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def time(self, name: str) -> _Timing:
+        """
+        Context manager timing a block into the timer `name`:
+            with metrics.time("agent.decide"):
+                ...
+        """
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Histogram()
+        return _Timing(timer)
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None):
+        """Records a value in a histogram (buckets are fixed on first use)."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            {"counters": {name: n}, "timers": {name: summary},
+             "histograms": {name: summary}}; plain JSON-ready values.
+        """
+        return {
+            "counters": dict(self.counters),
+            "timers": {name: h.summary() for name, h in self.timers.items()},
+            "histograms": {name: h.summary() for name, h in self.histograms.items()},
+        }
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.histograms.clear()
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def report(self) -> str:
+        """Human-readable table of timers (by total time) and counters."""
+        lines: List[str] = []
+        for name, h in sorted(self.timers.items(), key=lambda item: -item[1].total):
+            if h.count:
+                lines.append(f"{name:32s} {h.count:9d} calls  {h.total:9.3f} s total  "
+                             f"{h.total / h.count * 1e6:10.1f} us mean  {h.max * 1e6:10.1f} us max")
+        for name, n in sorted(self.counters.items()):
+            lines.append(f"{name:32s} {n:9d}")
+        for name, h in sorted(self.histograms.items()):
+            if h.count:
+                lines.append(f"{name:32s} {h.count:9d} obs    mean {h.total / h.count:.4g}  "
+                             f"min {h.min:.4g}  max {h.max:.4g}")
+        return "\n".join(lines)
+
+class _NullTiming:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMING = _NullTiming()
+
+class NullMetrics(Metrics):
+    """
+    Disabled metrics: every call is a no-op and snapshots are empty.
+    """
+    enabled = False
+
+    def inc(self, name: str, n: int = 1):
+        pass
+
+    def time(self, name: str) -> _NullTiming:
+        return _NULL_TIMING
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None):
+        pass
+
+NULL_METRICS = NullMetrics()
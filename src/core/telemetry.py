@@ -0,0 +1,235 @@
+import json
+import os
+import numpy as np
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+class EventLevel(Enum):
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+
+@dataclass
+class Event:
+    t: float # Simulation time of the first occurrence (s)
+    kind: str # Machine-readable type, e.g. "gps_degraded"
+    level: EventLevel
+    message: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    count: int = 1 # Occurrences folded into this event (rate limiting / dedup)
+    last_t: float = 0.0 # Time of the latest folded occurrence (s)
+
+class RingBuffer:
+    """
+    Fixed-capacity columnar buffer: one preallocated array per field.
+    Once full, new rows overwrite the oldest ones.
+    """
+    def __init__(self, fields: Sequence[Tuple[str, Any]], capacity: int):
+        """
+        Args:
+            fields: (name, dtype) per column.
+            capacity: Number of rows held.
+        """
+        self.names = [name for name, _ in fields]
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in fields}
+        self.capacity = capacity
+        self.total = 0 # Rows ever appended
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def full(self) -> bool:
+        return self.total >= self.capacity
+
+    def append(self, values: Sequence):
+        """Appends one row, values in field order."""
+        i = self.total % self.capacity
+        for name, value in zip(self.names, values):
+            self.columns[name][i] = value
+        self.total += 1
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Buffered rows, oldest first (copies)."""
+        n = len(self)
+        start = self.total % self.capacity if self.full else 0
+        order = (np.arange(n) + start) % self.capacity
+        return {name: column[order] for name, column in self.columns.items()}
+
+    def clear(self):
+        self.total = 0
+
+class TelemetryRecorder:
+    """
+    Records run telemetry without per-step I/O.
+
+    Channels are columnar ring buffers. With a `directory`, a full buffer is
+    written out as one compressed chunk ({channel}.{n:06d}.npz) and reused,
+    so the whole run is kept; without one, the last `capacity` rows per
+    channel stay in memory.
+
+    Events go to a typed log. Repeats of the same kind within
+    `min_interval` seconds (simulation time) of its previous occurrence are
+    folded into the logged event (count / last_t) instead of being logged
+    again, so an unbroken episode is one event however long it lasts.
+    """
+    enabled = True
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = 4096, min_interval: float = 10.0):
+        """
+        Args:
+            directory: Output directory for chunks and events (created if missing).
+            capacity: Rows per channel buffer.
+            min_interval: Default rate limit per event kind (s).
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self.buffers: Dict[str, RingBuffer] = {}
+        self.events: List[Event] = []
+        self._last_event: Dict[str, Event] = {}
+        self._chunks: Dict[str, int] = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def channel(self, name: str, fields: Sequence[Tuple[str, Any]]):
+        """Declares a channel; re-declaring an existing channel is a no-op."""
+        if name not in self.buffers:
+            self.buffers[name] = RingBuffer(fields, self.capacity)
+            self._chunks[name] = 0
+
+    def record(self, name: str, *values):
+        """Appends one row (values in field order) to a declared channel."""
+        buffer = self.buffers[name]
+        if self.directory is not None and buffer.full:
+            self._flush_channel(name)
+        buffer.append(values)
+
+    def event(self, t: float, kind: str, message: str, level: EventLevel = EventLevel.INFO,
+              min_interval: Optional[float] = None, **data) -> bool:
+        """
+        Logs an event unless it repeats the last `kind` event with the same
+        message within min_interval seconds of that event's latest
+        occurrence, in which case its count is increased instead.
+
+        Returns:
+            True if a new event was logged.
+        """
+        interval = self.min_interval if min_interval is None else min_interval
+        last = self._last_event.get(kind)
+        if last is not None and last.message == message and t - last.last_t < interval:
+            last.count += 1
+            last.last_t = t
+            return False
+        event = Event(t=t, kind=kind, level=level, message=message, data=data, last_t=t)
+        self.events.append(event)
+        self._last_event[kind] = event
+        return True
+
+    def channel_arrays(self, name: str) -> Dict[str, np.ndarray]:
+        """Rows still buffered in memory for a channel, oldest first."""
+        return self.buffers[name].arrays()
+
+    def _flush_channel(self, name: str):
+        buffer = self.buffers[name]
+        if len(buffer) == 0:
+            return
+        path = os.path.join(self.directory, f"{name}.{self._chunks[name]:06d}.npz")
+        np.savez_compressed(path, **buffer.arrays())
+        self._chunks[name] += 1
+        buffer.clear()
+
+    def flush(self):
+        """Writes all buffered rows and the event log to `directory`."""
+        if self.directory is None:
+            return
+        for name in self.buffers:
+            self._flush_channel(name)
+        np.savez_compressed(os.path.join(self.directory, "events.npz"), **events_to_arrays(self.events))
+        meta = {"channels": {name: list(buffer.names) for name, buffer in self.buffers.items()},
+                "chunks": dict(self._chunks)}
+        with open(os.path.join(self.directory, "telemetry.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> 'TelemetryRecorder':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class NullTelemetry(TelemetryRecorder):
+    """Disabled telemetry: channels and events are discarded."""
+    enabled = False
+
+    def __init__(self):
+        super().__init__(capacity=1)
+
+    def channel(self, name: str, fields: Sequence[Tuple[str, Any]]):
+        pass
+
+    def record(self, name: str, *values):
+        pass
+
+    def event(self, t: float, kind: str, message: str, level: EventLevel = EventLevel.INFO,
+              min_interval: Optional[float] = None, **data) -> bool:
+        return False
+
+NULL_TELEMETRY = NullTelemetry()
+
+def events_to_arrays(events: List[Event]) -> Dict[str, np.ndarray]:
+    """Event log as columns; `data` is stored as JSON strings."""
+    return {
+        "t": np.array([e.t for e in events], dtype=float),
+        "last_t": np.array([e.last_t for e in events], dtype=float),
+        "kind": np.array([e.kind for e in events], dtype=str),
+        "level": np.array([e.level.value for e in events], dtype=str),
+        "message": np.array([e.message for e in events], dtype=str),
+        "count": np.array([e.count for e in events], dtype=np.int64),
+        "data": np.array([json.dumps(e.data) for e in events], dtype=str),
+    }
+
+class TelemetryRun:
+    """
+    Reader for a directory written by TelemetryRecorder.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "telemetry.json")) as f:
+            self.meta = json.load(f)
+
+    @property
+    def channel_names(self) -> List[str]:
+        return list(self.meta["channels"])
+
+    def channel(self, name: str) -> Dict[str, np.ndarray]:
+        """All rows of a channel, concatenated across chunks in order."""
+        fields = self.meta["channels"][name]
+        # Exactly the chunks this run wrote; a reused directory may hold more
+        paths = [os.path.join(self.directory, f"{name}.{i:06d}.npz") for i in range(self.meta["chunks"][name])]
+        parts = []
+        for path in paths:
+            with np.load(path) as chunk:
+                parts.append({key: chunk[key] for key in fields})
+        if not parts:
+            return {key: np.empty(0) for key in fields}
+        return {key: np.concatenate([part[key] for part in parts]) for key in fields}
+
+    def events(self) -> Dict[str, np.ndarray]:
+        with np.load(os.path.join(self.directory, "events.npz")) as data:
+            return {key: data[key] for key in data.files}
+
+    def event_list(self) -> List[Event]:
+        columns = self.events()
+        return [Event(t=float(t), kind=str(kind), level=EventLevel(str(level)), message=str(message),
+                      data=json.loads(str(data)), count=int(count), last_t=float(last_t))
+                for t, kind, level, message, data, count, last_t in zip(
+                    columns["t"], columns["kind"], columns["level"], columns["message"],
+                    columns["data"], columns["count"], columns["last_t"])]
+
+def load_telemetry(directory: str) -> TelemetryRun:
+    return TelemetryRun(directory)
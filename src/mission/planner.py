@@ -1,6 +1,7 @@
 import numpy as np
 from dataclasses import dataclass
 from typing import List, Tuple
+from src.mission.route import Route
 
 @dataclass
 class Waypoint:
@@ -52,3 +53,16 @@ class LawnmowerPattern:
                 waypoints.append(Waypoint(x, self.min_y, self.altitude))
                 
         return waypoints
+
+    def generate_route(self) -> Route:
+        """
+        Generates the same pattern as generate() directly as a Route,
+        without building per-waypoint objects.
+        """
+        num_passes = int(np.ceil((self.max_x - self.min_x) / self.spacing))
+        x = np.minimum(self.min_x + np.arange(num_passes) * self.spacing, self.max_x)
+        # Even passes go North (min_y -> max_y), odd passes South
+        north = np.arange(num_passes) % 2 == 0
+        start_y = np.where(north, self.min_y, self.max_y)
+        end_y = np.where(north, self.max_y, self.min_y)
+        return Route.from_arrays(np.repeat(x, 2), np.column_stack([start_y, end_y]).ravel(), self.altitude)
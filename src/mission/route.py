@@ -0,0 +1,133 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Sequence, Tuple, Union
+
+@dataclass
+class RouteProgress:
+    leg: int # Leg index (from waypoint `leg` to `leg + 1`)
+    along_track: float # Distance flown along the route from its start (m)
+    cross_track: float # Signed distance from the leg line, positive right of track (m)
+    remaining: float # Route distance left to the final waypoint (m)
+    fraction: float # along_track / total length (0..1)
+
+class Route:
+    """
+    Polyline of 3D waypoints backed by NumPy arrays.
+
+    Leg geometry is computed once: leg i runs from waypoint i to i + 1 with
+    vector (dx, dy), unit direction, heading (0 = North, clockwise positive,
+    as in WaypointNavigator) and horizontal length; `cumulative[i]` is the
+    route distance at waypoint i. Queries are O(1) for a known leg and
+    O(log n) by distance, so they stay cheap for routes with tens of
+    thousands of legs.
+    """
+    def __init__(self, waypoints):
+        """
+        Args:
+            waypoints: (n, 3) array-like of (x, y, z), or a sequence of
+                       objects with x, y, z attributes (e.g. planner Waypoints).
+        """
+        if len(waypoints) and hasattr(waypoints[0], "x"):
+            waypoints = [(wp.x, wp.y, wp.z) for wp in waypoints]
+        points = np.array(waypoints, dtype=float).reshape(-1, 3)
+        if len(points) == 0:
+            raise ValueError("A route needs at least one waypoint")
+        self.points = points
+        self.points.flags.writeable = False
+
+        self.leg_vectors = np.diff(points[:, :2], axis=0)
+        self.leg_lengths = np.hypot(self.leg_vectors[:, 0], self.leg_vectors[:, 1])
+        self.headings = np.arctan2(self.leg_vectors[:, 0], self.leg_vectors[:, 1])
+        # Zero-length legs get a zero direction so projections onto them are 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.unit_vectors = np.where(self.leg_lengths[:, None] > 0.0,
+                                         self.leg_vectors / self.leg_lengths[:, None], 0.0)
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self.leg_lengths)])
+        self.total_length = float(self.cumulative[-1])
+
+    @classmethod
+    def from_arrays(cls, x, y, z) -> 'Route':
+        return cls(np.column_stack(np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                                       np.asarray(z, dtype=float))))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __getitem__(self, i: int) -> Tuple[float, float, float]:
+        x, y, z = self.points[i]
+        return float(x), float(y), float(z)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.points, dtype=dtype)
+
+    @property
+    def num_legs(self) -> int:
+        return len(self.points) - 1
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.points[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.points[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.points[:, 2]
+
+    def leg_at(self, distance):
+        """Leg containing the given route distance (clipped to the route), O(log n)."""
+        legs = np.searchsorted(self.cumulative, distance, side="right") - 1
+        return np.clip(legs, 0, max(self.num_legs - 1, 0))
+
+    def position_at(self, distance) -> Tuple:
+        """(x, y, z) at a route distance; altitude is interpolated along the leg."""
+        if self.num_legs == 0:
+            return tuple(np.broadcast_to(c, np.shape(distance)) for c in self.points[0])
+        distance = np.clip(distance, 0.0, self.total_length)
+        legs = self.leg_at(distance)
+        s = distance - self.cumulative[legs]
+        length = self.leg_lengths[legs]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = np.where(length > 0.0, s / length, 0.0)
+        start = self.points[legs]
+        end = self.points[legs + 1]
+        return tuple(start[..., k] + f * (end[..., k] - start[..., k]) for k in range(3))
+
+    def project(self, x, y, leg) -> Tuple:
+        """
+        Projects positions onto given legs, O(1) per position.
+
+        Args:
+            x, y: Positions (scalars or arrays).
+            leg: Leg index per position.
+
+        Returns:
+            (along_leg, cross_track): distance along the leg from its start
+            (unclipped, negative before it) and signed cross-track error,
+            positive right of track.
+        """
+        if self.num_legs == 0:
+            raise ValueError("A single-waypoint route has no legs")
+        rx = x - self.points[leg, 0]
+        ry = y - self.points[leg, 1]
+        ux = self.unit_vectors[leg, 0]
+        uy = self.unit_vectors[leg, 1]
+        return rx * ux + ry * uy, rx * uy - ry * ux
+
+    def progress(self, x: float, y: float, leg: int) -> RouteProgress:
+        """Along-track, cross-track and remaining distance relative to a leg."""
+        along_leg, cross = self.project(x, y, leg)
+        along = float(self.cumulative[leg] + np.clip(along_leg, 0.0, self.leg_lengths[leg]))
+        fraction = along / self.total_length if self.total_length > 0.0 else 1.0
+        return RouteProgress(int(leg), along, float(cross), self.total_length - along, fraction)
+
+RouteLike = Union[Route, Sequence[Tuple[float, float, float]]]
+
+def as_route(waypoints: RouteLike) -> Route:
+    """Returns `waypoints` if it already is a Route, else builds one."""
+    return waypoints if isinstance(waypoints, Route) else Route(waypoints)
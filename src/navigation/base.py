@@ -27,3 +27,13 @@ class Navigator(ABC):
             NavigationCommand: The commanded speed, heading, and altitude.
         """
         pass
+
+class ConstantCommandNavigator(Navigator):
+    """
+    Returns the same command every step (e.g. straight and level flight).
+    """
+    def __init__(self, command: NavigationCommand):
+        self.command = command
+
+    def get_command(self, current_state: State) -> NavigationCommand:
+        return NavigationCommand(self.command.speed, self.command.heading, self.command.altitude)
@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Sequence, Tuple, Union
+from src.navigation.waypoint import LOITER_HEADING_STEP
+from src.mission.route import RouteLike, as_route
+
+class BatchWaypointNavigator:
+    """
+    Waypoint following for a whole fleet in one vectorized call.
+
+    Per-vehicle waypoint indices, loop flags and acceptance radii are held
+    in arrays. Sequencing and loiter behaviour match WaypointNavigator
+    applied to each vehicle independently.
+    """
+    def __init__(self, routes: Sequence[RouteLike],
+                 speed: Union[float, Sequence[float]] = 50.0,
+                 acceptance_radius: Union[float, Sequence[float]] = 50.0,
+                 loop: Union[bool, Sequence[bool]] = False):
+        """
+        Args:
+            routes: One Route or list of (x, y, z) waypoints per vehicle.
+                    Routes may differ in length.
+            speed: Cruising speed (m/s), scalar or one per vehicle.
+            acceptance_radius: Distance (m) to consider a waypoint reached,
+                               scalar or one per vehicle.
+            loop: Restart each route when finished, scalar or one per vehicle.
+        """
+        routes = [as_route(r) for r in routes]
+        self.routes = routes
+        n = len(routes)
+        self.route_lengths = np.array([len(r) for r in routes], dtype=np.intp)
+        if n and self.route_lengths.min() == 0:
+            raise ValueError("Every vehicle needs at least one waypoint")
+
+        if n and all(route is routes[0] for route in routes):
+            # One route for everyone: a read-only stride-0 view, not n copies
+            self.waypoints = np.broadcast_to(routes[0].points, (n,) + routes[0].points.shape)
+        else:
+            # Routes padded to a common length; padding is never indexed
+            self.waypoints = np.zeros((n, int(self.route_lengths.max()) if n else 0, 3))
+            for i, route in enumerate(routes):
+                self.waypoints[i, :len(route)] = route.points
+
+        self.speed = np.broadcast_to(np.asarray(speed, dtype=float), (n,)).copy()
+        self.acceptance_radius = np.broadcast_to(np.asarray(acceptance_radius, dtype=float), (n,)).copy()
+        self.loop = np.broadcast_to(np.asarray(loop, dtype=bool), (n,)).copy()
+        self.current_waypoint_index = np.zeros(n, dtype=np.intp)
+        self._rows = np.arange(n)
+
+    @classmethod
+    def shared(cls, waypoints: RouteLike, n_vehicles: int, **kwargs) -> 'BatchWaypointNavigator':
+        """
+        Creates a navigator where every vehicle flies the same route. The
+        route is stored once, whatever the fleet size.
+        """
+        return cls([as_route(waypoints)] * n_vehicles, **kwargs)
+
+    def __len__(self) -> int:
+        return self._rows.size
+
+    def get_commands(self, xs: np.ndarray, ys: np.ndarray, psis: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculates commands for every vehicle.
+
+        Args:
+            xs, ys, psis: Current positions and headings, one per vehicle.
+
+        Returns:
+            (speeds, headings, altitudes) arrays.
+        """
+        last = self.route_lengths - 1
+        target = self.waypoints[self._rows, np.minimum(self.current_waypoint_index, last)]
+        dx = target[:, 0] - xs
+        dy = target[:, 1] - ys
+        altitudes = target[:, 2]
+
+        reached = np.hypot(dx, dy) < self.acceptance_radius
+        at_last = self.current_waypoint_index >= last
+        loiter = reached & at_last & ~self.loop
+        restart = reached & at_last & self.loop
+        advance = reached & ~at_last
+
+        self.current_waypoint_index[restart] = 0
+        self.current_waypoint_index[advance] += 1
+
+        # Retarget vehicles that moved on to a new waypoint
+        retarget = restart | advance
+        if np.any(retarget):
+            rows = self._rows[retarget]
+            new_target = self.waypoints[rows, self.current_waypoint_index[rows]]
+            dx[retarget] = new_target[:, 0] - xs[retarget]
+            dy[retarget] = new_target[:, 1] - ys[retarget]
+            altitudes[retarget] = new_target[:, 2]
+
+        headings = np.arctan2(dx, dy)
+        # Loiter: keep turning around the final waypoint
+        headings[loiter] = psis[loiter] + LOITER_HEADING_STEP
+
+        return self.speed.copy(), headings, altitudes
+
+    def get_fleet_commands(self, fleet) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convenience wrapper taking an AircraftFleet."""
+        return self.get_commands(fleet.x, fleet.y, fleet.psi)
@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Optional
+from src.vehicle.aircraft import State
+from src.vehicle.fleet import AircraftFleet
+from src.world.environment import World
+
+class ParticleFilter:
+    """
+    Map-matching particle filter for magnetic navigation (MagNav).
+
+    Particles are propagated with the Aircraft kinematics (as an
+    AircraftFleet), weighted against scalar magnetometer readings with one
+    vectorized map lookup, and resampled with a low-variance scheme.
+    """
+    def __init__(self, world: World, n_particles: int = 10000, measurement_std: float = 5.0,
+                 speed_std: float = 1.0, heading_std: float = 0.02, position_std: float = 2.0,
+                 resample_threshold: float = 0.5, seed: Optional[int] = None):
+        """
+        Args:
+            world: Map used to predict measurements.
+            n_particles: Number of particles.
+            measurement_std: Assumed magnetometer plus map error (nT).
+            speed_std: Process noise on the commanded speed (m/s).
+            heading_std: Process noise on the commanded heading (rad).
+            position_std: Extra position diffusion per step (m).
+            resample_threshold: Resample when the effective sample size drops
+                                below this fraction of n_particles.
+            seed: Optional seed for reproducible runs.
+        """
+        self.world = world
+        self.n_particles = n_particles
+        self.measurement_std = measurement_std
+        self.speed_std = speed_std
+        self.heading_std = heading_std
+        self.position_std = position_std
+        self.resample_threshold = resample_threshold
+        self.rng = np.random.default_rng(seed)
+        self.particles = AircraftFleet(n_particles)
+        self.weights = np.full(n_particles, 1.0 / n_particles)
+        self.initialized = False
+
+    def initialize(self, state: State, position_std: float = 30.0, heading_std: float = 0.05):
+        """
+        Spreads the particles around a prior state (e.g. the last GPS fix).
+        """
+        n = self.n_particles
+        self.particles.x[:] = state.x + self.rng.normal(0.0, position_std, n)
+        self.particles.y[:] = state.y + self.rng.normal(0.0, position_std, n)
+        self.particles.z[:] = state.z
+        self.particles.psi[:] = state.psi + self.rng.normal(0.0, heading_std, n)
+        self.particles.v[:] = state.v
+        self.weights.fill(1.0 / n)
+        self.initialized = True
+
+    def predict(self, dt: float, speed: float, heading: float, altitude: float):
+        """
+        Propagates all particles with the commanded speed and heading.
+
+        Args:
+            dt: Time step (s).
+            speed, heading: Command applied over the step.
+            altitude: Measured altitude (altimeter), assigned to every particle.
+        """
+        n = self.n_particles
+        speeds = speed + self.rng.normal(0.0, self.speed_std, n)
+        headings = heading + self.rng.normal(0.0, self.heading_std, n)
+        self.particles.update(dt, speeds, headings, altitude)
+        self.particles.z[:] = altitude
+        if self.position_std > 0.0:
+            self.particles.x += self.rng.normal(0.0, self.position_std, n)
+            self.particles.y += self.rng.normal(0.0, self.position_std, n)
+
+    def update(self, measurement: float):
+        """
+        Re-weights particles by the likelihood of a magnetometer reading and
+        resamples when the weights degenerate.
+        """
+        p = self.particles
+        expected = self.world.get_magnetic_field_batch(p.x, p.y, p.z)
+        log_likelihood = -0.5 * ((measurement - expected) / self.measurement_std) ** 2
+
+        # Work in log space to avoid underflow when the filter is far off
+        log_weights = np.log(np.maximum(self.weights, 1e-300)) + log_likelihood
+        log_weights -= log_weights.max()
+        self.weights = np.exp(log_weights)
+        self.weights /= self.weights.sum()
+
+        if self.effective_sample_size() < self.resample_threshold * self.n_particles:
+            self.resample()
+
+    def effective_sample_size(self) -> float:
+        return 1.0 / np.sum(self.weights ** 2)
+
+    def resample(self):
+        """
+        Low-variance (systematic) resampling: one random offset, n evenly
+        spaced pointers into the cumulative weights.
+        """
+        n = self.n_particles
+        positions = (self.rng.random() + np.arange(n)) / n
+        cumulative = np.cumsum(self.weights)
+        cumulative[-1] = 1.0
+        idx = np.searchsorted(cumulative, positions)
+        p = self.particles
+        for arr in (p.x, p.y, p.z, p.psi, p.v):
+            arr[:] = arr[idx]
+        self.weights.fill(1.0 / n)
+
+    def estimate(self) -> State:
+        """
+        Weighted mean state (circular mean for heading).
+        """
+        p = self.particles
+        w = self.weights
+        psi = np.arctan2(np.dot(w, np.sin(p.psi)), np.dot(w, np.cos(p.psi)))
+        return State(x=float(np.dot(w, p.x)), y=float(np.dot(w, p.y)), z=float(np.dot(w, p.z)),
+                     psi=float(psi), v=float(np.dot(w, p.v)))
+
+    def position_std_estimate(self) -> float:
+        """RMS horizontal spread of the particle cloud (m)."""
+        p = self.particles
+        w = self.weights
+        mx, my = np.dot(w, p.x), np.dot(w, p.y)
+        return float(np.sqrt(np.dot(w, (p.x - mx) ** 2 + (p.y - my) ** 2)))
@@ -0,0 +1,132 @@
+import numpy as np
+from dataclasses import dataclass
+from src.world.environment import World
+
+@dataclass
+class ProfileFix:
+    x: float # Corrected position of the last reading
+    y: float
+    offset_x: float # Correction added to the dead-reckoned track (m)
+    offset_y: float
+    score: float # Peak normalized cross-correlation (-1..1)
+    peak_to_sidelobe: float # Peak height above the rest of the surface, in standard deviations
+    surface: np.ndarray # NCC for every candidate offset, indexed [iy, ix]
+    offsets_x: np.ndarray # Offset (m) of each surface column
+    offsets_y: np.ndarray # Offset (m) of each surface row
+
+class ProfileMatcher:
+    """
+    TERCOM-style batch position fixing.
+
+    A window of magnetometer readings along a dead-reckoned track is
+    correlated against the map for every candidate (x, y) offset at once.
+    Masked normalized cross-correlation is evaluated with three FFT
+    correlations (track values, track mask against map and map^2), so the
+    cost does not depend on the number of offsets in a Python loop.
+    """
+    def __init__(self, world: World, search_radius: float = 1000.0, exclusion_radius: float = 50.0):
+        """
+        Args:
+            world: Reference map.
+            search_radius: Half-width (m) of the square offset search window.
+            exclusion_radius: Radius (m) around the peak excluded when
+                              computing the peak-to-sidelobe ratio.
+        """
+        self.world = world
+        self.search_radius = search_radius
+        self.exclusion_radius = exclusion_radius
+
+    def match(self, readings: np.ndarray, track_x: np.ndarray, track_y: np.ndarray, z: float) -> ProfileFix:
+        """
+        Args:
+            readings: Magnetometer readings (nT).
+            track_x, track_y: Dead-reckoned position of each reading (m). Only
+                              the relative shape of the track needs to be right;
+                              a constant offset is what the matcher solves for.
+            z: Flight altitude (m) used to pick the continued map layer.
+
+        Returns:
+            ProfileFix with the best offset and the full correlation surface.
+        """
+        from scipy.signal import fftconvolve
+
+        readings = np.asarray(readings, dtype=float)
+        track_x = np.asarray(track_x, dtype=float)
+        track_y = np.asarray(track_y, dtype=float)
+        res = self.world.config.resolution
+        radius = int(np.ceil(self.search_radius / res))
+
+        # Rasterize the profile onto map pixels: per-pixel sample count and
+        # mean (centred) reading.
+        ix = np.rint(track_x / res - 0.5).astype(np.intp)
+        iy = np.rint(track_y / res - 0.5).astype(np.intp)
+        x0, y0 = ix.min(), iy.min()
+        kernel_shape = (iy.max() - y0 + 1, ix.max() - x0 + 1)
+        flat = (iy - y0) * kernel_shape[1] + (ix - x0)
+        counts = np.bincount(flat, minlength=kernel_shape[0] * kernel_shape[1]).astype(float)
+        sums = np.bincount(flat, weights=readings, minlength=counts.size)
+        weights = counts.reshape(kernel_shape)
+        values = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0).reshape(kernel_shape)
+        total_weight = weights.sum()
+        values -= np.sum(weights * values) / total_weight
+        values[weights == 0] = 0.0
+        weighted_values = weights * values
+        profile_norm = np.sqrt(np.sum(weighted_values * values))
+
+        # Map region covering the track shifted by every candidate offset.
+        # Anomaly relative to the background keeps the map^2 term well conditioned.
+        region = self._map_region(z, y0 - radius, y0 + kernel_shape[0] + radius,
+                                  x0 - radius, x0 + kernel_shape[1] + radius)
+        region -= self.world.background_field
+
+        def correlate(image, kernel):
+            return fftconvolve(image, kernel[::-1, ::-1], mode='valid')
+
+        numerator = correlate(region, weighted_values)
+        map_sum = correlate(region, weights)
+        map_sq = correlate(region ** 2, weights)
+        map_var = np.maximum(map_sq - map_sum ** 2 / total_weight, 0.0)
+        denominator = profile_norm * np.sqrt(map_var)
+        valid = denominator > 1e-9 * max(profile_norm, 1.0)
+        surface = np.where(valid, numerator / np.where(valid, denominator, 1.0), -1.0)
+
+        best_y, best_x = np.unravel_index(np.argmax(surface), surface.shape)
+        sub_y = _parabolic_peak(surface[max(best_y - 1, 0):best_y + 2, best_x], best_y)
+        sub_x = _parabolic_peak(surface[best_y, max(best_x - 1, 0):best_x + 2], best_x)
+        offset_x = (sub_x - radius) * res
+        offset_y = (sub_y - radius) * res
+
+        offsets = (np.arange(2 * radius + 1) - radius) * res
+        yy, xx = np.meshgrid(offsets, offsets, indexing='ij')
+        sidelobe = surface[(yy - offsets[best_y]) ** 2 + (xx - offsets[best_x]) ** 2 > self.exclusion_radius ** 2]
+        peak = float(surface[best_y, best_x])
+        psr = (peak - sidelobe.mean()) / (sidelobe.std() + 1e-12) if sidelobe.size else float('inf')
+
+        return ProfileFix(x=float(track_x[-1] + offset_x), y=float(track_y[-1] + offset_y),
+                          offset_x=float(offset_x), offset_y=float(offset_y),
+                          score=peak, peak_to_sidelobe=float(psr), surface=surface,
+                          offsets_x=offsets, offsets_y=offsets)
+
+    def _map_region(self, z: float, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """
+        Pixel window [y0:y1, x0:x1] of the layer at altitude z; pixels off the
+        map read as the background field.
+        """
+        layer = self.world.layer(z)
+        height_px, width_px = layer.shape
+        region = np.full((y1 - y0, x1 - x0), self.world.background_field)
+        cy0, cy1 = max(y0, 0), min(y1, height_px)
+        cx0, cx1 = max(x0, 0), min(x1, width_px)
+        if cy0 < cy1 and cx0 < cx1:
+            region[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] = layer[cy0:cy1, cx0:cx1]
+        return region
+
+def _parabolic_peak(values: np.ndarray, index: int) -> float:
+    """Sub-pixel peak position from a 3-point parabola (falls back to index)."""
+    if values.size != 3:
+        return float(index)
+    left, centre, right = values
+    curvature = left - 2.0 * centre + right
+    if curvature >= 0.0:
+        return float(index)
+    return index + 0.5 * (left - right) / curvature
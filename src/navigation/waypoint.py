@@ -1,28 +1,68 @@
 import numpy as np
-from typing import List, Tuple
+from typing import Optional, Tuple
+from src.core.metrics import Metrics, NULL_METRICS
 from src.vehicle.aircraft import State
 from src.navigation.base import Navigator, NavigationCommand
+from src.mission.route import Route, RouteLike, RouteProgress, as_route
+
+LOITER_HEADING_STEP = 0.2 # Heading increment (rad) commanded per step while loitering
 
 class WaypointNavigator(Navigator):
     """
     Navigates through a sequence of 3D waypoints.
     """
-    def __init__(self, waypoints: List[Tuple[float, float, float]], speed: float = 50.0, acceptance_radius: float = 50.0, loop: bool = False):
+    def __init__(self, waypoints: RouteLike, speed: float = 50.0, acceptance_radius: float = 50.0, loop: bool = False,
+                 metrics: Optional[Metrics] = None):
         """
         Args:
-            waypoints: List of (x, y, z) tuples.
+            waypoints: Route, or list of (x, y, z) tuples.
             speed: Desired cruising speed (m/s).
             acceptance_radius: Distance (m) to waypoint to consider it reached.
             loop: If True, restart sequence from beginning when finished.
+            metrics: Optional Metrics receiving waypoint transition counters.
         """
-        self.waypoints = waypoints
+        self.route = as_route(waypoints)
         self.speed = speed
         self.acceptance_radius = acceptance_radius
         self.loop = loop
         self.current_waypoint_index = 0
+        self.finished = False # Set once the last waypoint is reached without looping
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self._target_index = -1 # Waypoint index of the cached _target
+        self._target = (0.0, 0.0, 0.0)
+
+    @property
+    def waypoints(self) -> Route:
+        return self.route
+
+    @waypoints.setter
+    def waypoints(self, waypoints: RouteLike):
+        self.route = as_route(waypoints)
+        self._target_index = -1
+
+    def _target_waypoint(self) -> Tuple[float, float, float]:
+        # Target as Python floats, refreshed only when the index changes
+        i = min(self.current_waypoint_index, len(self.route) - 1)
+        if i != self._target_index:
+            self._target = self.route[i]
+            self._target_index = i
+        return self._target
+
+    def progress(self, current_state: State) -> RouteProgress:
+        """
+        Along-track, cross-track and remaining distance on the leg ending at
+        the current target waypoint (the first leg while heading for the
+        first waypoint). O(1). A single-waypoint route has no legs, so its
+        fraction is just 0 before the waypoint is reached and 1 after.
+        """
+        if self.route.num_legs == 0:
+            done = 1.0 if self.finished else 0.0
+            return RouteProgress(0, 0.0, 0.0, 0.0, done)
+        leg = min(max(self.current_waypoint_index - 1, 0), self.route.num_legs - 1)
+        return self.route.progress(current_state.x, current_state.y, leg)
         
     def get_command(self, current_state: State) -> NavigationCommand:
-        target_x, target_y, target_z = self.waypoints[min(self.current_waypoint_index, len(self.waypoints)-1)]
+        target_x, target_y, target_z = self._target_waypoint()
 
         # Check if we have passed all waypoints and are effectively "done" (needing loiter)
         # Note: We check if we are AT the last waypoint inside the reach check below.
@@ -36,21 +76,28 @@ class WaypointNavigator(Navigator):
             # We reached the target.
             
             # If we were targeting the last waypoint:
-            if self.current_waypoint_index >= len(self.waypoints) - 1:
+            if self.current_waypoint_index >= len(self.route) - 1:
                 if self.loop:
                     self.current_waypoint_index = 0
+                    self.metrics.inc("navigator.waypoint_reached")
+                    self.metrics.inc("navigator.route_completed")
                 else:
+                    if not self.finished:
+                        self.metrics.inc("navigator.waypoint_reached")
+                        self.metrics.inc("navigator.route_completed")
+                    self.finished = True
                     # Loiter mode: Just circle around the target (or just constant turn)
                     # Simple loiter: turn rate.
                     # Let's just command a heading that changes.
                     # Or simpler: return a command with a specialized "turn rate" if our interface supported it.
                     # Since we only return heading, we simulate a turn by commanding current_heading + small_delta
-                    return NavigationCommand(speed=self.speed, heading=current_state.psi + 0.2, altitude=target_z)
+                    return NavigationCommand(speed=self.speed, heading=current_state.psi + LOITER_HEADING_STEP, altitude=target_z)
             else:
                 self.current_waypoint_index += 1
+                self.metrics.inc("navigator.waypoint_reached")
             
             # Update target to new index
-            target_x, target_y, target_z = self.waypoints[self.current_waypoint_index]
+            target_x, target_y, target_z = self._target_waypoint()
             dx = target_x - current_state.x
             dy = target_y - current_state.y
             
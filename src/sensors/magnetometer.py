@@ -1,14 +1,30 @@
 import numpy as np
+from typing import Optional
 from src.world.environment import World
+from src.core.metrics import Metrics, NULL_METRICS
 
 class Magnetometer:
     """
     Simulates a scalar magnetometer.
     """
-    def __init__(self, noise_std: float = 0.1, bias: float = 0.0):
+    def __init__(self, noise_std: float = 0.1, bias: float = 0.0, seed: Optional[int] = None,
+                 block_size: int = 0, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            noise_std: Standard deviation of the measurement noise (nT).
+            bias: Constant measurement bias (nT).
+            seed: Optional seed for reproducible noise.
+            block_size: If > 0, noise is pre-generated in blocks of this many
+                        samples and served from a buffer (streaming mode).
+            metrics: Optional Metrics counting readings.
+        """
         self.noise_std = noise_std
         self.bias = bias
-        self.rng = np.random.default_rng()
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._noise_buffer = np.empty(0)
+        self._noise_pos = 0
+        self.metrics = metrics if metrics is not None else NULL_METRICS
 
     def read(self, world: World, x: float, y: float, z: float) -> float:
         """
@@ -21,9 +37,54 @@ class Magnetometer:
         Returns:
             Measured magnetic field intensity (nT).
         """
+        self.metrics.inc("magnetometer.reads")
         true_value = world.get_magnetic_field(x, y, z)
         
-        noise = self.rng.normal(0, self.noise_std)
+        if self.block_size > 0:
+            noise = self._take_noise(1)[0]
+        else:
+            noise = self.rng.normal(0, self.noise_std)
         reading = true_value + self.bias + noise
         
         return reading
+
+    def read_batch(self, world: World, xs, ys, zs) -> np.ndarray:
+        """
+        Takes readings at many positions in one vectorized call,
+        e.g. a whole flight record.
+        
+        Args:
+            world: The World object containing the magnetic map.
+            xs, ys, zs: Array-likes of positions (broadcast against each other).
+            
+        Returns:
+            Array of measured intensities (nT).
+        """
+        true_values = world.get_magnetic_field_batch(xs, ys, zs)
+        self.metrics.inc("magnetometer.batch_reads")
+        self.metrics.inc("magnetometer.reads", true_values.size)
+        
+        if self.block_size > 0:
+            noise = self._take_noise(true_values.size).reshape(true_values.shape)
+        else:
+            noise = self.rng.normal(0, self.noise_std, true_values.shape)
+        
+        return true_values + self.bias + noise
+
+    def _take_noise(self, n: int) -> np.ndarray:
+        """
+        Serves n noise samples from the pre-generated buffer, refilling it
+        one block at a time. The buffer holds unit normals so noise_std can
+        be changed between reads.
+        """
+        out = np.empty(n)
+        filled = 0
+        while filled < n:
+            if self._noise_pos >= self._noise_buffer.size:
+                self._noise_buffer = self.rng.standard_normal(self.block_size)
+                self._noise_pos = 0
+            take = min(n - filled, self._noise_buffer.size - self._noise_pos)
+            out[filled:filled + take] = self._noise_buffer[self._noise_pos:self._noise_pos + take]
+            self._noise_pos += take
+            filled += take
+        return out * self.noise_std
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import dataclass, field, asdict
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.world.environment import World, MapConfig
+from src.world.store import MapStore
+from src.world.shared import SharedWorld, SharedWorldHandle, attach_world, detach_world
+from src.vehicle.aircraft import Aircraft, State
+from src.sensors.magnetometer import Magnetometer
+from src.agent.context import AgentContext, OrganizationContext, PlatformContext, MissionContext, SituationContext
+from src.agent.core import Agent
+from src.navigation.particle_filter import ParticleFilter
+from src.simulation.runner import SimulationRunner
+
+DEFAULT_WAYPOINTS = [
+    (100.0, 4000.0, 100.0),
+    (4000.0, 4000.0, 100.0),
+    (4000.0, 100.0, 100.0),
+    (100.0, 100.0, 100.0)
+]
+
+@dataclass
+class Scenario:
+    """
+    One agent jamming run. Defaults reproduce run_agent_sim.py.
+    """
+    map_seed: int = 42
+    jam_start: float = 200.0 # s
+    jam_end: float = 400.0 # s
+    jam_variance: float = 10.0
+    nominal_variance: float = 0.1
+    noise_std: float = 2.0 # Magnetometer noise (nT)
+    n_particles: int = 10000 # MagNav particle filter size (0 = truth state in MAG_NAV)
+    measurement_std: float = 5.0 # Particle filter measurement noise (nT)
+    waypoints: List[Tuple[float, float, float]] = field(default_factory=lambda: list(DEFAULT_WAYPOINTS))
+    duration: float = 600.0 # s
+    dt: float = 0.5
+    map_size: float = 5000.0 # m
+    resolution: float = 10.0 # m/px
+
+    @property
+    def run_id(self) -> str:
+        """Stable identifier derived from the parameters, used for resuming."""
+        payload = json.dumps(asdict(self), sort_keys=True).encode()
+        return hashlib.sha1(payload).hexdigest()[:16]
+
+    def gps_variance(self, t: float) -> float:
+        if self.jam_start < t < self.jam_end:
+            return self.jam_variance
+        return self.nominal_variance
+
+def grid_scenarios(**params: Iterable) -> List[Scenario]:
+    """
+    Cartesian product over Scenario fields, e.g.
+    grid_scenarios(map_seed=[1, 2], jam_variance=[6.0, 20.0]).
+    """
+    names = list(params)
+    return [Scenario(**dict(zip(names, values))) for values in product(*(params[n] for n in names))]
+
+def random_scenarios(n: int, seed: Optional[int] = None, map_seeds: Tuple[int, int] = (0, 1000),
+                     jam_start: Tuple[float, float] = (50.0, 300.0), jam_length: Tuple[float, float] = (50.0, 250.0),
+                     jam_variance: Tuple[float, float] = (5.0, 50.0), noise_std: Tuple[float, float] = (0.5, 10.0),
+                     **fixed) -> List[Scenario]:
+    """
+    Random scenario draws. Ranges are (low, high); `fixed` sets any other field.
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = []
+    for _ in range(n):
+        start = float(rng.uniform(*jam_start))
+        scenarios.append(Scenario(
+            map_seed=int(rng.integers(*map_seeds)),
+            jam_start=start,
+            jam_end=start + float(rng.uniform(*jam_length)),
+            jam_variance=float(rng.uniform(*jam_variance)),
+            noise_std=float(rng.uniform(*noise_std)),
+            **fixed
+        ))
+    return scenarios
+
+# Worlds built in this process, reused across the scenarios a worker runs.
+# Bounded LRU: a campaign over many map seeds must not keep every map alive.
+MAX_CACHED_WORLDS = 2
+_WORLDS: "OrderedDict[Tuple, World]" = OrderedDict()
+
+def _world_key(scenario: Scenario) -> Tuple:
+    return (scenario.map_seed, scenario.map_size, scenario.resolution)
+
+def _get_world(scenario: Scenario, store_root: Optional[str],
+               shared: Optional[Dict[Tuple, SharedWorldHandle]] = None) -> World:
+    key = _world_key(scenario)
+    world = _WORLDS.get(key)
+    if world is not None:
+        _WORLDS.move_to_end(key)
+        return world
+    if shared and key in shared:
+        world = attach_world(shared[key])
+    else:
+        world = _build_world(scenario, store_root)
+    _WORLDS[key] = world
+    while len(_WORLDS) > MAX_CACHED_WORLDS:
+        _, evicted = _WORLDS.popitem(last=False)
+        if getattr(evicted, '_shared_segments', None):
+            detach_world(evicted)
+    return world
+
+def _build_world(scenario: Scenario, store_root: Optional[str]) -> World:
+    config = MapConfig(width=scenario.map_size, height=scenario.map_size,
+                       resolution=scenario.resolution, seed=scenario.map_seed)
+    return World(config, store=MapStore(store_root) if store_root else None)
+
+def run_scenario(scenario: Scenario, store_root: Optional[str] = None,
+                 shared: Optional[Dict[Tuple, SharedWorldHandle]] = None, sample_field: bool = True) -> Dict:
+    """
+    Runs one scenario and returns its outcome metrics.
+
+    Args:
+        sample_field: Record the field along the track for the
+                      mean_measurement statistic. This uses a separate
+                      magnetometer, so it never changes the agent's run.
+    """
+    world = _get_world(scenario, store_root, shared)
+    start = scenario.waypoints[-1]
+    initial_state = State(x=start[0], y=start[1], z=start[2], psi=0.0, v=50.0)
+    aircraft = Aircraft(initial_state)
+
+    context = AgentContext(
+        OrganizationContext("Red Tails", "Red-1", 123.45),
+        PlatformContext(max_speed=100.0, max_altitude=1000.0, sensors_list=["GPS", "Magnetometer"]),
+        MissionContext(objectives=["Patrol"], waypoints=scenario.waypoints, risk_tolerance=0.5),
+        SituationContext(estimated_state=initial_state),
+    )
+    mag = Magnetometer(noise_std=scenario.noise_std, seed=scenario.map_seed)
+    estimator = None
+    if scenario.n_particles > 0:
+        estimator = ParticleFilter(world, n_particles=scenario.n_particles,
+                                   measurement_std=scenario.measurement_std, seed=scenario.map_seed)
+    agent = Agent(context, aircraft, world=world, magnetometer=mag, estimator=estimator)
+
+    # Own noise stream: survey reads must not advance the agent's magnetometer RNG
+    survey_mag = Magnetometer(noise_std=scenario.noise_std, seed=[scenario.map_seed, 1]) if sample_field else None
+    runner = SimulationRunner(aircraft, dt=scenario.dt, agent=agent, world=world, sensor=survey_mag,
+                              gps_variance=scenario.gps_variance)
+    result = runner.run(duration=scenario.duration)
+    return compute_metrics(scenario, result)
+
+def compute_metrics(scenario: Scenario, result) -> Dict:
+    """
+    Outcome metrics of one run: mode-switch times, time in MAG_NAV and
+    deviation of the flown path from the (looping) route polyline.
+    """
+    in_mag = result.modes == "MAG_NAV"
+    switches = np.flatnonzero(result.modes[1:] != result.modes[:-1]) + 1
+    mag_idx = np.flatnonzero(in_mag)
+    first_mag = float(result.t[mag_idx[0]]) if mag_idx.size else float('nan')
+    recovered = np.flatnonzero(~in_mag & (result.t > first_mag)) if mag_idx.size else np.empty(0, dtype=int)
+    record_dt = float(np.median(np.diff(result.t))) if result.t.size > 1 else scenario.dt
+
+    deviation = route_deviation(result.x, result.y, scenario.waypoints)
+    return {
+        "run_id": scenario.run_id,
+        "status": "ok",
+        **asdict(scenario),
+        "mag_nav_switch_time": first_mag,
+        "switch_latency": first_mag - scenario.jam_start,
+        "gps_recovery_time": float(result.t[recovered[0]]) if recovered.size else float('nan'),
+        "mode_switches": int(switches.size),
+        "time_in_mag_nav": float(in_mag.sum() * record_dt),
+        "mean_path_deviation": float(deviation.mean()) if deviation.size else float('nan'),
+        "max_path_deviation": float(deviation.max()) if deviation.size else float('nan'),
+        "mean_measurement": float(result.measurements.mean()) if result.measurements.size else float('nan'),
+    }
+
+def route_deviation(xs: np.ndarray, ys: np.ndarray, waypoints: List[Tuple[float, float, float]]) -> np.ndarray:
+    """
+    Distance from each point to the nearest leg of the closed route polyline.
+    """
+    wp = np.asarray(waypoints, dtype=float)[:, :2]
+    a = wp
+    b = np.roll(wp, -1, axis=0)
+    ab = b - a
+    length2 = np.maximum((ab ** 2).sum(axis=1), 1e-12)
+    p = np.column_stack((xs, ys))[:, None, :]
+    t = np.clip(((p - a) * ab).sum(axis=2) / length2, 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    return np.sqrt(((p - closest) ** 2).sum(axis=2)).min(axis=1)
+
+def _run_safely(scenario: Scenario, store_root: Optional[str],
+                shared: Optional[Dict[Tuple, SharedWorldHandle]]) -> Dict:
+    try:
+        return run_scenario(scenario, store_root, shared)
+    except Exception as exc:
+        return {"run_id": scenario.run_id, "status": "error", "error": repr(exc), **asdict(scenario)}
+
+class CampaignRunner:
+    """
+    Runs many scenarios in a process pool, streaming one JSON line per
+    finished run to `results_path`. Runs already recorded as successful
+    are skipped, so an interrupted campaign can simply be restarted.
+    """
+    def __init__(self, results_path: str, workers: Optional[int] = None, store_root: Optional[str] = None,
+                 share_worlds: bool = False):
+        """
+        Args:
+            results_path: JSONL file receiving one result row per run.
+            workers: Process count (defaults to os.cpu_count()).
+            store_root: Optional MapStore directory so workers load maps
+                        memory-mapped instead of regenerating them.
+            share_worlds: Build each map once in this process and publish it
+                          (with the layers at the route and MAG_NAV altitudes)
+                          to the workers through shared memory.
+        """
+        self.results_path = results_path
+        self.workers = workers
+        self.store_root = store_root
+        self.share_worlds = share_worlds
+
+    def completed_run_ids(self) -> set:
+        if not os.path.exists(self.results_path):
+            return set()
+        done = set()
+        with open(self.results_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # Partial line from an interrupted run
+                if row.get("status") == "ok":
+                    done.add(row["run_id"])
+        return done
+
+    def run(self, scenarios: List[Scenario]) -> Dict[str, np.ndarray]:
+        """
+        Runs all pending scenarios and returns the full result table.
+        """
+        done = self.completed_run_ids()
+        pending = {}
+        for scenario in scenarios:
+            if scenario.run_id not in done:
+                pending.setdefault(scenario.run_id, scenario)
+
+        if pending:
+            directory = os.path.dirname(os.path.abspath(self.results_path))
+            os.makedirs(directory, exist_ok=True)
+            by_map = {}
+            for scenario in pending.values():
+                by_map.setdefault(_world_key(scenario), []).append(scenario)
+
+            with ExitStack() as stack:
+                shared = {}
+                if self.store_root or self.share_worlds:
+                    # Build each map once up front so workers only ever read it
+                    # (kept out of _WORLDS so forked workers load or attach it rather than inherit a copy)
+                    for key, group in by_map.items():
+                        world = _build_world(group[0], self.store_root)
+                        if self.share_worlds:
+                            # Route altitudes plus the MAG_NAV low-fly altitude
+                            altitudes = {wp[2] for s in group for wp in s.waypoints} | {50.0}
+                            shared[key] = stack.enter_context(SharedWorld(world, sorted(altitudes))).handle
+
+                out = stack.enter_context(open(self.results_path, "a"))
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=self.workers))
+                # Submitted map by map, so each worker mostly reuses its cached world
+                futures = [pool.submit(_run_safely, s, self.store_root, shared)
+                           for group in by_map.values() for s in group]
+                for future in as_completed(futures):
+                    out.write(json.dumps(future.result()) + "\n")
+                    out.flush()
+
+        return load_results(self.results_path)
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    """
+    Loads a campaign JSONL file as a column table (dict of arrays).
+    The last row written for a run_id wins.
+    """
+    rows = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows[row["run_id"]] = row
+
+    columns = []
+    for row in rows.values():
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    table = {}
+    for key in columns:
+        values = [row.get(key) for row in rows.values()]
+        if key == "waypoints" or any(isinstance(v, (list, dict)) for v in values):
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            table[key] = column
+        else:
+            table[key] = np.array(values)
+    return table
+
+if __name__ == "__main__":
+    import sys
+    scenarios = grid_scenarios(map_seed=[42, 43], jam_variance=[6.0, 10.0, 20.0], noise_std=[1.0, 5.0])
+    table = CampaignRunner(sys.argv[1] if len(sys.argv) > 1 else "campaign_results.jsonl").run(scenarios)
+    for run_id, latency, mag_time in zip(table["run_id"], table["switch_latency"], table["time_in_mag_nav"]):
+        print(f"{run_id}  switch latency {latency:6.1f}s  time in MAG_NAV {mag_time:6.1f}s")
@@ -0,0 +1,112 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from src.vehicle.aircraft import State, CLIMB_GAIN
+from src.navigation.waypoint import WaypointNavigator
+
+@dataclass
+class LegPlan:
+    """
+    Straight legs flown between waypoint events, as arrays (one entry per leg).
+    """
+    t0: np.ndarray # Start time of each leg (s)
+    duration: np.ndarray # Leg duration (s)
+    x0: np.ndarray # Position at the start of the leg
+    y0: np.ndarray
+    z0: np.ndarray
+    psi: np.ndarray # Heading flown along the leg (rad)
+    target_z: np.ndarray # Commanded altitude during the leg (m)
+    speed: float
+    end_time: float # Time the plan stops (last event or the duration limit)
+    finished: bool # The last waypoint was reached (non-looping routes)
+
+    def positions(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aircraft position and heading at times t (s) within [t0[0], end_time].
+
+        Returns:
+            (x, y, z, psi) arrays.
+        """
+        t = np.asarray(t, dtype=float)
+        leg = np.clip(np.searchsorted(self.t0, t, side='right') - 1, 0, max(self.t0.size - 1, 0))
+        tau = t - self.t0[leg]
+        psi = self.psi[leg]
+        x = self.x0[leg] + self.speed * np.sin(psi) * tau
+        y = self.y0[leg] + self.speed * np.cos(psi) * tau
+        target = self.target_z[leg]
+        z = target + (self.z0[leg] - target) * np.exp(-CLIMB_GAIN * tau)
+        return x, y, z, psi
+
+def plan_waypoint_legs(state: State, navigator: WaypointNavigator, t_start: float = 0.0,
+                       duration: Optional[float] = None) -> LegPlan:
+    """
+    Closed-form waypoint following for the Aircraft kinematics.
+
+    With instant speed/heading response every leg is a straight line at the
+    bearing of its waypoint, flown until the waypoint is within the
+    acceptance radius; altitude follows the climb controller's exact
+    solution z(t) = z_c + (z_0 - z_c) exp(-CLIMB_GAIN t). Advances the
+    navigator's waypoint index (and finished flag) to where the plan ends.
+
+    Args:
+        state: Aircraft state at t_start.
+        navigator: Waypoint sequence, speed and acceptance radius.
+        t_start: Simulation time of `state` (s).
+        duration: Time limit (s). Required for looping routes; non-looping
+                  routes stop at the last waypoint (no loiter is modelled).
+
+    Returns:
+        LegPlan covering [t_start, end_time].
+    """
+    if navigator.loop and duration is None:
+        raise ValueError("A looping route needs a duration")
+    speed = float(navigator.speed)
+    if speed <= 0.0:
+        raise ValueError("Event integration needs a positive speed")
+    waypoints = navigator.route.points
+    n_wp = len(waypoints)
+    radius = navigator.acceptance_radius
+    t_limit = t_start + duration if duration is not None else np.inf
+
+    legs = []
+    x, y, z, psi = state.x, state.y, state.z, state.psi
+    t = t_start
+    idle_events = 0 # Consecutive waypoints accepted without flying
+    arrived = False # The last leg ended on the acceptance radius
+    while not navigator.finished and t < t_limit:
+        i = min(navigator.current_waypoint_index, n_wp - 1)
+        tx, ty, tz = waypoints[i]
+        dx, dy = tx - x, ty - y
+        dist = np.hypot(dx, dy)
+
+        if arrived or dist < radius:
+            arrived = False
+            # Waypoint event: sequence like WaypointNavigator.get_command
+            if i >= n_wp - 1:
+                if navigator.loop:
+                    navigator.current_waypoint_index = 0
+                else:
+                    navigator.finished = True
+            else:
+                navigator.current_waypoint_index += 1
+            idle_events += 1
+            if idle_events > n_wp:
+                # Every waypoint lies within the acceptance radius; nothing to fly
+                break
+            continue
+        idle_events = 0
+
+        psi = np.arctan2(dx, dy)
+        leg_time = min((dist - radius) / speed, t_limit - t)
+        legs.append((t, leg_time, x, y, z, psi, tz))
+        x += speed * np.sin(psi) * leg_time
+        y += speed * np.cos(psi) * leg_time
+        z = tz + (z - tz) * np.exp(-CLIMB_GAIN * leg_time)
+        t += leg_time
+        arrived = t < t_limit
+
+    columns = np.array(legs, dtype=float).reshape(-1, 7).T
+    state.x, state.y, state.z, state.psi, state.v = float(x), float(y), float(z), float(psi), speed
+    return LegPlan(t0=columns[0], duration=columns[1], x0=columns[2], y0=columns[3], z0=columns[4],
+                   psi=columns[5], target_z=columns[6], speed=speed, end_time=float(t),
+                   finished=navigator.finished)
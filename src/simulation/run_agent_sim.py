@@ -1,14 +1,24 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from src.world.environment import World, MapConfig
 from src.vehicle.aircraft import Aircraft, State
 from src.agent.context import AgentContext, OrganizationContext, PlatformContext, MissionContext, SituationContext
 from src.agent.core import Agent
+from src.sensors.magnetometer import Magnetometer
+from src.navigation.particle_filter import ParticleFilter
+from src.simulation.runner import SimulationRunner
+from src.core.telemetry import TelemetryRecorder
 
-def run_agent_simulation():
-    # 1. Setup World
-    config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
-    world = World(config)
+def jamming_variance(current_time: float) -> float:
+    """Inject GPS "Jamming" (Variance spike) between t=200 and t=400."""
+    if 200.0 < current_time < 400.0:
+        return 10.0 # High noise!
+    return 0.1
+
+def run_agent_simulation(world=None, telemetry=None):
+    # 1. Setup World (callers may pass a prebuilt one, e.g. benchmarks)
+    if world is None:
+        config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
+        world = World(config)
     
     # 2. Setup Aircraft
     initial_state = State(x=100.0, y=100.0, z=100.0, psi=0.0, v=50.0)
@@ -30,41 +40,22 @@ def run_agent_simulation():
     context = AgentContext(org, platform, mission, situation)
     
     # 4. Initialize Agent
-    agent = Agent(context, aircraft)
+    # In MAG_NAV mode the agent navigates on a map-matching particle filter
+    mag = Magnetometer(noise_std=2.0, seed=42)
+    estimator = ParticleFilter(world, n_particles=10000, measurement_std=5.0, seed=42)
+    agent = Agent(context, aircraft, world=world, magnetometer=mag, estimator=estimator, telemetry=telemetry)
     
     # 5. Run Loop
-    dt = 0.5
-    duration = 600.0 
-    steps = int(duration / dt)
-    
-    trajectory_x = []
-    trajectory_y = []
-    trajectory_z = []
-    modes = []
-    
     print("Starting Agent Simulation...")
     
-    for i in range(steps):
-        # Simulate environment conditions
-        # Inject GPS "Jamming" (Variance spike) between t=200 and t=400
-        current_time = i * dt
-        gps_variance = 0.1
-        if 200.0 < current_time < 400.0:
-            gps_variance = 10.0 # High noise!
-            
-        # Update Agent
-        agent.update(dt, external_gps_variance=gps_variance)
+    runner = SimulationRunner(aircraft, dt=0.5, agent=agent, gps_variance=jamming_variance)
+    result = runner.run(duration=600.0)
         
-        # Log
-        pos = aircraft.get_position()
-        trajectory_x.append(pos[0])
-        trajectory_y.append(pos[1])
-        trajectory_z.append(pos[2])
-        modes.append(agent.context.situation.current_nav_mode.value)
-        
-    return world, trajectory_x, trajectory_y, trajectory_z, waypoints, modes
+    return world, result.x, result.y, result.z, waypoints, result.modes
 
 def plot_results(world, traj_x, traj_y, traj_z, waypoints, modes):
+    import matplotlib.pyplot as plt
+    
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     # Plot Map and Trajectory
@@ -109,5 +100,10 @@ def plot_results(world, traj_x, traj_y, traj_z, waypoints, modes):
     print("Simulation result saved to agent_simulation.png")
 
 if __name__ == "__main__":
-    world, tx, ty, tz, wps, modes = run_agent_simulation()
+    with TelemetryRecorder('agent_telemetry') as telemetry:
+        world, tx, ty, tz, wps, modes = run_agent_simulation(telemetry=telemetry)
+    for event in telemetry.events:
+        repeats = f" (x{event.count} until t={event.last_t:.1f}s)" if event.count > 1 else ""
+        print(f"t={event.t:6.1f}s  {event.level.value:7s} {event.message}{repeats}")
+    print("Telemetry saved to agent_telemetry/")
     plot_results(world, tx, ty, tz, wps, modes)
@@ -1,14 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from src.world.environment import World, MapConfig
 from src.vehicle.aircraft import Aircraft, State
 from src.sensors.magnetometer import Magnetometer
 from src.navigation.waypoint import WaypointNavigator
+from src.simulation.runner import SimulationRunner
 
-def run_simulation():
-    # 1. Setup World
-    config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
-    world = World(config)
+def run_simulation(world=None):
+    # 1. Setup World (callers may pass a prebuilt one, e.g. benchmarks)
+    if world is None:
+        config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
+        world = World(config)
     
     # 2. Setup Aircraft
     # Start at (100, 100)
@@ -29,35 +30,14 @@ def run_simulation():
     mag = Magnetometer(noise_std=2.0)
     
     # 5. Run Loop
-    dt = 0.5
-    duration = 500.0 # Enough time to fly the square
-    steps = int(duration / dt)
-    
-    trajectory_x = []
-    trajectory_y = []
-    trajectory_z = []
-    measurements = []
-    
-    for _ in range(steps):
-        # 1. Get Navigation Command
-        cmd = navigator.get_command(aircraft.state)
-        
-        # 2. Update Physics
-        aircraft.update(dt, commanded_speed=cmd.speed, commanded_heading=cmd.heading, commanded_altitude=cmd.altitude)
+    runner = SimulationRunner(aircraft, dt=0.5, navigator=navigator, world=world, sensor=mag)
+    result = runner.run(duration=500.0) # Enough time to fly the square
         
-        # 3. Read Sensor
-        pos = aircraft.get_position()
-        val = mag.read(world, *pos)
-        
-        # 4. Log
-        trajectory_x.append(pos[0])
-        trajectory_y.append(pos[1])
-        trajectory_z.append(pos[2])
-        measurements.append(val)
-        
-    return world, trajectory_x, trajectory_y, measurements, waypoints
+    return world, result.sample_x, result.sample_y, result.measurements, waypoints
 
 def plot_results(world, traj_x, traj_y, measurements, waypoints):
+    import matplotlib.pyplot as plt
+    
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     # Plot Map and Trajectory
@@ -1,13 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from src.world.environment import World, MapConfig
 from src.vehicle.aircraft import Aircraft, State
 from src.sensors.magnetometer import Magnetometer
+from src.navigation.base import ConstantCommandNavigator, NavigationCommand
+from src.simulation.runner import SimulationRunner
 
-def run_simulation():
-    # 1. Setup World
-    config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
-    world = World(config)
+def run_simulation(world=None):
+    # 1. Setup World (callers may pass a prebuilt one, e.g. benchmarks)
+    if world is None:
+        config = MapConfig(width=5000, height=5000, resolution=10.0, seed=42)
+        world = World(config)
     
     # 2. Setup Aircraft
     # Start at bottom-left, heading East (90 deg)
@@ -18,31 +20,16 @@ def run_simulation():
     mag = Magnetometer(noise_std=2.0)
     
     # 4. Run Loop
-    dt = 0.5
-    duration = 60.0 # seconds
-    steps = int(duration / dt)
-    
-    trajectory_x = []
-    trajectory_y = []
-    measurements = []
-    
-    for _ in range(steps):
-        # Update Physics
-        # Simple straight line flight
-        aircraft.update(dt, commanded_speed=50.0, commanded_heading=np.pi/2, commanded_altitude=100.0)
-        
-        # Read Sensor
-        pos = aircraft.get_position()
-        val = mag.read(world, *pos)
+    # Simple straight line flight
+    navigator = ConstantCommandNavigator(NavigationCommand(speed=50.0, heading=np.pi/2, altitude=100.0))
+    runner = SimulationRunner(aircraft, dt=0.5, navigator=navigator, world=world, sensor=mag)
+    result = runner.run(duration=60.0) # seconds
         
-        # Log
-        trajectory_x.append(pos[0])
-        trajectory_y.append(pos[1])
-        measurements.append(val)
-        
-    return world, trajectory_x, trajectory_y, measurements
+    return world, result.sample_x, result.sample_y, result.measurements
 
 def plot_results(world, traj_x, traj_y, measurements):
+    import matplotlib.pyplot as plt
+    
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
     
     # Plot Map and Trajectory
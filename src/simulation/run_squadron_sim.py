@@ -0,0 +1,59 @@
+import numpy as np
+from src.world.environment import World, MapConfig
+from src.vehicle.aircraft import Aircraft, State
+from src.agent.context import AgentContext, OrganizationContext, PlatformContext, MissionContext, SituationContext
+from src.agent.core import Agent
+from src.agent.runtime import AgentRuntime, StatusBoard
+
+# Circular jamming zone (x, y, radius) in the middle of the map
+JAMMER = (2500.0, 2500.0, 800.0)
+
+def jamming_variance(agent: Agent, current_time: float) -> float:
+    """High GPS variance while the aircraft is inside the jamming zone."""
+    state = agent.aircraft.state
+    jx, jy, radius = JAMMER
+    return 10.0 if np.hypot(state.x - jx, state.y - jy) < radius else 0.1
+
+def make_squadron(world, num_agents: int, seed: int = 0):
+    """
+    Agents on racetrack patrols with staggered start positions and lanes,
+    all sharing `world`. Agents fly on truth (no estimator) to keep large
+    squadrons cheap.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = world.config.width, world.config.height
+    agents = []
+    for i in range(num_agents):
+        x0, y0 = rng.uniform(0.1, 0.9, 2) * (width, height)
+        lane = 0.1 + 0.8 * (i + 0.5) / num_agents
+        waypoints = [(lane * width, 0.1 * height, 100.0), (lane * width, 0.9 * height, 100.0),
+                     ((1.0 - lane) * width, 0.9 * height, 100.0), ((1.0 - lane) * width, 0.1 * height, 100.0)]
+        initial_state = State(x=x0, y=y0, z=100.0, psi=0.0, v=50.0)
+        context = AgentContext(
+            OrganizationContext("Red Tails", f"Red-{i + 1}", 123.45),
+            PlatformContext(max_speed=100.0, max_altitude=1000.0, sensors_list=["GPS", "Magnetometer"]),
+            MissionContext(objectives=["Patrol"], waypoints=waypoints, risk_tolerance=0.5),
+            SituationContext(estimated_state=initial_state),
+        )
+        agents.append(Agent(context, Aircraft(initial_state), world=world))
+    return agents
+
+def run_squadron_simulation(num_agents: int = 200, duration: float = 300.0, dt: float = 0.5, world=None):
+    if world is None:
+        world = World(MapConfig(width=5000, height=5000, resolution=10.0, seed=42))
+    runtime = AgentRuntime(world, dt, status_every=int(round(1.0 / dt)), gps_variance=jamming_variance)
+    board = StatusBoard(runtime.bus)
+    for agent in make_squadron(world, num_agents):
+        runtime.add(agent)
+    runtime.run(duration=duration)
+    return runtime, board
+
+if __name__ == "__main__":
+    runtime, board = run_squadron_simulation()
+    stats = runtime.stats()
+    print(f"{stats['agents']} agents, {stats['ticks']} ticks in {stats['wall_time']:.2f}s "
+          f"({stats['agent_steps_per_s']:.0f} agent-steps/s)")
+    for name, topic in stats["topics"].items():
+        print(f"  {name:14s} published={topic['published']:7d} batches={topic['batches']:5d} "
+              f"mean_batch={topic['mean_batch']:7.1f} throughput={topic['throughput']:9.0f}/s")
+    print(f"Mode changes: {len(board.mode_changes)}, currently in MAG_NAV: {len(board.in_mode('MAG_NAV'))}")
@@ -1,72 +1,97 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from src.world.environment import World, MapConfig
 from src.vehicle.aircraft import Aircraft, State
 from src.sensors.magnetometer import Magnetometer
 from src.mission.planner import LawnmowerPattern
+from src.navigation.waypoint import WaypointNavigator
 from src.world.reconstruction import MapReconstructor
+from src.simulation.runner import SimulationRunner
 
-def run_survey(num_passes):
-    # 1. Setup World
-    width = 5000.0
-    height = 5000.0
-    config = MapConfig(width=width, height=height, resolution=10.0, seed=123)
-    world = World(config)
+SURVEY_SIZE = 5000.0 # Width and height of the surveyed area (m)
+SURVEY_SEED = 123
+
+def make_survey_world() -> World:
+    config = MapConfig(width=SURVEY_SIZE, height=SURVEY_SIZE, resolution=10.0, seed=SURVEY_SEED)
+    return World(config)
+
+def run_survey(num_passes, reconstructor=None, integrator='event'):
+    """
+    Flies a lawnmower survey and returns the collected samples.
     
-    # 2. Setup Pattern
+    Args:
+        num_passes: Number of survey lines.
+        reconstructor: Optional IncrementalReconstructor fed with each chunk
+                       of samples while the survey is flying.
+        integrator: 'event' solves each straight leg in closed form and
+                    samples it as arrays; 'fixed' steps the aircraft every
+                    dt (kept for comparison).
+    """
+    world = make_survey_world()
+    xs, ys, values = fly_survey(world, num_passes, reconstructor=reconstructor, integrator=integrator)
+    return world, xs, ys, values
+
+def fly_survey(world, num_passes, altitude=100.0, noise_std=5.0, seed=None, reconstructor=None,
+               integrator='event'):
+    """
+    Flies a lawnmower survey over an existing world.
+
+    Args:
+        world: World to survey (the whole map area is covered).
+        num_passes: Number of survey lines.
+        altitude: Flight altitude (m).
+        noise_std: Magnetometer noise (nT).
+        seed: Magnetometer noise seed.
+        reconstructor, integrator: As in run_survey.
+
+    Returns:
+        (sample_x, sample_y, measurements)
+    """
+    min_x, max_x, min_y, max_y = world.get_map_bounds()
+    width = max_x - min_x
+    
+    # 1. Setup Pattern
     spacing = width / num_passes
     print(f"Running survey with {num_passes} passes (spacing={spacing:.1f}m)...")
     
-    planner = LawnmowerPattern(bounds=(0, width, 0, height), spacing=spacing, altitude=100.0)
-    waypoints = planner.generate()
+    planner = LawnmowerPattern(bounds=(min_x, max_x, min_y, max_y), spacing=spacing, altitude=altitude)
+    route = planner.generate_route()
     
-    # 3. Setup Aircraft & Sensor
-    start_wp = waypoints[0]
-    initial_state = State(x=start_wp.x, y=start_wp.y, z=start_wp.z, psi=0, v=50.0)
+    # 2. Setup Aircraft & Sensor
+    start_x, start_y, start_z = route[0]
+    initial_state = State(x=start_x, y=start_y, z=start_z, psi=0, v=50.0)
     aircraft = Aircraft(initial_state)
-    mag = Magnetometer(noise_std=5.0)
-    
-    # 4. Run Loop
-    dt = 0.5
-    collected_x = []
-    collected_y = []
-    collected_vals = []
+    mag = Magnetometer(noise_std=noise_std, seed=seed)
     
-    # Simple waypoint following logic
-    current_wp_idx = 0
-    flight_speed = 50.0
-    max_steps = 200000 
-    
-    for step in range(max_steps):
-        if current_wp_idx >= len(waypoints):
-            break
-            
-        target = waypoints[current_wp_idx]
-        
-        dx = target.x - aircraft.state.x
-        dy = target.y - aircraft.state.y
-        dist = np.sqrt(dx*dx + dy*dy)
-        
-        if dist < 10.0:
-            current_wp_idx += 1
-            continue
-            
-        heading = np.arctan2(dx, dy)
-        aircraft.update(dt, commanded_speed=flight_speed, commanded_heading=heading, commanded_altitude=target.z)
-        
-        if step % 2 == 0:
-            val = mag.read(world, *aircraft.get_position())
-            collected_x.append(aircraft.state.x)
-            collected_y.append(aircraft.state.y)
-            collected_vals.append(val)
+    # 3. Run Loop
+    # Simple waypoint following: fly each leg once, stop at the last waypoint
+    navigator = WaypointNavigator(route, speed=50.0,
+                                  acceptance_radius=10.0, loop=False)
+    on_samples = None
+    if reconstructor is not None:
+        on_samples = lambda t, x, y, z, values: reconstructor.ingest(x, y, values)
+    runner = SimulationRunner(aircraft, dt=0.5, navigator=navigator, world=world, sensor=mag,
+                              record_every=2, sample_every=2, sensor_chunk=256, on_samples=on_samples)
+    if integrator == 'event':
+        result = runner.run_events()
+    elif integrator == 'fixed':
+        result = runner.run(max_steps=200000, until=lambda: navigator.finished)
+    else:
+        raise ValueError(f"Unknown integrator: {integrator}")
             
-    return world, np.array(collected_x), np.array(collected_y), np.array(collected_vals)
+    return result.sample_x, result.sample_y, result.measurements
 
-def compare_maps(world, obs_x, obs_y, obs_vals, num_passes):
-    print(f"Reconstructing map for {num_passes} passes...")
+def compare_maps(world, obs_x, obs_y, obs_vals, num_passes, grid_z=None):
+    """
+    Plots truth and reconstruction side by side. Pass `grid_z` to plot an
+    existing reconstruction instead of reconstructing the samples again.
+    """
+    import matplotlib.pyplot as plt
+    
     bounds = world.get_map_bounds()
-    # Use larger resolution for faster reconstruction if needed, but 20.0 is fine
-    grid_x, grid_y, grid_z = MapReconstructor.reconstruct(obs_x, obs_y, obs_vals, bounds, resolution=20.0)
+    if grid_z is None:
+        print(f"Reconstructing map for {num_passes} passes...")
+        # Use larger resolution for faster reconstruction if needed, but 20.0 is fine
+        grid_x, grid_y, grid_z = MapReconstructor.reconstruct(obs_x, obs_y, obs_vals, bounds, resolution=20.0)
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
     
@@ -90,6 +115,17 @@ def compare_maps(world, obs_x, obs_y, obs_vals, num_passes):
     plt.close(fig) # Close to free memory
 
 if __name__ == "__main__":
-    for passes in [100, 50, 25, 12, 6]:
-        world, ox, oy, ov = run_survey(passes)
-        compare_maps(world, ox, oy, ov, passes)
+    from src.simulation.sweep import SurveySweep, grid_cases, write_csv
+
+    # One world for every pass count: score all designs in parallel, then plot
+    # the flights and reconstructions the sweep already made
+    pass_counts = [100, 50, 25, 12, 6]
+    world = make_survey_world()
+    table, data = SurveySweep(world).run_with_data(grid_cases(num_passes=pass_counts))
+    write_csv(table, 'survey_sweep.csv')
+    for passes, rmse, coverage in zip(table['num_passes'], table['rmse'], table['coverage_fraction']):
+        print(f"{passes:4d} passes: RMSE {rmse:6.2f} nT, coverage {coverage:.2f}")
+    print("Saved survey_sweep.csv")
+
+    for passes, survey in zip(table['num_passes'], data):
+        compare_maps(world, survey.x, survey.y, survey.values, passes, grid_z=survey.grid_z)
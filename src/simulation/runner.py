@@ -0,0 +1,192 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from src.vehicle.aircraft import Aircraft
+from src.navigation.base import Navigator
+from src.navigation.waypoint import WaypointNavigator
+from src.simulation.events import plan_waypoint_legs
+
+@dataclass
+class SimulationResult:
+    """
+    Recorded trajectory and measurements of one run, as arrays.
+    """
+    t: np.ndarray # Time of each trajectory record (s)
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    psi: np.ndarray
+    v: np.ndarray
+    modes: Optional[np.ndarray] # Agent navigation mode per record (agent runs only)
+    sample_t: np.ndarray # Time of each sensor sample (s)
+    sample_x: np.ndarray
+    sample_y: np.ndarray
+    sample_z: np.ndarray
+    measurements: np.ndarray
+    steps: int # Physics steps actually executed
+
+class SimulationRunner:
+    """
+    Shared headless step loop for the run_* scenarios.
+
+    Each step either lets an Agent run its full cycle or asks a Navigator for a
+    command and advances the Aircraft. Trajectory records and sensor sample
+    positions go into preallocated arrays (optionally decimated); sensor values
+    are read in vectorized chunks with Magnetometer.read_batch.
+    """
+    def __init__(self, aircraft: Aircraft, dt: float = 0.5, navigator: Optional[Navigator] = None,
+                 agent=None, world=None, sensor=None, record_every: int = 1, sample_every: int = 1,
+                 gps_variance: Optional[Callable[[float], float]] = None, sensor_chunk: int = 4096,
+                 on_samples: Optional[Callable[..., None]] = None):
+        """
+        Args:
+            aircraft: Vehicle to simulate (the agent's aircraft in agent runs).
+            dt: Physics time step (s).
+            navigator: Command source for non-agent runs.
+            agent: Agent driving the aircraft; takes precedence over navigator.
+            world: World sampled by the sensor.
+            sensor: Magnetometer (anything with read_batch(world, xs, ys, zs)).
+            record_every: Record the trajectory every N steps.
+            sample_every: Take a sensor sample every N steps.
+            gps_variance: Function of time giving the GPS variance fed to the agent.
+            sensor_chunk: Number of sample positions read per read_batch call.
+            on_samples: Called as on_samples(t, x, y, z, values) with each chunk
+                        of sensor samples as soon as it is read (e.g. to feed
+                        a live map reconstruction).
+        """
+        if agent is None and navigator is None:
+            raise ValueError("SimulationRunner needs a navigator or an agent")
+        if sensor is not None and world is None:
+            raise ValueError("A sensor needs a world to sample")
+        self.aircraft = aircraft
+        self.dt = dt
+        self.navigator = navigator
+        self.agent = agent
+        self.world = world
+        self.sensor = sensor
+        self.record_every = max(1, record_every)
+        self.sample_every = max(1, sample_every)
+        self.gps_variance = gps_variance
+        self.sensor_chunk = max(1, sensor_chunk)
+        self.on_samples = on_samples
+
+    def run(self, duration: Optional[float] = None, max_steps: Optional[int] = None,
+            until: Optional[Callable[[], bool]] = None) -> SimulationResult:
+        """
+        Runs the step loop.
+
+        Args:
+            duration: Simulated time (s). Either duration or max_steps is required.
+            max_steps: Upper bound on the number of steps.
+            until: Optional stop condition, checked before every step.
+
+        Returns:
+            SimulationResult with arrays trimmed to what was recorded.
+        """
+        if duration is None and max_steps is None:
+            raise ValueError("Specify duration or max_steps")
+        steps = int(duration / self.dt) if duration is not None else max_steps
+        if max_steps is not None:
+            steps = min(steps, max_steps)
+
+        n_records = -(-steps // self.record_every)
+        trajectory = np.empty((6, n_records)) # t, x, y, z, psi, v
+        modes = np.empty(n_records, dtype='U16') if self.agent is not None else None
+        n_samples = -(-steps // self.sample_every) if self.sensor is not None else 0
+        samples = np.empty((4, n_samples)) # t, x, y, z
+        measurements = np.empty(n_samples)
+
+        state = self.aircraft.state
+        dt = self.dt
+        n_rec = 0
+        n_smp = 0
+        n_read = 0
+        step = 0
+        for step in range(steps):
+            if until is not None and until():
+                break
+            t = (step + 1) * dt
+
+            if self.agent is not None:
+                variance = self.gps_variance(step * dt) if self.gps_variance is not None else 0.0
+                self.agent.update(dt, external_gps_variance=variance)
+            else:
+                cmd = self.navigator.get_command(state)
+                self.aircraft.update(dt, commanded_speed=cmd.speed, commanded_heading=cmd.heading,
+                                     commanded_altitude=cmd.altitude)
+            state = self.aircraft.state
+
+            if step % self.record_every == 0:
+                trajectory[:, n_rec] = (t, state.x, state.y, state.z, state.psi, state.v)
+                if modes is not None:
+                    modes[n_rec] = self.agent.context.situation.current_nav_mode.value
+                n_rec += 1
+
+            if n_samples and step % self.sample_every == 0:
+                samples[:, n_smp] = (t, state.x, state.y, state.z)
+                n_smp += 1
+                if n_smp - n_read >= self.sensor_chunk:
+                    self._read_samples(samples, measurements, n_read, n_smp)
+                    n_read = n_smp
+        else:
+            step = steps
+
+        if n_smp > n_read:
+            self._read_samples(samples, measurements, n_read, n_smp)
+
+        return SimulationResult(
+            t=trajectory[0, :n_rec], x=trajectory[1, :n_rec], y=trajectory[2, :n_rec],
+            z=trajectory[3, :n_rec], psi=trajectory[4, :n_rec], v=trajectory[5, :n_rec],
+            modes=modes[:n_rec] if modes is not None else None,
+            sample_t=samples[0, :n_smp], sample_x=samples[1, :n_smp], sample_y=samples[2, :n_smp],
+            sample_z=samples[3, :n_smp], measurements=measurements[:n_smp],
+            steps=step,
+        )
+
+    def run_events(self, duration: Optional[float] = None) -> SimulationResult:
+        """
+        Event-driven alternative to run() for a WaypointNavigator without an agent.
+
+        Instead of stepping, each leg is solved in closed form (see
+        plan_waypoint_legs) and trajectory records and sensor samples are
+        evaluated as arrays at the same times run() would produce them
+        (every record_every / sample_every multiples of dt).
+
+        Args:
+            duration: Simulated time limit (s). Required for looping routes;
+                      otherwise the run ends at the last waypoint.
+
+        Returns:
+            SimulationResult; `steps` counts the legs flown.
+        """
+        if self.agent is not None or not isinstance(self.navigator, WaypointNavigator):
+            raise ValueError("Event integration needs a WaypointNavigator and no agent")
+        plan = plan_waypoint_legs(self.aircraft.state, self.navigator, duration=duration)
+
+        def times(every):
+            interval = every * self.dt
+            return np.arange(self.dt, plan.end_time + 1e-9 * interval, interval)
+
+        t = times(self.record_every)
+        x, y, z, psi = plan.positions(t)
+        sample_t = times(self.sample_every) if self.sensor is not None else np.empty(0)
+        n_samples = sample_t.size
+        samples = np.empty((4, n_samples)) # t, x, y, z
+        samples[0] = sample_t
+        samples[1], samples[2], samples[3], _ = plan.positions(samples[0])
+        measurements = np.empty(n_samples)
+        for start in range(0, n_samples, self.sensor_chunk):
+            self._read_samples(samples, measurements, start, min(start + self.sensor_chunk, n_samples))
+
+        return SimulationResult(
+            t=t, x=x, y=y, z=z, psi=psi, v=np.full(t.size, plan.speed), modes=None,
+            sample_t=samples[0], sample_x=samples[1], sample_y=samples[2], sample_z=samples[3],
+            measurements=measurements, steps=plan.t0.size,
+        )
+
+    def _read_samples(self, samples: np.ndarray, measurements: np.ndarray, start: int, stop: int):
+        measurements[start:stop] = self.sensor.read_batch(
+            self.world, samples[1, start:stop], samples[2, start:stop], samples[3, start:stop])
+        if self.on_samples is not None:
+            self.on_samples(samples[0, start:stop], samples[1, start:stop], samples[2, start:stop],
+                            samples[3, start:stop], measurements[start:stop])
@@ -0,0 +1,205 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from src.core.metrics import Metrics, NULL_METRICS
+
+# Default order of components within one tick (lower runs first), matching
+# the Agent cycle: sense -> estimate -> decide -> act, then sampling of the
+# new state.
+ORDER_SENSE = 0
+ORDER_ESTIMATE = 10
+ORDER_DECIDE = 20
+ORDER_ACT = 30
+ORDER_SAMPLE = 40
+
+@dataclass
+class Task:
+    name: str
+    callback: Callable[[float, float], None] # Called as callback(t, period)
+    every: int # Runs every `every` ticks
+    order: int
+    phase: int = 0 # Tick offset within the period
+    runs: int = 0
+    seq: int = 0 # Registration order, breaks ties in `order`
+
+class Scheduler:
+    """
+    Deterministic multi-rate scheduler on a fixed base tick.
+
+    Each component declares a rate (or period) that must be a whole number
+    of base ticks. On every tick the due tasks run in (order, registration)
+    order; tasks that are not due are skipped. Callbacks get the tick start
+    time t and their own period, e.g. physics at 100 Hz gets dt=0.01 while a
+    1 Hz decision task gets 1.0.
+    """
+    def __init__(self, tick: float, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            tick: Base tick (s); usually the fastest component's period.
+            metrics: Optional Metrics; each task is timed as "scheduler.<name>".
+        """
+        if tick <= 0.0:
+            raise ValueError("tick must be positive")
+        self.tick = tick
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.tasks: List[Task] = []
+        self.ticks = 0 # Ticks executed so far
+
+    @property
+    def time(self) -> float:
+        return self.ticks * self.tick
+
+    def add(self, name: str, callback: Callable[[float, float], None], rate: Optional[float] = None,
+            period: Optional[float] = None, order: int = ORDER_ACT, phase: int = 0) -> Task:
+        """
+        Registers a component.
+
+        Args:
+            name: Unique task name.
+            callback: Called as callback(t, period) when due.
+            rate: Rate in Hz; or give `period` in seconds. Defaults to every tick.
+            order: Position within a tick (see ORDER_* constants).
+            phase: Offset in ticks, to spread equal-rate tasks over ticks.
+
+        Returns:
+            The registered Task.
+        """
+        if any(task.name == name for task in self.tasks):
+            raise ValueError(f"Duplicate task name: {name}")
+        if rate is not None and period is not None:
+            raise ValueError("Give either rate or period")
+        if rate is not None:
+            period = 1.0 / rate
+        every = 1 if period is None else int(round(period / self.tick))
+        if every < 1 or not np.isclose(every * self.tick, period if period is not None else self.tick):
+            raise ValueError(f"Period of {name} must be a whole number of {self.tick}s ticks")
+        task = Task(name, callback, every, order, phase % every, seq=len(self.tasks))
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: (t.order, t.seq))
+        return task
+
+    def step(self):
+        """Runs one tick."""
+        k = self.ticks
+        t = k * self.tick
+        metrics = self.metrics
+        for task in self.tasks:
+            if k % task.every == task.phase:
+                if metrics.enabled:
+                    with metrics.time(f"scheduler.{task.name}"):
+                        task.callback(t, task.every * self.tick)
+                else:
+                    task.callback(t, task.every * self.tick)
+                task.runs += 1
+        self.ticks += 1
+
+    def run(self, duration: Optional[float] = None, ticks: Optional[int] = None,
+            until: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Runs ticks until `duration` seconds or `ticks` ticks have passed
+        (whichever is given / first), or until() returns True before a tick.
+
+        Returns:
+            Number of ticks executed by this call.
+        """
+        if duration is None and ticks is None:
+            raise ValueError("Specify duration or ticks")
+        n = int(round(duration / self.tick)) if duration is not None else ticks
+        if ticks is not None:
+            n = min(n, ticks)
+        for i in range(n):
+            if until is not None and until():
+                return i
+            self.step()
+        return n
+
+    def stats(self) -> Dict[str, Dict]:
+        """Runs and effective rate of every task, in execution order."""
+        return {task.name: {"runs": task.runs, "every": task.every, "rate": 1.0 / (task.every * self.tick),
+                            "skipped": self.ticks - task.runs} for task in self.tasks}
+
+def schedule_agent(scheduler: Scheduler, agent, physics_rate: Optional[float] = None,
+                   sense_rate: Optional[float] = None, estimate_rate: Optional[float] = None,
+                   decide_rate: Optional[float] = None,
+                   gps_variance: Optional[Callable[[float], float]] = None):
+    """
+    Registers the Agent phases as separate tasks: sense -> estimate ->
+    decide -> act. act() flies the last decided command at the physics rate.
+    Rates default to every tick.
+
+    Args:
+        gps_variance: Function of time giving the injected GPS variance.
+    """
+    scheduler.add("agent.sense", lambda t, dt: agent.sense(gps_variance(t) if gps_variance else 0.0),
+                  rate=sense_rate, order=ORDER_SENSE)
+    scheduler.add("agent.estimate", lambda t, dt: agent.estimate(), rate=estimate_rate, order=ORDER_ESTIMATE)
+    scheduler.add("agent.decide", lambda t, dt: agent.decide(), rate=decide_rate, order=ORDER_DECIDE)
+    scheduler.add("agent.act", lambda t, dt: agent.act(dt), rate=physics_rate, order=ORDER_ACT)
+
+def schedule_navigation(scheduler: Scheduler, aircraft, navigator, physics_rate: Optional[float] = None,
+                        command_rate: Optional[float] = None):
+    """
+    Registers a Navigator and Aircraft pair: the navigator recomputes its
+    command at command_rate and the aircraft flies the held command at
+    physics_rate.
+    """
+    held = {}
+
+    def command(t, dt):
+        held["command"] = navigator.get_command(aircraft.state)
+
+    def physics(t, dt):
+        cmd = held.get("command")
+        if cmd is None:
+            command(t, dt)
+            cmd = held["command"]
+        aircraft.update(dt, cmd.speed, cmd.heading, cmd.altitude)
+
+    scheduler.add("navigator", command, rate=command_rate, order=ORDER_DECIDE)
+    scheduler.add("aircraft", physics, rate=physics_rate, order=ORDER_ACT)
+
+class SensorRecorder:
+    """
+    Scheduled magnetometer: reads the sensor at the aircraft position at its
+    own rate (after the physics tick) into growable arrays.
+    """
+    def __init__(self, sensor, world, aircraft, capacity: int = 4096):
+        self.sensor = sensor
+        self.world = world
+        self.aircraft = aircraft
+        self._data = np.empty((5, capacity)) # t, x, y, z, value
+        self.n = 0
+
+    def __call__(self, t: float, dt: float):
+        if self.n == self._data.shape[1]:
+            self._data = np.concatenate([self._data, np.empty_like(self._data)], axis=1)
+        state = self.aircraft.state
+        value = self.sensor.read(self.world, state.x, state.y, state.z)
+        self._data[:, self.n] = (t, state.x, state.y, state.z, value)
+        self.n += 1
+
+    def schedule(self, scheduler: Scheduler, rate: Optional[float] = None, name: str = "magnetometer"):
+        # Sampled after the physics update of the same tick: stamp the end of the tick
+        tick = scheduler.tick
+        scheduler.add(name, lambda t, dt: self(t + tick, dt), rate=rate, order=ORDER_SAMPLE)
+        return self
+
+    @property
+    def t(self) -> np.ndarray:
+        return self._data[0, :self.n]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[1, :self.n]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[2, :self.n]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self._data[3, :self.n]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[4, :self.n]
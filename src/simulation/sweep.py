@@ -0,0 +1,214 @@
+import csv
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.world.environment import World
+from src.world.reconstruction import MapReconstructor
+from src.world.shared import SharedWorld, SharedWorldHandle, attach_world
+from src.simulation.run_survey import fly_survey, make_survey_world
+
+@dataclass
+class SurveyCase:
+    """
+    One survey design: line count, flight altitude and sensor noise.
+    """
+    num_passes: int = 25
+    altitude: float = 100.0 # m
+    noise_std: float = 5.0 # Magnetometer noise (nT)
+    grid_resolution: float = 20.0 # Reconstruction grid spacing (m)
+    seed: int = 0 # Magnetometer noise seed
+
+@dataclass
+class SurveyData:
+    """
+    Samples and reconstructed grid of one flown survey case.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    values: np.ndarray
+    grid_x: np.ndarray
+    grid_y: np.ndarray
+    grid_z: np.ndarray
+
+def grid_cases(**params: Iterable) -> List[SurveyCase]:
+    """
+    Cartesian product over SurveyCase fields, e.g.
+    grid_cases(num_passes=[100, 50, 25], altitude=[100.0, 300.0]).
+    """
+    names = list(params)
+    return [SurveyCase(**dict(zip(names, values))) for values in product(*(params[n] for n in names))]
+
+def radial_coherence(truth: np.ndarray, estimate: np.ndarray, resolution: float,
+                     n_bands: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Magnitude-squared coherence between two grids per radial wavenumber band.
+
+    Both grids are demeaned and Hann-windowed; cross and auto spectra are
+    summed over each ring of |k| before forming |S_tr|^2 / (S_tt S_rr).
+
+    Returns:
+        (wavelengths, coherence): band-centre wavelength (m, descending) and
+        coherence (0..1) per band (NaN for bands without grid wavenumbers).
+    """
+    ny, nx = truth.shape
+    window = np.outer(np.hanning(ny), np.hanning(nx))
+    t_hat = np.fft.rfft2((truth - truth.mean()) * window)
+    e_hat = np.fft.rfft2((estimate - estimate.mean()) * window)
+    ky = np.fft.fftfreq(ny, d=resolution)
+    kx = np.fft.rfftfreq(nx, d=resolution)
+    k = np.hypot(ky[:, None], kx[None, :])
+
+    # Bands from the lowest non-zero wavenumber of the grid up to Nyquist
+    k_min = 1.0 / (max(ny, nx) * resolution)
+    edges = np.linspace(k_min * (1.0 - 1e-9), 0.5 / resolution, n_bands + 1)
+    band = np.digitize(k.ravel(), edges) - 1
+    keep = (band >= 0) & (band < n_bands) & (k.ravel() > 0)
+    band = band[keep]
+
+    def ring_sum(values):
+        return np.bincount(band, weights=values.ravel()[keep], minlength=n_bands)
+
+    cross_spectrum = t_hat * np.conj(e_hat)
+    cross = ring_sum(cross_spectrum.real) + 1j * ring_sum(cross_spectrum.imag)
+    s_tt = ring_sum(np.abs(t_hat) ** 2)
+    s_ee = ring_sum(np.abs(e_hat) ** 2)
+    valid = (s_tt > 0) & (s_ee > 0)
+    coherence = np.full(n_bands, np.nan)
+    coherence[valid] = np.abs(cross[valid]) ** 2 / (s_tt[valid] * s_ee[valid])
+    centres = 0.5 * (edges[:-1] + edges[1:])
+    return 1.0 / centres, coherence
+
+def score_reconstruction(world: World, grid_x: np.ndarray, grid_y: np.ndarray, grid_z: np.ndarray,
+                         altitude: float, resolution: float, coherence_threshold: float = 0.5) -> Dict:
+    """
+    Compares a reconstructed grid with the world's field at the survey altitude.
+
+    Returns:
+        Dict with rmse / max_abs_error (nT, over covered cells), coverage_fraction,
+        mean_coherence (mean band coherence) and resolved_wavelength, the
+        shortest wavelength (m) down to which every band stays coherent
+        (NaN if even the longest band is not).
+    """
+    truth = world.get_magnetic_field_batch(grid_x.ravel(), grid_y.ravel(),
+                                           np.full(grid_x.size, float(altitude))).reshape(grid_x.shape)
+    covered = np.isfinite(grid_z)
+    coverage = float(covered.mean()) if covered.size else 0.0
+    if not covered.any():
+        return {"rmse": float('nan'), "max_abs_error": float('nan'), "coverage_fraction": coverage,
+                "mean_coherence": 0.0, "resolved_wavelength": float('nan')}
+
+    error = grid_z[covered] - truth[covered]
+    # Uncovered cells carry no information: fill them with the estimate's mean
+    estimate = np.where(covered, grid_z, grid_z[covered].mean())
+    wavelengths, coherence = radial_coherence(truth, estimate, resolution)
+    below = np.flatnonzero(coherence < coherence_threshold)
+    n_resolved = below[0] if below.size else coherence.size
+    return {
+        "rmse": float(np.sqrt(np.mean(error ** 2))),
+        "max_abs_error": float(np.abs(error).max()),
+        "coverage_fraction": coverage,
+        "mean_coherence": float(np.nanmean(coherence)),
+        "resolved_wavelength": float(wavelengths[n_resolved - 1]) if n_resolved else float('nan'),
+    }
+
+def run_case(world: World, case: SurveyCase, engine: str = 'global', keep_data: bool = False) -> Dict:
+    """
+    Flies one survey design over `world`, reconstructs the map and scores it.
+
+    Args:
+        keep_data: Also return the samples and grid as row["data"] (SurveyData).
+    """
+    xs, ys, values = fly_survey(world, case.num_passes, altitude=case.altitude,
+                                noise_std=case.noise_std, seed=case.seed)
+    grid_x, grid_y, grid_z = MapReconstructor.reconstruct(xs, ys, values, world.get_map_bounds(),
+                                                          case.grid_resolution, engine=engine)
+    row = {
+        **asdict(case),
+        "line_spacing": world.config.width / case.num_passes,
+        "n_samples": int(xs.size),
+        **score_reconstruction(world, grid_x, grid_y, grid_z, case.altitude, case.grid_resolution),
+    }
+    if keep_data:
+        row["data"] = SurveyData(xs, ys, values, grid_x, grid_y, grid_z)
+    return row
+
+# World attached in this worker process, keyed by its shared base segment
+_ATTACHED: Dict[str, World] = {}
+
+def _run_shared_case(handle: SharedWorldHandle, case: SurveyCase, engine: str, keep_data: bool) -> Dict:
+    world = _ATTACHED.get(handle.base.name)
+    if world is None:
+        world = _ATTACHED[handle.base.name] = attach_world(handle)
+    return run_case(world, case, engine, keep_data)
+
+class SurveySweep:
+    """
+    Scores many survey designs against one world.
+
+    The world is built once; with more than one worker its base map and
+    the layers at every case altitude are published through shared memory
+    and the cases run in a process pool.
+    """
+    def __init__(self, world: Optional[World] = None, workers: Optional[int] = None, engine: str = 'global'):
+        """
+        Args:
+            world: World to survey (defaults to the run_survey map).
+            workers: Process count; 1 runs the cases in this process.
+            engine: MapReconstructor engine ('global' or 'tiled').
+        """
+        self.world = world if world is not None else make_survey_world()
+        self.workers = workers
+        self.engine = engine
+
+    def run(self, cases: List[SurveyCase]) -> Dict[str, np.ndarray]:
+        """
+        Returns:
+            Column table (dict of arrays), one row per case in input order.
+        """
+        return self.run_with_data(cases, keep_data=False)[0]
+
+    def run_with_data(self, cases: List[SurveyCase],
+                      keep_data: bool = True) -> Tuple[Dict[str, np.ndarray], List[SurveyData]]:
+        """
+        Like run(), but also returns each case's samples and reconstructed
+        grid (e.g. for plotting without flying the designs again).
+
+        Returns:
+            (table, data) with data[i] the SurveyData of cases[i] (empty
+            unless keep_data).
+        """
+        n = len(cases)
+        if self.workers == 1:
+            rows = [run_case(self.world, case, self.engine, keep_data) for case in cases]
+        else:
+            altitudes = sorted({case.altitude for case in cases})
+            with ExitStack() as stack:
+                handle = stack.enter_context(SharedWorld(self.world, altitudes)).handle
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=self.workers))
+                rows = list(pool.map(_run_shared_case, [handle] * n, cases, [self.engine] * n, [keep_data] * n))
+        data = [row.pop("data") for row in rows] if keep_data else []
+        if not rows:
+            return {}, data
+        return {key: np.array([row[key] for row in rows]) for key in rows[0]}, data
+
+def write_csv(table: Dict[str, np.ndarray], path: str):
+    """Writes a column table as CSV with a header row."""
+    columns = list(table)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in zip(*(table[c] for c in columns)):
+            writer.writerow([value.item() if hasattr(value, "item") else value for value in row])
+
+if __name__ == "__main__":
+    import sys
+    cases = grid_cases(num_passes=[100, 50, 25, 12, 6], altitude=[100.0, 300.0], noise_std=[1.0, 5.0])
+    table = SurveySweep().run(cases)
+    write_csv(table, sys.argv[1] if len(sys.argv) > 1 else "survey_sweep.csv")
+    for i in range(len(cases)):
+        print(f"{table['num_passes'][i]:4d} passes  {table['altitude'][i]:6.0f} m  noise {table['noise_std'][i]:4.1f} nT  "
+              f"RMSE {table['rmse'][i]:7.2f} nT  coherent to {table['resolved_wavelength'][i]:7.0f} m  "
+              f"coverage {table['coverage_fraction'][i]:.2f}")
@@ -1,6 +1,8 @@
 import numpy as np
 from dataclasses import dataclass
 
+CLIMB_GAIN = 0.1 # Proportional gain of the climb controller (1/s)
+
 @dataclass
 class State:
     x: float = 0.0 # Easting
@@ -54,7 +56,7 @@ class Aircraft:
         self.state.y += vy * dt
         
         # Altitude change
-        vz = (commanded_altitude - self.state.z) * 0.1 # Simple P controller for climb
+        vz = (commanded_altitude - self.state.z) * CLIMB_GAIN # Simple P controller for climb
         self.state.z += vz * dt
 
     def get_position(self):
@@ -0,0 +1,96 @@
+import numpy as np
+from typing import Sequence
+from src.vehicle.aircraft import State, CLIMB_GAIN
+
+def _fleet_field(name: str) -> property:
+    def getter(view):
+        return float(getattr(view._fleet, name)[view._index])
+
+    def setter(view, value):
+        getattr(view._fleet, name)[view._index] = value
+
+    return property(getter, setter)
+
+class StateView:
+    """
+    State-compatible view of one aircraft in an AircraftFleet.
+    Reads and writes go straight to the fleet arrays.
+    """
+    __slots__ = ('_fleet', '_index')
+
+    def __init__(self, fleet: 'AircraftFleet', index: int):
+        self._fleet = fleet
+        self._index = index
+
+    x = _fleet_field('x')
+    y = _fleet_field('y')
+    z = _fleet_field('z')
+    psi = _fleet_field('psi')
+    v = _fleet_field('v')
+
+    def copy(self) -> State:
+        """Returns a detached State snapshot."""
+        return State(x=self.x, y=self.y, z=self.z, psi=self.psi, v=self.v)
+
+    def __repr__(self):
+        return f"StateView(x={self.x}, y={self.y}, z={self.z}, psi={self.psi}, v={self.v})"
+
+class AircraftFleet:
+    """
+    Structure-of-arrays simulation of many aircraft with the same
+    kinematics as Aircraft, advanced in one vectorized update.
+    """
+    def __init__(self, n: int):
+        """
+        Args:
+            n: Number of aircraft (all start at the origin, at rest).
+        """
+        self.x = np.zeros(n) # Easting
+        self.y = np.zeros(n) # Northing
+        self.z = np.zeros(n) # Altitude (ASL)
+        self.psi = np.zeros(n) # Heading, 0 = North, clockwise positive
+        self.v = np.zeros(n) # Speed m/s
+        self.dt = 0.1
+
+    @classmethod
+    def from_states(cls, states: Sequence[State]) -> 'AircraftFleet':
+        fleet = cls(len(states))
+        for name in ('x', 'y', 'z', 'psi', 'v'):
+            getattr(fleet, name)[:] = [getattr(s, name) for s in states]
+        return fleet
+
+    def __len__(self) -> int:
+        return self.x.size
+
+    def __getitem__(self, index: int) -> StateView:
+        if not -len(self) <= index < len(self):
+            raise IndexError("aircraft index out of range")
+        return StateView(self, index % len(self))
+
+    def update(self, dt: float, commanded_speeds, commanded_headings, commanded_altitudes):
+        """
+        Advances all aircraft by dt.
+        
+        Args:
+            dt: Time delta.
+            commanded_speeds: Target speeds (m/s), scalar or array of length N.
+            commanded_headings: Target headings (radians), scalar or array.
+            commanded_altitudes: Target altitudes (m), scalar or array.
+        """
+        self.dt = dt
+        
+        # Same instant-response model as Aircraft.update
+        self.v[:] = commanded_speeds
+        self.psi[:] = commanded_headings
+        
+        # X: East, Y: North, heading 0 -> North
+        step = self.v * dt
+        self.x += step * np.sin(self.psi)
+        self.y += step * np.cos(self.psi)
+        
+        # Simple P controller for climb
+        self.z += (commanded_altitudes - self.z) * (CLIMB_GAIN * dt)
+
+    def get_positions(self) -> np.ndarray:
+        """Returns an (N, 3) array of x, y, z."""
+        return np.column_stack((self.x, self.y, self.z))
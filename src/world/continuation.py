@@ -0,0 +1,346 @@
+import numpy as np
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional, Tuple
+from src.world.tiles import TiledArray
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    current_bytes: int = 0
+    max_bytes: int = 0
+
+class LayerCache:
+    """
+    LRU cache of map layers bounded by total size in bytes.
+    """
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        """
+        Args:
+            max_bytes: Memory budget for cached arrays. Layers larger than the
+                       budget are returned to the caller but never stored.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        layer = self._entries.get(key)
+        if layer is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return layer
+
+    def put(self, key: Hashable, layer: np.ndarray):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key).nbytes
+        if layer.nbytes > self.max_bytes:
+            return
+        self._entries[key] = layer
+        self._bytes += layer.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], np.ndarray]) -> np.ndarray:
+        layer = self.get(key)
+        if layer is None:
+            layer = factory()
+            self.put(key, layer)
+        return layer
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                          entries=len(self._entries), current_bytes=self._bytes,
+                          max_bytes=self.max_bytes)
+
+class SpectralContinuation:
+    """
+    Upward continuation of a gridded potential-field map in the wavenumber domain.
+
+    The map spectrum is computed once; the field at height h above the map
+    plane is then a single multiply by exp(-|k| h) and an inverse FFT.
+    """
+    def __init__(self, magnetic_map: np.ndarray, resolution: float, pad_fraction: float = 0.25):
+        """
+        Args:
+            magnetic_map: 2D map at the reference (ground) level.
+            resolution: Grid spacing (meters per pixel).
+            pad_fraction: Reflective padding on each side, as a fraction of the
+                          map size, to suppress FFT wrap-around at the edges.
+        """
+        from scipy import fft
+
+        self.shape = magnetic_map.shape
+        self.resolution = resolution
+        self.dtype = magnetic_map.dtype
+        self.mean = float(magnetic_map.mean())
+
+        height_px, width_px = self.shape
+        self.pad_y = int(np.ceil(height_px * pad_fraction))
+        self.pad_x = int(np.ceil(width_px * pad_fraction))
+        padded_shape = (fft.next_fast_len(height_px + 2 * self.pad_y, real=True),
+                        fft.next_fast_len(width_px + 2 * self.pad_x, real=True))
+        extra_y = padded_shape[0] - height_px - 2 * self.pad_y
+        extra_x = padded_shape[1] - width_px - 2 * self.pad_x
+
+        padded = np.pad(magnetic_map - self.mean,
+                        ((self.pad_y, self.pad_y + extra_y), (self.pad_x, self.pad_x + extra_x)),
+                        mode='reflect' if min(self.shape) > 1 else 'edge')
+        self.padded_shape = padded.shape
+        self.spectrum = fft.rfft2(padded, workers=-1)
+
+        # Radial wavenumber |k| in rad/m for the rfft2 layout
+        ky = 2.0 * np.pi * fft.fftfreq(self.padded_shape[0], d=resolution)
+        kx = 2.0 * np.pi * fft.rfftfreq(self.padded_shape[1], d=resolution)
+        self.k = np.sqrt(ky[:, None] ** 2 + kx[None, :] ** 2)
+
+    def layer(self, height: float, smoothing: float = 0.0, detail: bool = False) -> np.ndarray:
+        """
+        Returns the map continued upward by `height` meters.
+
+        Args:
+            height: Continuation height (m).
+            smoothing: Standard deviation (m) of a Gaussian low-pass applied
+                       together with the continuation.
+            detail: Return the complement instead: the continued map minus
+                    its low-passed version (zero mean).
+        """
+        from scipy import fft
+
+        transfer = np.exp(-self.k * max(0.0, height))
+        if smoothing > 0.0 or detail:
+            lowpass = np.exp(-0.5 * (self.k * smoothing) ** 2)
+            transfer *= (1.0 - lowpass) if detail else lowpass
+        continued = fft.irfft2(self.spectrum * transfer, s=self.padded_shape, workers=-1)
+        height_px, width_px = self.shape
+        out = continued[self.pad_y:self.pad_y + height_px, self.pad_x:self.pad_x + width_px]
+        if not detail:
+            out = out + self.mean
+        return out.astype(self.dtype, copy=False)
+
+class TiledContinuation:
+    """
+    Lazy, tile-by-tile upward continuation.
+
+    The continuation kernel has a heavy tail (weight beyond radius R is
+    h/sqrt(R^2+h^2)), so continuing a tile from its neighbourhood alone
+    needs a halo that grows with h. Instead the map is split with a Gaussian
+    low-pass of width `smoothing`: the smooth part, which carries the tail,
+    is continued once per height on a block-averaged coarse grid, and only
+    the detail is continued per tile. The detail kernel decays within a few
+    `smoothing` lengths, so tiles use a fixed halo and their cost does not
+    depend on the height. Tiles can optionally be prefetched on a
+    background thread.
+    """
+    def __init__(self, magnetic_map, resolution: float, tile_size: int = 256,
+                 halo: Optional[int] = None, coarse_factor: Optional[int] = None,
+                 cache: Optional[LayerCache] = None, coarse_cache_bytes: int = 64 * 2**20):
+        """
+        Args:
+            magnetic_map: 2D ground-level map (any object supporting 2D slicing).
+            resolution: Grid spacing (meters per pixel).
+            tile_size: Tile edge length (pixels).
+            halo: Padding around each tile (pixels). Defaults to four
+                  smoothing lengths plus a small margin.
+            coarse_factor: Block size (pixels) of the coarse grid; the
+                           low-pass width is one coarse cell. Defaults to
+                           tile_size / 32.
+            cache: Cache for computed tiles, keyed by (height, ty, tx).
+            coarse_cache_bytes: Memory budget for the coarse layers.
+        """
+        self.source = magnetic_map
+        self.shape = tuple(magnetic_map.shape)
+        self.dtype = magnetic_map.dtype
+        self.resolution = resolution
+        self.tile_size = tile_size
+        self.coarse_factor = coarse_factor if coarse_factor is not None else max(1, tile_size // 32)
+        self.smoothing = self.coarse_factor * resolution
+        self.halo = halo
+        self.cache = cache if cache is not None else LayerCache()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._executor = None
+        self._coarse_lock = threading.Lock()
+        self._coarse = None # SpectralContinuation of the block-averaged map, built on first use
+        self._coarse_layers = LayerCache(coarse_cache_bytes)
+
+    def halo_for(self, height: float) -> int:
+        """Tile halo (pixels); independent of the height."""
+        if self.halo is not None:
+            return self.halo
+        return int(np.ceil(4.0 * self.smoothing / self.resolution)) + 8
+
+    def layer(self, height: float) -> 'ContinuedLayer':
+        """
+        Returns an array-like view of the map continued to `height`.
+        Tiles are computed only when indexed.
+        """
+        return ContinuedLayer(self, height)
+
+    def tile(self, height: float, ty: int, tx: int) -> np.ndarray:
+        key = (height, ty, tx)
+        with self._lock:
+            tile = self.cache.get(key)
+            if tile is not None:
+                return tile
+            future = self._pending.get(key)
+        if future is not None:
+            # Being computed by the prefetcher; wait rather than duplicate work.
+            # A prefetch cancelled by shutdown() is a miss: compute it here.
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        tile = self._compute_tile(height, ty, tx)
+        with self._lock:
+            self.cache.put(key, tile)
+        return tile
+
+    def _compute_tile(self, height: float, ty: int, tx: int) -> np.ndarray:
+        from scipy import ndimage
+
+        ts = self.tile_size
+        height_px, width_px = self.shape
+        y0, y1 = ty * ts, min((ty + 1) * ts, height_px)
+        x0, x1 = tx * ts, min((tx + 1) * ts, width_px)
+        halo = self.halo_for(height)
+
+        # Clip the halo window to the map and reflect-pad whatever falls outside,
+        # matching the edge treatment of the full-map SpectralContinuation.
+        wy0, wy1 = max(0, y0 - halo), min(height_px, y1 + halo)
+        wx0, wx1 = max(0, x0 - halo), min(width_px, x1 + halo)
+        window = np.asarray(self.source[wy0:wy1, wx0:wx1])
+        pad = ((halo - (y0 - wy0), halo - (wy1 - y1)), (halo - (x0 - wx0), halo - (wx1 - x1)))
+        if any(p for axis in pad for p in axis):
+            window = np.pad(window, pad, mode='reflect' if min(window.shape) > 1 else 'edge')
+
+        # The window already carries the halo, so no further padding is needed
+        detail = SpectralContinuation(window, self.resolution, pad_fraction=0.0).layer(
+            height, smoothing=self.smoothing, detail=True)
+        # Smooth part: cubic interpolation of the coarse layer at the pixel centres
+        f = self.coarse_factor
+        cy = (np.arange(y0, y1) - 0.5 * (f - 1)) / f
+        cx = (np.arange(x0, x1) - 0.5 * (f - 1)) / f
+        smooth = ndimage.map_coordinates(self._coarse_layer(height), np.meshgrid(cy, cx, indexing='ij'),
+                                         order=3, mode='nearest', prefilter=False)
+        tile = smooth + detail[halo:halo + (y1 - y0), halo:halo + (x1 - x0)]
+        return tile.astype(self.dtype, copy=False)
+
+    def _coarse_layer(self, height: float) -> np.ndarray:
+        """Cubic spline coefficients of the low-passed layer on the coarse grid."""
+        from scipy import ndimage
+
+        with self._coarse_lock:
+            if self._coarse is None:
+                self._coarse = SpectralContinuation(self._block_mean(), self.resolution * self.coarse_factor)
+            return self._coarse_layers.get_or_create(height, lambda: ndimage.spline_filter(
+                self._coarse.layer(height, smoothing=self.smoothing), order=3, mode='nearest'))
+
+    def _block_mean(self) -> np.ndarray:
+        """Map averaged over coarse_factor^2 blocks, read in bands of whole tiles."""
+        f = self.coarse_factor
+        height_px, width_px = self.shape
+        cx = -(-width_px // f)
+        band = f * max(1, self.tile_size // f)
+        rows = []
+        for y0 in range(0, height_px, band):
+            block = np.asarray(self.source[y0:min(y0 + band, height_px), :])
+            cy = -(-block.shape[0] // f)
+            if cy * f > block.shape[0] or cx * f > width_px:
+                # Partial blocks at the far edges repeat the last row/column
+                block = np.pad(block, ((0, cy * f - block.shape[0]), (0, cx * f - width_px)), mode='edge')
+            rows.append(block.reshape(cy, f, cx, f).sum(axis=3, dtype=float).sum(axis=1) / f**2)
+        return np.concatenate(rows)
+
+    def prefetch(self, height: float, tiles: List[Tuple[int, int]]) -> List[Future]:
+        """
+        Schedules tiles for computation on a background thread.
+
+        Returns:
+            Futures for the tiles that were not already cached or pending.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile-prefetch")
+        submitted = []
+        with self._lock:
+            for ty, tx in tiles:
+                key = (height, ty, tx)
+                if key in self.cache or key in self._pending:
+                    continue
+                future = self._executor.submit(self._prefetch_tile, key)
+                self._pending[key] = future
+                submitted.append((key, future))
+        # Registered outside the lock: the callback runs at once for futures
+        # that already finished. It also fires for futures cancelled by
+        # shutdown(), whose _prefetch_tile never runs.
+        for key, future in submitted:
+            future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return [future for _, future in submitted]
+
+    def _prefetch_tile(self, key) -> np.ndarray:
+        tile = self._compute_tile(*key)
+        with self._lock:
+            self.cache.put(key, tile)
+        return tile
+
+    def _forget(self, key, future: Future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def prefetch_along(self, x: float, y: float, heading: float, height: float,
+                       distance: float) -> List[Future]:
+        """
+        Prefetches the tiles under a straight track from (x, y) along `heading`
+        (0 = North, clockwise positive) for `distance` meters.
+        """
+        step = 0.5 * self.tile_size * self.resolution
+        s = np.arange(0.0, distance + step, step)
+        px = (x + s * np.sin(heading)) / self.resolution
+        py = (y + s * np.cos(heading)) / self.resolution
+        inside = (px >= 0) & (px < self.shape[1]) & (py >= 0) & (py < self.shape[0])
+        tiles = []
+        for ty, tx in zip((py[inside] // self.tile_size).astype(int), (px[inside] // self.tile_size).astype(int)):
+            if (ty, tx) not in tiles:
+                tiles.append((ty, tx))
+        return self.prefetch(height, tiles)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+class ContinuedLayer(TiledArray):
+    """
+    Array-like altitude layer backed by a TiledContinuation.
+    """
+    def __init__(self, engine: TiledContinuation, height: float):
+        super().__init__(engine.shape, engine.tile_size, engine.dtype)
+        self.engine = engine
+        self.height = height
+
+    def get_tile(self, ty: int, tx: int) -> np.ndarray:
+        return self.engine.tile(self.height, ty, tx)
@@ -1,6 +1,9 @@
 import numpy as np
 from dataclasses import dataclass
 from typing import Tuple, Optional
+from src.world.continuation import LayerCache, SpectralContinuation, TiledContinuation
+from src.world.store import MapStore
+from src.core.metrics import Metrics, NULL_METRICS
 
 @dataclass
 class MapConfig:
@@ -8,15 +11,67 @@ class MapConfig:
     height: float # meters
     resolution: float # meters per pixel
     seed: Optional[int] = None
+    continuation: str = "spectral" # "spectral" (FFT upward continuation) or "gaussian" (legacy blur)
+    layer_cache_bytes: int = 256 * 2**20 # Memory budget for cached altitude layers
+    tile_size: Optional[int] = None # If set, continue lazily in tiles of this many pixels
+    generator: str = "gaussian" # "gaussian" (per-scale filtering) or "spectral" (single FFT pass)
+    dtype: str = "float64" # Map storage precision ("float64" or "float32")
 
 class World:
     """
     Represents the physical world and the magnetic environment.
     """
-    def __init__(self, config: MapConfig):
+    def __init__(self, config: MapConfig, store: Optional[MapStore] = None,
+                 magnetic_map: Optional[np.ndarray] = None, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            config: Map configuration.
+            store: Optional on-disk MapStore. Seeded maps and their continued
+                   layers are loaded from it (memory-mapped) when present and
+                   written to it after generation otherwise.
+            magnetic_map: Optional precomputed ground-level map to use as is
+                          (e.g. a shared-memory view); skips generation.
+            metrics: Optional Metrics receiving lookup counters and layer
+                     cache misses / creation times.
+        """
+        self._init_state(config, store, metrics)
+
+        if magnetic_map is not None:
+            self.magnetic_map = magnetic_map
+        else:
+            stored_map = self.store.load_map(config) if self.store is not None else None
+            if stored_map is not None:
+                self.magnetic_map = stored_map
+            else:
+                self._generate_magnetic_map()
+                if self.store is not None:
+                    self.store.save_map(config, self.magnetic_map)
+
+    def _init_state(self, config: MapConfig, store: Optional[MapStore], metrics: Optional[Metrics]):
+        """
+        Sets up everything except the ground-level map. Subclasses with their
+        own map storage (TiledWorld) call this instead of __init__.
+        """
         self.config = config
+        self.metrics = metrics if metrics is not None else NULL_METRICS
         self.rng = np.random.default_rng(config.seed)
-        self._generate_magnetic_map()
+        # Base field (Earth's background field, e.g., ~50,000 nT)
+        self.background_field = 50000.0
+        # Unseeded maps are random by design and never shared
+        self.store = store if config.seed is not None else None
+        self._altitude_cache = LayerCache(config.layer_cache_bytes)
+        self._continuation = None
+        # Layers provided externally (e.g. shared memory); never evicted
+        self._pinned_layers = {}
+
+    # Multi-scale noise parameters (Scale in pixels, Amplitude in nT)
+    # Assuming 10m resolution, 5000m width -> 500px
+    ANOMALY_SCALES = [
+        (100.0, 500.0), # Large geological structures (1km)
+        (25.0, 150.0),  # Mid-size features (250m)
+        (5.0, 40.0),    # Finer details (50m)
+        (1.0, 5.0)      # High freq noise
+    ]
 
     def _generate_magnetic_map(self):
         """
@@ -24,27 +79,28 @@ class World:
         to mimic geological features (less periodic, more random/fractal).
         Values are in nanoTesla (nT).
         """
-        from scipy.ndimage import gaussian_filter
-        
         width_px = int(self.config.width / self.config.resolution)
         height_px = int(self.config.height / self.config.resolution)
+        dtype = np.dtype(self.config.dtype)
         
-        # Base field (Earth's background field, e.g., ~50,000 nT)
-        self.background_field = 50000.0
-        self.magnetic_map = np.full((height_px, width_px), self.background_field)
+        self.magnetic_map = np.full((height_px, width_px), self.background_field, dtype=dtype)
         
-        # Multi-scale noise parameters (Scale in pixels, Amplitude in nT)
-        # Assuming 10m resolution, 5000m width -> 500px
-        scales = [
-            (100.0, 500.0), # Large geological structures (1km)
-            (25.0, 150.0),  # Mid-size features (250m)
-            (5.0, 40.0),    # Finer details (50m)
-            (1.0, 5.0)      # High freq noise
-        ]
+        if self.config.generator == "gaussian":
+            self._add_filtered_noise(dtype)
+        elif self.config.generator == "spectral":
+            self._add_spectral_noise(dtype)
+        else:
+            raise ValueError(f"Unknown map generator: {self.config.generator}")
+
+    def _add_filtered_noise(self, dtype):
+        """
+        Reference generator: one white-noise field and one gaussian_filter per scale.
+        """
+        from scipy.ndimage import gaussian_filter
         
-        for sigma, amplitude in scales:
+        for sigma, amplitude in self.ANOMALY_SCALES:
             # Generate random white noise
-            noise = self.rng.standard_normal((height_px, width_px))
+            noise = self.rng.standard_normal(self.magnetic_map.shape, dtype=dtype)
             # Smooth it
             filtered = gaussian_filter(noise, sigma=sigma)
             # Normalize and scale
@@ -53,40 +109,225 @@ class World:
             
             self.magnetic_map += filtered * amplitude
 
+    def _add_spectral_noise(self, dtype):
+        """
+        Fast generator: shapes a single white-noise field in one FFT pass.
+
+        Each scale of the reference generator is unit-variance Gaussian-filtered
+        noise times its amplitude. Independent components add in power, so the
+        combined transfer function is sqrt(sum_i a_i^2 |G_i(k)|^2 / mean|G_i|^2),
+        giving the same power spectrum and total variance (sum_i a_i^2).
+        The synthesized field is periodic across the map edges.
+        """
+        from scipy import fft
+
+        height_px, width_px = self.magnetic_map.shape
+        if height_px == 0 or width_px == 0:
+            return
+        spectrum = fft.rfft2(self.rng.standard_normal((height_px, width_px), dtype=dtype), workers=-1)
+
+        # Frequencies in cycles/pixel. |G|^2 of a Gaussian filter is separable,
+        # so the transfer function is built from 1D factors without 2D temporaries
+        # beyond the accumulator itself.
+        fy = fft.fftfreq(height_px)
+        fx_full = fft.fftfreq(width_px)
+        fx = fft.rfftfreq(width_px)
+        power = np.zeros(spectrum.shape, dtype=dtype)
+        for sigma, amplitude in self.ANOMALY_SCALES:
+            c = -4.0 * np.pi**2 * sigma**2
+            gy = np.exp(c * fy**2)
+            gx = np.exp(c * fx**2)
+            # Mean of |G|^2 over the full (two-sided) spectrum
+            mean_g2 = gy.mean() * np.exp(c * fx_full**2).mean()
+            weight = amplitude**2 / mean_g2
+            power += np.outer((gy * weight).astype(dtype), gx.astype(dtype))
+
+        np.sqrt(power, out=power)
+        power[0, 0] = 0.0 # Zero-mean anomaly
+        spectrum *= power
+        del power
+        self.magnetic_map += fft.irfft2(spectrum, s=(height_px, width_px), workers=-1).astype(dtype, copy=False)
+
     def get_magnetic_field(self, x: float, y: float, z: float) -> float:
         """
         Returns the magnetic intensity at (x, y, z).
-        Simulates Upward Continuation by caching maps smoothed for specific altitudes.
+        Thin wrapper around get_magnetic_field_batch for single points.
+        """
+        return float(self.get_magnetic_field_batch(x, y, z))
+
+    def get_magnetic_field_batch(self, xs, ys, zs) -> np.ndarray:
+        """
+        Returns the magnetic intensity at many points in one call.
+        Values are bilinearly interpolated between pixel centres; points
+        outside the map return the background field.
+
+        Args:
+            xs, ys, zs: Array-likes of coordinates (broadcast against each other).
+
+        Returns:
+            Array of field values (nT) with the broadcast shape of the inputs.
+        """
+        xs, ys, zs = np.broadcast_arrays(np.asarray(xs, dtype=float),
+                                         np.asarray(ys, dtype=float),
+                                         np.asarray(zs, dtype=float))
+        z_keys = self._altitude_key(zs)
+        out = np.empty(xs.shape)
+        self.metrics.inc("world.lookups")
+        self.metrics.inc("world.lookup_points", xs.size)
+
+        # Common case: every point shares one altitude layer.
+        if z_keys.size and np.all(z_keys == z_keys.flat[0]):
+            out[...] = self._sample_layer(self._get_layer(float(z_keys.flat[0])), xs, ys)
+            return out
+
+        for z_key in np.unique(z_keys):
+            mask = z_keys == z_key
+            out[mask] = self._sample_layer(self._get_layer(float(z_key)), xs[mask], ys[mask])
+        return out
+
+    def layer(self, z: float):
+        """
+        Returns the map layer that queries at altitude z (m) are sampled
+        from: the ground map, a pinned layer or the layer continued to z
+        rounded to 10 m (a lazy tiled view in tiled mode).
+        """
+        return self._get_layer(self.layer_altitude(z))
+
+    @classmethod
+    def layer_altitude(cls, z: float) -> float:
+        """Altitude (m) of the layer serving queries at z."""
+        return float(cls._altitude_key(z))
+
+    def pin_layer(self, z: float, layer: np.ndarray):
+        """
+        Serves `layer` (e.g. a shared-memory view) for altitude z instead of
+        continuing the map. Pinned layers are never evicted.
+        """
+        self._pinned_layers[self.layer_altitude(z)] = layer
+
+    def clear_layers(self, keep_spectrum: bool = True):
+        """
+        Drops cached and pinned altitude layers. With keep_spectrum=False the
+        continuation state (the map spectrum, tiled engine) goes too, so the
+        next layer is continued from scratch.
         """
+        self._altitude_cache.clear()
+        self._pinned_layers.clear()
+        if not keep_spectrum:
+            if isinstance(self._continuation, TiledContinuation):
+                self._continuation.shutdown()
+            self._continuation = None
+
+    @staticmethod
+    def _altitude_key(z):
         # Quantize altitude to cache key (e.g., nearest 10m) to avoid thrashing
-        z_key = round(max(0.0, z) / 10.0) * 10.0
-        
-        if not hasattr(self, '_altitude_cache'):
-            self._altitude_cache = {}
-            
-        if z_key not in self._altitude_cache:
+        return np.round(np.maximum(0.0, z) / 10.0) * 10.0
+
+    def _get_layer(self, z_key: float) -> np.ndarray:
+        """
+        Returns the map at altitude z_key.
+        Continued layers are kept in a byte-bounded LRU cache.
+        """
+        if z_key <= 0.0:
+            return self.magnetic_map
+        if z_key in self._pinned_layers:
+            return self._pinned_layers[z_key]
+        if self.config.tile_size and self.config.continuation == "spectral":
+            # Tiled mode: the layer is a lazy view; tiles share the layer cache budget
+            return self._tiled_continuation().layer(z_key)
+        return self._altitude_cache.get_or_create(z_key, lambda: self._create_layer(z_key))
+
+    def _create_layer(self, z_key: float) -> np.ndarray:
+        """Layer cache miss: loads or continues the layer (counted and timed)."""
+        self.metrics.inc("world.layer_cache_miss")
+        with self.metrics.time("world.layer_create"):
+            return self._load_or_continue_map(z_key)
+
+    def _load_or_continue_map(self, z_key: float) -> np.ndarray:
+        if self.store is None:
+            return self._continue_map(z_key)
+        layer = self.store.load_layer(self.config, self.config.continuation, z_key)
+        if layer is None:
+            layer = self._continue_map(z_key)
+            self.store.save_layer(self.config, self.config.continuation, z_key, layer)
+        return layer
+
+    def _continue_map(self, z_key: float) -> np.ndarray:
+        if self.config.continuation == "spectral":
+            # Upward continuation: multiply the map spectrum by exp(-|k| h).
+            # The spectrum is computed once on first use and shared by all altitudes.
+            if self._continuation is None:
+                self._continuation = SpectralContinuation(self.magnetic_map, self.config.resolution)
+            return self._continuation.layer(z_key)
+        elif self.config.continuation == "gaussian":
             from scipy.ndimage import gaussian_filter
             # Approx: Upward continuation behaves like a low-pass filter.
             # We use a Gaussian blur where sigma scales with altitude.
             # Heuristic: sigma (pixels) ~ altitude (meters) / resolution (meters/pixel)
             # This is not exact potential field theory but gives correct qualitative behavior.
             sigma = z_key / self.config.resolution
-            
             if sigma < 0.5:
-                self._altitude_cache[z_key] = self.magnetic_map # No significant blur
-            else:
-                self._altitude_cache[z_key] = gaussian_filter(self.magnetic_map, sigma=sigma)
-        
-        map_at_z = self._altitude_cache[z_key]
-        
-        idx_x = int(x / self.config.resolution)
-        idx_y = int(y / self.config.resolution)
-        
-        # Boundary checks
-        if 0 <= idx_x < map_at_z.shape[1] and 0 <= idx_y < map_at_z.shape[0]:
-            return map_at_z[idx_y, idx_x]
+                return self.magnetic_map # No significant blur
+            return gaussian_filter(self.magnetic_map, sigma=sigma)
         else:
-            return self.background_field
+            raise ValueError(f"Unknown continuation method: {self.config.continuation}")
+
+    def _tiled_continuation(self) -> TiledContinuation:
+        if self._continuation is None:
+            self._continuation = TiledContinuation(self.magnetic_map, self.config.resolution,
+                                                   tile_size=self.config.tile_size,
+                                                   cache=self._altitude_cache)
+        return self._continuation
+
+    def prefetch_along(self, x: float, y: float, heading: float, z: float, distance: float = 2000.0):
+        """
+        Starts background computation of the continued tiles ahead of the
+        aircraft. No-op unless the world runs in tiled continuation mode.
+
+        Args:
+            x, y, z: Current position.
+            heading: Current heading (radians, 0 = North).
+            distance: Look-ahead distance (meters).
+        """
+        z_key = float(self._altitude_key(z))
+        if z_key <= 0.0 or not self.config.tile_size or self.config.continuation != "spectral":
+            return []
+        return self._tiled_continuation().prefetch_along(x, y, heading, z_key, distance)
+
+    @property
+    def layer_cache_stats(self):
+        """Hit/miss/eviction statistics of the altitude layer cache."""
+        return self._altitude_cache.stats
+
+    def _sample_layer(self, layer: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Bilinear interpolation of a map layer at metric coordinates.
+        Points outside the layer footprint return the background field.
+        """
+        res = self.config.resolution
+        height_px, width_px = layer.shape
+        out = np.full(xs.shape, self.background_field)
+
+        # Boundary checks (NaN coordinates also fail these comparisons)
+        inside = (xs >= 0.0) & (xs < width_px * res) & (ys >= 0.0) & (ys < height_px * res)
+        if not np.any(inside):
+            return out
+
+        # Pixel (i, j) covers [i*res, (i+1)*res), so its centre is at (i + 0.5) * res.
+        # Clamping keeps the outer half-pixel at the edge value.
+        fx = np.clip(xs[inside] / res - 0.5, 0.0, width_px - 1)
+        fy = np.clip(ys[inside] / res - 0.5, 0.0, height_px - 1)
+        x0 = np.minimum(fx.astype(np.intp), max(width_px - 2, 0))
+        y0 = np.minimum(fy.astype(np.intp), max(height_px - 2, 0))
+        x1 = np.minimum(x0 + 1, width_px - 1)
+        y1 = np.minimum(y0 + 1, height_px - 1)
+        tx = fx - x0
+        ty = fy - y0
+
+        top = layer[y0, x0] * (1.0 - tx) + layer[y0, x1] * tx
+        bottom = layer[y1, x0] * (1.0 - tx) + layer[y1, x1] * tx
+        out[inside] = top * (1.0 - ty) + bottom * ty
+        return out
 
     def get_map_bounds(self) -> Tuple[float, float, float, float]:
         """Returns (min_x, max_x, min_y, max_y)"""
@@ -1,6 +1,7 @@
 import numpy as np
 from scipy.interpolate import griddata
-from typing import Tuple
+from scipy.spatial import QhullError
+from typing import Optional, Tuple
 
 class MapReconstructor:
     """
@@ -8,7 +9,10 @@ class MapReconstructor:
     """
     @staticmethod
     def reconstruct(x_points: np.ndarray, y_points: np.ndarray, values: np.ndarray, 
-                   grid_bounds: Tuple[float, float, float, float], resolution: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                   grid_bounds: Tuple[float, float, float, float], resolution: float,
+                   method: str = 'linear', engine: str = 'global', tile_size: int = 256,
+                   overlap: int = 16, workers: Optional[int] = None,
+                   executor: str = 'thread') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Args:
             x_points: 1D array of x coordinates.
@@ -16,6 +20,15 @@ class MapReconstructor:
             values: 1D array of measured values.
             grid_bounds: (min_x, max_x, min_y, max_y)
             resolution: Grid resolution.
+            method: griddata interpolation method ('linear', 'nearest' or 'cubic').
+            engine: 'global' triangulates all samples at once; 'tiled' splits
+                    the grid into overlapping tiles interpolated in parallel
+                    (for multi-million-sample surveys).
+            tile_size: Tile edge in grid cells ('tiled' engine).
+            overlap: Cells each tile extends into its neighbours; the overlaps
+                     are cross-faded so tile seams do not show ('tiled' engine).
+            workers: Pool size for the 'tiled' engine (default: CPU count).
+            executor: 'thread' or 'process' pool for the 'tiled' engine.
             
         Returns:
             (grid_x, grid_y, grid_z) where grid_z is the interpolated map.
@@ -27,9 +40,204 @@ class MapReconstructor:
         yi = np.linspace(min_y, max_y, int((max_y - min_y) / resolution))
         grid_x, grid_y = np.meshgrid(xi, yi)
         
-        # Interpolate
-        # 'cubic' is good for smooth fields, but 'linear' is more robust to sparsity.
-        # Let's use 'linear' generally, or 'nearest' if very sparse.
-        grid_z = griddata((x_points, y_points), values, (grid_x, grid_y), method='linear')
+        if engine == 'global':
+            # Interpolate
+            # 'cubic' is good for smooth fields, but 'linear' is more robust to sparsity.
+            # Let's use 'linear' generally, or 'nearest' if very sparse.
+            grid_z = griddata((x_points, y_points), values, (grid_x, grid_y), method=method)
+        elif engine == 'tiled':
+            grid_z = _reconstruct_tiled(np.asarray(x_points, dtype=float).ravel(),
+                                        np.asarray(y_points, dtype=float).ravel(),
+                                        np.asarray(values, dtype=float).ravel(),
+                                        xi, yi, method, tile_size, overlap, workers, executor)
+        else:
+            raise ValueError(f"Unknown reconstruction engine: {engine}")
         
         return grid_x, grid_y, grid_z
+
+def _tile_ramp(n: int, lo_margin: int, hi_margin: int) -> np.ndarray:
+    """
+    1D blend weights over an extended tile of n cells: linear ramps across the
+    2 * margin cells shared with the neighbour on each side, 1 elsewhere. The
+    ramps of two neighbouring tiles sum to 1 in their shared band.
+    """
+    d = np.arange(n) + 0.5
+    w = np.ones(n)
+    if lo_margin:
+        w = np.minimum(w, d / (2 * lo_margin))
+    if hi_margin:
+        w = np.minimum(w, (n - d) / (2 * hi_margin))
+    return w
+
+def _interpolate_tile(px: np.ndarray, py: np.ndarray, pv: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                      method: str) -> np.ndarray:
+    """Interpolates one tile's samples onto its (xs, ys) grid (NaN without support)."""
+    if px.size < 3:
+        return np.full((ys.size, xs.size), np.nan)
+    gx, gy = np.meshgrid(xs, ys)
+    try:
+        return griddata((px, py), pv, (gx, gy), method=method)
+    except QhullError:
+        # Degenerate (e.g. collinear) sample set inside this tile
+        return np.full((ys.size, xs.size), np.nan)
+
+def _reconstruct_tiled(x: np.ndarray, y: np.ndarray, v: np.ndarray, xi: np.ndarray, yi: np.ndarray,
+                       method: str, tile_size: int, overlap: int, workers: Optional[int],
+                       executor: str) -> np.ndarray:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from scipy.spatial import cKDTree
+
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unknown executor: {executor}")
+    ny, nx = yi.size, xi.size
+    tile_size = max(1, int(tile_size))
+    overlap = max(0, int(overlap))
+    dx = xi[1] - xi[0] if nx > 1 else 1.0
+    dy = yi[1] - yi[0] if ny > 1 else 1.0
+
+    # Samples in grid-cell units so one Chebyshev (p=inf) ball query selects
+    # a square window per tile
+    tree = cKDTree(np.column_stack(((x - xi[0]) / dx, (y - yi[0]) / dy)))
+    # Samples this many cells beyond the extended tile give the triangulation
+    # support up to its edge. The margin follows the widest gaps between
+    # samples, i.e. how far grid points lie from their nearest sample: for
+    # line surveys that is half the line spacing, however densely each line
+    # is sampled. Capped at a tile so large unsurveyed areas stay cheap.
+    probes = np.random.default_rng(0).uniform((-0.5, -0.5), (nx - 0.5, ny - 0.5), (min(nx * ny, 65536), 2))
+    gap = float(np.quantile(tree.query(probes)[0], 0.95)) if x.size else 0.0
+    support = overlap + 2 + int(np.ceil(min(3.0 * gap, tile_size)))
+
+    tiles = []
+    for r0 in range(0, ny, tile_size):
+        for c0 in range(0, nx, tile_size):
+            r1, c1 = min(r0 + tile_size, ny), min(c0 + tile_size, nx)
+            er0, er1 = max(r0 - overlap, 0), min(r1 + overlap, ny)
+            ec0, ec1 = max(c0 - overlap, 0), min(c1 + overlap, nx)
+            centre = (0.5 * (ec0 + ec1 - 1), 0.5 * (er0 + er1 - 1))
+            half = 0.5 * max(ec1 - ec0, er1 - er0) + support
+            idx = np.asarray(tree.query_ball_point(centre, half, p=np.inf), dtype=np.intp)
+            tiles.append(((er0, er1, ec0, ec1), (r0 - er0, er1 - r1, c0 - ec0, ec1 - c1), idx))
+
+    value_sum = np.zeros((ny, nx))
+    weight_sum = np.zeros((ny, nx))
+    pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        futures = [pool.submit(_interpolate_tile, x[idx], y[idx], v[idx],
+                               xi[ec0:ec1], yi[er0:er1], method)
+                   for (er0, er1, ec0, ec1), _, idx in tiles]
+        for future, ((er0, er1, ec0, ec1), (top, bottom, left, right), _) in zip(futures, tiles):
+            z = future.result()
+            w = np.outer(_tile_ramp(er1 - er0, top, bottom), _tile_ramp(ec1 - ec0, left, right))
+            valid = np.isfinite(z)
+            w = np.where(valid, w, 0.0)
+            value_sum[er0:er1, ec0:ec1] += w * np.where(valid, z, 0.0)
+            weight_sum[er0:er1, ec0:ec1] += w
+
+    grid_z = np.full((ny, nx), np.nan)
+    np.divide(value_sum, weight_sum, out=grid_z, where=weight_sum > 0)
+    return grid_z
+
+class IncrementalReconstructor:
+    """
+    Streaming map reconstruction for use while the survey is still flying.
+
+    Each sample is splatted into Gaussian-weighted sum/weight accumulators
+    over the grid cells within `radius` (normalized convolution), so an
+    ingest costs work proportional to the new samples and the cells they
+    touch. The current map and coverage holes can be read at any time.
+    """
+    def __init__(self, grid_bounds: Tuple[float, float, float, float], resolution: float,
+                 radius: Optional[float] = None, sigma: Optional[float] = None):
+        """
+        Args:
+            grid_bounds: (min_x, max_x, min_y, max_y)
+            resolution: Grid resolution (same grid as MapReconstructor.reconstruct).
+            radius: Influence radius of a sample (m). Defaults to 2 grid cells.
+            sigma: Gaussian weight width (m). Defaults to radius / 2.
+        """
+        self.min_x, self.max_x, self.min_y, self.max_y = grid_bounds
+        self.xi = np.linspace(self.min_x, self.max_x, int((self.max_x - self.min_x) / resolution))
+        self.yi = np.linspace(self.min_y, self.max_y, int((self.max_y - self.min_y) / resolution))
+        self.dx = self.xi[1] - self.xi[0] if self.xi.size > 1 else resolution
+        self.dy = self.yi[1] - self.yi[0] if self.yi.size > 1 else resolution
+        self.shape = (self.yi.size, self.xi.size)
+        self.radius = radius if radius is not None else 2.0 * max(self.dx, self.dy)
+        self.sigma = sigma if sigma is not None else 0.5 * self.radius
+
+        self.weight_sum = np.zeros(self.shape)
+        self.value_sum = np.zeros(self.shape)
+        self.sample_count = np.zeros(self.shape, dtype=np.int64) # Samples whose nearest cell this is
+        self.n_samples = 0
+
+        # Cell offsets of the splat footprint
+        kx = int(np.ceil(self.radius / self.dx))
+        ky = int(np.ceil(self.radius / self.dy))
+        oy, ox = np.mgrid[-ky:ky + 1, -kx:kx + 1]
+        self._offsets_y = oy.ravel()
+        self._offsets_x = ox.ravel()
+
+    def ingest(self, x: np.ndarray, y: np.ndarray, values: np.ndarray):
+        """
+        Adds a chunk of samples to the accumulators.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        values = np.asarray(values, dtype=float).ravel()
+        if x.size == 0:
+            return
+        ny, nx = self.shape
+
+        # Fractional grid coordinates and nearest cells
+        fx = (x - self.min_x) / self.dx
+        fy = (y - self.min_y) / self.dy
+        cx = np.rint(fx).astype(np.intp)
+        cy = np.rint(fy).astype(np.intp)
+
+        nearest = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        np.add.at(self.sample_count, (cy[nearest], cx[nearest]), 1)
+        self.n_samples += x.size
+
+        # Footprint cells of every sample: (n, K)
+        ix = cx[:, None] + self._offsets_x[None, :]
+        iy = cy[:, None] + self._offsets_y[None, :]
+        d2 = ((ix - fx[:, None]) * self.dx) ** 2 + ((iy - fy[:, None]) * self.dy) ** 2
+        keep = (d2 <= self.radius ** 2) & (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        flat = (iy * nx + ix)[keep]
+        w = np.exp(-0.5 * d2[keep] / self.sigma ** 2)
+        wv = w * np.broadcast_to(values[:, None], keep.shape)[keep]
+
+        # Accumulate per touched cell only (no full-grid pass)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        self.weight_sum.reshape(-1)[cells] += np.bincount(inverse, weights=w, minlength=cells.size)
+        self.value_sum.reshape(-1)[cells] += np.bincount(inverse, weights=wv, minlength=cells.size)
+
+    @property
+    def grid_x(self) -> np.ndarray:
+        return np.meshgrid(self.xi, self.yi)[0]
+
+    @property
+    def grid_y(self) -> np.ndarray:
+        return np.meshgrid(self.xi, self.yi)[1]
+
+    def coverage(self, min_weight: float = 1e-3) -> np.ndarray:
+        """Boolean mask of cells with enough nearby data."""
+        return self.weight_sum >= min_weight
+
+    def coverage_fraction(self, min_weight: float = 1e-3) -> float:
+        return float(self.coverage(min_weight).mean()) if self.weight_sum.size else 0.0
+
+    def holes(self, min_weight: float = 1e-3) -> np.ndarray:
+        """Boolean mask of cells not yet covered by the survey."""
+        return ~self.coverage(min_weight)
+
+    def snapshot(self, min_weight: float = 1e-3) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (grid_x, grid_y, grid_z) like MapReconstructor.reconstruct, with NaN
+            in cells not yet covered.
+        """
+        covered = self.coverage(min_weight)
+        grid_z = np.full(self.shape, np.nan)
+        np.divide(self.value_sum, self.weight_sum, out=grid_z, where=covered)
+        grid_x, grid_y = np.meshgrid(self.xi, self.yi)
+        return grid_x, grid_y, grid_z
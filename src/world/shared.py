@@ -0,0 +1,152 @@
+import sys
+import weakref
+import numpy as np
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Tuple
+from src.world.environment import World, MapConfig
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+@dataclass(frozen=True)
+class SharedWorldHandle:
+    """
+    Picklable description of a published World; pass it to workers and
+    call attach_world() there.
+    """
+    config: MapConfig
+    background_field: float
+    base: SharedArraySpec
+    layers: Dict[float, SharedArraySpec] = field(default_factory=dict)
+
+class SharedWorld:
+    """
+    Owner of a World's base map and continued layers published into
+    multiprocessing.shared_memory.
+
+    The owner creates and unlinks the segments; workers only attach. Use as a
+    context manager, or call close() when the workers are done. Segments are
+    also unlinked when the owner is garbage collected or the process exits.
+    """
+    def __init__(self, world: World, altitudes: Iterable[float] = ()):
+        """
+        Args:
+            world: World to publish.
+            altitudes: Altitudes (m) whose continued layers are published too.
+        """
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._finalizer = weakref.finalize(self, _release_segments, self._segments)
+        try:
+            base = self._publish(np.asarray(world.magnetic_map))
+            layers = {}
+            for z in altitudes:
+                z_key = world.layer_altitude(z)
+                if z_key > 0.0 and z_key not in layers:
+                    layers[z_key] = self._publish(np.asarray(world.layer(z_key)))
+        except BaseException:
+            self.close()
+            raise
+        self.handle = SharedWorldHandle(world.config, world.background_field, base, layers)
+
+    def _publish(self, array: np.ndarray) -> SharedArraySpec:
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(shm)
+        _owned.add(shm.name)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return SharedArraySpec(shm.name, array.shape, array.dtype.str)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shm.size for shm in self._segments)
+
+    def close(self):
+        """Closes and unlinks all segments. Attached workers must be done."""
+        self._finalizer()
+
+    def __enter__(self) -> 'SharedWorld':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _release_segments(segments: List[shared_memory.SharedMemory]):
+    for shm in segments:
+        _owned.discard(shm.name)
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+# Segments created by SharedWorlds in this process
+_owned = set()
+# Worker segments whose close() failed because views of them were still referenced
+_unclosed: List[shared_memory.SharedMemory] = []
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Python < 3.13 registers every attached segment with the resource
+    # tracker, which would unlink it when this (non-owner) process exits.
+    # The owner and its pool workers share one tracker, where that entry is
+    # the owner's (repeats are no-ops): only drop it from a tracker of our own.
+    tracker = resource_tracker._resource_tracker
+    inherited = tracker._fd is not None and tracker._pid is None
+    shm = shared_memory.SharedMemory(name=name)
+    if name not in _owned and not inherited:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+def _view(shm: shared_memory.SharedMemory, spec: SharedArraySpec) -> np.ndarray:
+    # frombuffer keeps the memoryview exported (np.ndarray(buffer=...) does
+    # not), so close() refuses to unmap a segment that views still use
+    count = int(np.prod(spec.shape))
+    array = np.frombuffer(shm.buf, dtype=np.dtype(spec.dtype), count=count).reshape(spec.shape)
+    array.flags.writeable = False
+    return array
+
+def attach_world(handle: SharedWorldHandle) -> World:
+    """
+    Builds a read-only World whose base map and published layers are
+    zero-copy views of the owner's shared memory. Altitudes that were not
+    published are still continued locally on demand.
+    """
+    segments = []
+    base_shm = _open_segment(handle.base.name)
+    segments.append(base_shm)
+    world = World(handle.config, magnetic_map=_view(base_shm, handle.base))
+    world.background_field = handle.background_field
+    for z_key, spec in handle.layers.items():
+        shm = _open_segment(spec.name)
+        segments.append(shm)
+        world.pin_layer(z_key, _view(shm, spec))
+    # Set last: on teardown the array views above are released first
+    world._shared_segments = segments
+    return world
+
+def detach_world(world: World):
+    """
+    Drops a worker World's views and closes its shared-memory handles
+    (the owner still unlinks the segments).
+
+    A segment can only be closed once no NumPy view of it is left. Views
+    still held outside the World (e.g. a layer kept by a navigator) keep
+    their segment mapped; it is closed by a later detach_world() call once
+    they have been released.
+    """
+    segments = getattr(world, '_shared_segments', [])
+    world.magnetic_map = None
+    world.clear_layers(keep_spectrum=False)
+    still_open = []
+    for shm in segments + _unclosed:
+        try:
+            shm.close()
+        except BufferError:
+            still_open.append(shm)
+    segments.clear()
+    _unclosed[:] = still_open
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from dataclasses import asdict
+from typing import Optional
+
+# Bump whenever map generation or continuation output changes, so stale
+# entries written by older code are never reused.
+GENERATOR_VERSION = 1
+
+def atomic_save(path: str, array: np.ndarray):
+    """
+    Saves an array as .npy via a temporary file and rename, so concurrent
+    readers never see a partially written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class MapStore:
+    """
+    On-disk store of generated magnetic maps and continued altitude layers.
+
+    Entries are keyed by a hash of the map-defining MapConfig fields plus
+    GENERATOR_VERSION, written atomically as .npy files and opened
+    memory-mapped so that many processes share one copy in the page cache.
+    """
+    # MapConfig fields that determine the map contents (cache and tiling
+    # settings only affect how it is held in memory).
+    KEY_FIELDS = ("width", "height", "resolution", "seed", "generator", "dtype")
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding the store (created if missing).
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, config) -> str:
+        fields = {name: getattr(config, name) for name in self.KEY_FIELDS}
+        fields["generator_version"] = GENERATOR_VERSION
+        payload = json.dumps(fields, sort_keys=True).encode()
+        return hashlib.sha256(payload).hexdigest()[:24]
+
+    def entry_dir(self, config) -> str:
+        return os.path.join(self.root, self.key(config))
+
+    def load_map(self, config) -> Optional[np.ndarray]:
+        """Returns the stored base map (read-only memmap), or None."""
+        return self._load(os.path.join(self.entry_dir(config), "map.npy"))
+
+    def save_map(self, config, magnetic_map: np.ndarray):
+        entry = self.entry_dir(config)
+        os.makedirs(entry, exist_ok=True)
+        atomic_save(os.path.join(entry, "map.npy"), magnetic_map)
+        meta = dict(asdict(config), generator_version=GENERATOR_VERSION)
+        meta_path = os.path.join(entry, "config.json")
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as f:
+                json.dump(meta, f, indent=2, sort_keys=True)
+
+    def load_layer(self, config, method: str, z: float) -> Optional[np.ndarray]:
+        """Returns a stored continued layer (read-only memmap), or None."""
+        return self._load(self._layer_path(config, method, z))
+
+    def save_layer(self, config, method: str, z: float, layer: np.ndarray):
+        os.makedirs(self.entry_dir(config), exist_ok=True)
+        atomic_save(self._layer_path(config, method, z), layer)
+
+    def _layer_path(self, config, method: str, z: float) -> str:
+        return os.path.join(self.entry_dir(config), f"layer_{method}_{z:g}m.npy")
+
+    @staticmethod
+    def _load(path: str) -> Optional[np.ndarray]:
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import numpy as np
+from typing import Optional
+from src.core.metrics import Metrics
+from src.world.continuation import LayerCache
+from src.world.environment import World, MapConfig
+from src.world.store import atomic_save
+from src.world.tiles import TiledArray
+
+class TiledRaster(TiledArray):
+    """
+    Ground-level map stored on disk as fixed-size .npy tiles.
+    Tiles are loaded on demand through a byte-bounded LRU cache.
+    """
+    def __init__(self, root: str, shape, tile_size: int, dtype, fill_value: float,
+                 cache_bytes: int = 256 * 2**20):
+        super().__init__(shape, tile_size, dtype)
+        self.root = root
+        self.fill_value = fill_value
+        self.cache = LayerCache(cache_bytes)
+        self._lock = threading.Lock()
+
+    def tile_path(self, ty: int, tx: int) -> str:
+        return os.path.join(self.root, "tiles", f"{ty}_{tx}.npy")
+
+    def get_tile(self, ty: int, tx: int) -> np.ndarray:
+        with self._lock:
+            tile = self.cache.get((ty, tx))
+            if tile is not None:
+                return tile
+        path = self.tile_path(ty, tx)
+        if os.path.exists(path):
+            tile = np.load(path)
+        else:
+            # Gaps in survey coverage read as the background field
+            y0, y1, x0, x1 = self.tile_bounds(ty, tx)
+            tile = np.full((y1 - y0, x1 - x0), self.fill_value, dtype=self.dtype)
+        with self._lock:
+            self.cache.put((ty, tx), tile)
+        return tile
+
+class TiledWorld(World):
+    """
+    World backed by an out-of-core tiled map.
+
+    Supports the same get_magnetic_field / get_magnetic_field_batch /
+    get_map_bounds semantics as World, including bilinear interpolation
+    across tile boundaries, while holding only a bounded number of tiles
+    in memory. Altitude layers always use lazy tiled continuation.
+    """
+    META_FILE = "tiled_map.json"
+
+    def __init__(self, root: str, tile_cache_bytes: int = 256 * 2**20,
+                 layer_cache_bytes: int = 256 * 2**20, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            root: Directory written by TiledWorld.create.
+            tile_cache_bytes: Memory budget for ground-level tiles.
+            layer_cache_bytes: Memory budget for continued altitude tiles.
+            metrics: Optional Metrics, as for World.
+        """
+        with open(os.path.join(root, self.META_FILE)) as f:
+            meta = json.load(f)
+        height_px, width_px = meta["shape"]
+        resolution = meta["resolution"]
+
+        self.root = root
+        config = MapConfig(width=width_px * resolution, height=height_px * resolution,
+                           resolution=resolution, seed=meta.get("seed"),
+                           continuation="spectral", layer_cache_bytes=layer_cache_bytes,
+                           tile_size=meta["tile_size"], dtype=meta["dtype"])
+        # Shared World state; only the ground-level raster differs
+        self._init_state(config, store=None, metrics=metrics)
+        self.background_field = meta["background_field"]
+        self.magnetic_map = TiledRaster(root, (height_px, width_px), meta["tile_size"], meta["dtype"],
+                                        fill_value=self.background_field, cache_bytes=tile_cache_bytes)
+
+    @classmethod
+    def create(cls, root: str, source, resolution: float, tile_size: int = 512,
+               background_field: float = 50000.0, seed: Optional[int] = None, **kwargs) -> 'TiledWorld':
+        """
+        Writes a map to disk as tiles and opens it.
+
+        Args:
+            root: Output directory.
+            source: 2D array-like supporting slicing (ndarray, np.memmap, ...).
+                    It is read one tile at a time, so it can be larger than RAM.
+            resolution: Grid spacing (meters per pixel).
+            tile_size: Tile edge length (pixels).
+            background_field: Value returned outside the map and for missing tiles.
+            seed: Optional seed recorded in the metadata.
+            **kwargs: Forwarded to TiledWorld().
+        """
+        height_px, width_px = source.shape
+        os.makedirs(os.path.join(root, "tiles"), exist_ok=True)
+        for y0 in range(0, height_px, tile_size):
+            for x0 in range(0, width_px, tile_size):
+                tile = np.asarray(source[y0:y0 + tile_size, x0:x0 + tile_size])
+                path = os.path.join(root, "tiles", f"{y0 // tile_size}_{x0 // tile_size}.npy")
+                atomic_save(path, tile)
+
+        meta = {
+            "shape": [height_px, width_px],
+            "resolution": resolution,
+            "tile_size": tile_size,
+            "dtype": np.dtype(source.dtype).name,
+            "background_field": background_field,
+            "seed": seed,
+        }
+        with open(os.path.join(root, cls.META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        return cls(root, **kwargs)
+
+    @classmethod
+    def from_world(cls, root: str, world: World, tile_size: int = 512, **kwargs) -> 'TiledWorld':
+        """Converts an in-memory World to the tiled on-disk layout."""
+        return cls.create(root, world.magnetic_map, world.config.resolution, tile_size=tile_size,
+                          background_field=world.background_field, seed=world.config.seed, **kwargs)
@@ -0,0 +1,96 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+class TiledArray(ABC):
+    """
+    Read-only 2D array assembled on demand from square tiles.
+
+    Supports the subset of ndarray indexing the World lookups need:
+    fancy indexing with integer arrays (`arr[iy, ix]`) and rectangular
+    slicing (`arr[y0:y1, x0:x1]`).
+    """
+    def __init__(self, shape: Tuple[int, int], tile_size: int, dtype=np.float64):
+        self.shape = tuple(shape)
+        self.tile_size = tile_size
+        self.dtype = np.dtype(dtype)
+        self.n_tiles_y = -(-self.shape[0] // tile_size)
+        self.n_tiles_x = -(-self.shape[1] // tile_size)
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @abstractmethod
+    def get_tile(self, ty: int, tx: int) -> np.ndarray:
+        """
+        Returns tile (ty, tx). Edge tiles may be smaller than tile_size.
+        """
+        pass
+
+    def tile_bounds(self, ty: int, tx: int) -> Tuple[int, int, int, int]:
+        """Returns the (y0, y1, x0, x1) pixel extent of a tile."""
+        ts = self.tile_size
+        return (ty * ts, min((ty + 1) * ts, self.shape[0]),
+                tx * ts, min((tx + 1) * ts, self.shape[1]))
+
+    def __getitem__(self, key):
+        iy, ix = key
+        if isinstance(iy, slice) and isinstance(ix, slice):
+            y0, y1, sy = iy.indices(self.shape[0])
+            x0, x1, sx = ix.indices(self.shape[1])
+            if sy != 1 or sx != 1:
+                raise IndexError("TiledArray slices must have unit step")
+            return self.window(y0, y1, x0, x1)
+        return self.gather(np.asarray(iy), np.asarray(ix))
+
+    def __array__(self, dtype=None, copy=None):
+        full = self.window(0, self.shape[0], 0, self.shape[1])
+        return full if dtype is None else full.astype(dtype)
+
+    def gather(self, iy: np.ndarray, ix: np.ndarray) -> np.ndarray:
+        """
+        Fancy-index lookup of pixels (iy, ix), touching each tile once.
+        """
+        iy, ix = np.broadcast_arrays(iy, ix)
+        out = np.empty(iy.shape, dtype=self.dtype)
+        flat_y = iy.ravel()
+        flat_x = ix.ravel()
+        if flat_y.size == 0:
+            return out
+
+        ts = self.tile_size
+        tile_y = flat_y // ts
+        tile_x = flat_x // ts
+        tile_ids = tile_y * self.n_tiles_x + tile_x
+
+        # Group points by tile so each tile is fetched exactly once
+        order = np.argsort(tile_ids, kind='stable')
+        sorted_ids = tile_ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        ends = np.r_[starts[1:], sorted_ids.size]
+
+        flat_out = out.reshape(-1)
+        for start, end in zip(starts, ends):
+            idx = order[start:end]
+            ty, tx = divmod(int(sorted_ids[start]), self.n_tiles_x)
+            tile = self.get_tile(ty, tx)
+            flat_out[idx] = tile[flat_y[idx] - ty * ts, flat_x[idx] - tx * ts]
+        return out
+
+    def window(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """
+        Assembles the pixel window [y0:y1, x0:x1] (must lie inside the array).
+        """
+        out = np.empty((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=self.dtype)
+        if out.size == 0:
+            return out
+        ts = self.tile_size
+        for ty in range(y0 // ts, (y1 - 1) // ts + 1):
+            for tx in range(x0 // ts, (x1 - 1) // ts + 1):
+                ty0, ty1, tx0, tx1 = self.tile_bounds(ty, tx)
+                cy0, cy1 = max(y0, ty0), min(y1, ty1)
+                cx0, cx1 = max(x0, tx0), min(x1, tx1)
+                tile = self.get_tile(ty, tx)
+                out[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] = tile[cy0 - ty0:cy1 - ty0, cx0 - tx0:cx1 - tx0]
+        return out
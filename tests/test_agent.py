@@ -0,0 +1,363 @@
+import asyncio
+import contextlib
+import io
+import time
+import unittest
+import numpy as np
+from src.world.environment import World, MapConfig
+from src.vehicle.aircraft import Aircraft, State
+from src.sensors.magnetometer import Magnetometer
+from src.navigation.particle_filter import ParticleFilter
+from src.agent.context import AgentContext, OrganizationContext, PlatformContext, MissionContext, SituationContext, NavigationMode
+from src.agent.core import Agent
+from src.core.metrics import Metrics
+from src.core.telemetry import TelemetryRecorder
+from src.agent.bus import MessageBus, Topic, BusFull
+from src.agent.runtime import AgentRuntime, AgentStatus, StatusBoard, STATUS_TOPIC
+from src.simulation.run_squadron_sim import make_squadron
+from src.agent.brain import Decision, DecisionPipeline, MockBrain, Order
+
+def make_agent(world=None, estimator=None, magnetometer=None, metrics=None, telemetry=None, pipeline=None):
+    initial_state = State(x=500.0, y=500.0, z=100.0, psi=0.0, v=50.0)
+    aircraft = Aircraft(initial_state)
+    waypoints = [(500.0, 4000.0, 100.0), (4000.0, 4000.0, 100.0)]
+    context = AgentContext(
+        OrganizationContext("Red Tails", "Red-1", 123.45),
+        PlatformContext(max_speed=100.0, max_altitude=1000.0, sensors_list=["GPS", "Magnetometer"]),
+        MissionContext(objectives=["Patrol"], waypoints=waypoints, risk_tolerance=0.5),
+        SituationContext(estimated_state=initial_state),
+    )
+    return Agent(context, aircraft, world=world, magnetometer=magnetometer, estimator=estimator, metrics=metrics,
+                 telemetry=telemetry, pipeline=pipeline)
+
+class TestParticleFilter(unittest.TestCase):
+
+    def test_low_variance_resampling_follows_weights(self):
+        world = World(MapConfig(width=100.0, height=100.0, resolution=10.0, seed=0))
+        pf = ParticleFilter(world, n_particles=1000, seed=0)
+        pf.particles.x[:] = np.arange(1000)
+        pf.weights[:] = 0.0
+        pf.weights[[10, 20]] = [0.25, 0.75]
+
+        pf.resample()
+
+        counts = np.bincount(pf.particles.x.astype(int), minlength=1000)
+        self.assertEqual((counts[10], counts[20]), (250, 750))
+        np.testing.assert_allclose(pf.weights, 1.0 / 1000)
+
+    def test_agent_navigates_on_filter_in_mag_nav(self):
+        world = World(MapConfig(width=5000.0, height=5000.0, resolution=10.0, seed=42))
+        estimator = ParticleFilter(world, n_particles=5000, measurement_std=5.0, seed=1)
+        agent = make_agent(world, estimator, Magnetometer(noise_std=2.0, seed=1))
+
+        for _ in range(10):
+            agent.update(0.5, external_gps_variance=0.1)
+        self.assertIs(agent.context.situation.estimated_state, agent.aircraft.state)
+
+        errors = []
+        for _ in range(120):
+            agent.update(0.5, external_gps_variance=10.0)
+            estimate = agent.context.situation.estimated_state
+            errors.append(np.hypot(estimate.x - agent.aircraft.state.x, estimate.y - agent.aircraft.state.y))
+
+        self.assertEqual(agent.context.situation.current_nav_mode, NavigationMode.MAG_NAV)
+        self.assertTrue(estimator.initialized)
+        self.assertIsNot(agent.context.situation.estimated_state, agent.aircraft.state)
+        self.assertGreater(max(errors), 0.0)
+        self.assertLess(np.mean(errors[-20:]), 50.0)
+
+class TestAgentMetrics(unittest.TestCase):
+
+    def test_phase_timers_and_counters(self):
+        metrics = Metrics()
+        world = World(MapConfig(width=5000.0, height=5000.0, resolution=10.0, seed=42), metrics=metrics)
+        estimator = ParticleFilter(world, n_particles=500, seed=1)
+        agent = make_agent(world, estimator, Magnetometer(noise_std=2.0, seed=1, metrics=metrics), metrics=metrics)
+
+        for step in range(40):
+            agent.update(0.5, external_gps_variance=10.0 if 10 <= step < 30 else 0.1)
+
+        snapshot = metrics.snapshot()
+        counters = snapshot["counters"]
+        self.assertEqual(counters["agent.updates"], 40)
+        self.assertEqual(counters["agent.gps_degraded"], 20)
+        self.assertEqual(counters["agent.mode_switch.MAG_NAV"], 1)
+        self.assertEqual(counters["agent.mode_switch.GPS"], 1)
+        self.assertEqual(counters["magnetometer.reads"], 20)
+        # One miss per 10 m altitude layer visited during the MAG_NAV descent
+        self.assertGreaterEqual(counters["world.layer_cache_miss"], 1)
+        self.assertEqual(snapshot["timers"]["world.layer_create"]["count"], counters["world.layer_cache_miss"])
+        for phase in ("monitor", "estimate", "decide", "act"):
+            self.assertEqual(snapshot["timers"][f"agent.{phase}"]["count"], 40)
+
+    def test_disabled_by_default(self):
+        agent = make_agent()
+        agent.update(0.5)
+        self.assertFalse(agent.metrics.enabled)
+        self.assertEqual(agent.metrics.snapshot()["counters"], {})
+
+class TestAgentTelemetry(unittest.TestCase):
+
+    def test_records_channels_and_events_without_printing(self):
+        telemetry = TelemetryRecorder(capacity=64)
+        agent = make_agent(telemetry=telemetry)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            for step in range(40):
+                agent.update(0.5, external_gps_variance=10.0 if 10 <= step < 30 else 0.1)
+
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(agent.time, 20.0)
+        state = telemetry.channel_arrays("state")
+        np.testing.assert_allclose(state["t"], 0.5 * np.arange(1, 41))
+        modes = telemetry.channel_arrays("mode")["mode"]
+        self.assertEqual(list(modes[9:11]), ["GPS", "MAG_NAV"])
+        kinds = [(e.kind, e.count) for e in telemetry.events]
+        # 20 degraded steps (10 s) fold into one alert; two mode switches
+        self.assertEqual(kinds, [("gps_degraded", 20), ("mode_switch", 1), ("mode_switch", 1)])
+
+class TestMessageBus(unittest.TestCase):
+
+    def test_messages_are_batched_until_flush(self):
+        bus = MessageBus()
+        topic = Topic("numbers", int)
+        batches = []
+        bus.subscribe(topic, batches.append)
+
+        for i in range(5):
+            bus.publish_nowait(topic, i)
+        self.assertEqual(batches, [])
+        self.assertEqual(bus.pending(), 5)
+
+        self.assertEqual(asyncio.run(bus.flush()), 5)
+        self.assertEqual(batches, [[0, 1, 2, 3, 4]])
+        self.assertEqual(asyncio.run(bus.flush()), 0)
+        stats = bus.stats()["numbers"]
+        self.assertEqual((stats["published"], stats["delivered"], stats["batches"]), (5, 5, 1))
+
+    def test_topics_are_typed(self):
+        bus = MessageBus()
+        with self.assertRaises(TypeError):
+            bus.publish_nowait(Topic("numbers", int), "five")
+        with self.assertRaises(ValueError):
+            bus.register(Topic("numbers", str))
+
+    def test_full_topic_applies_backpressure_or_drops(self):
+        bus = MessageBus()
+        topic = Topic("numbers", int, capacity=3)
+        batches = []
+        bus.subscribe(topic, batches.append)
+
+        async def produce():
+            for i in range(7):
+                await bus.publish(topic, i)
+            await bus.flush()
+
+        asyncio.run(produce())
+        # The producer waited for delivery instead of losing messages
+        self.assertEqual(batches, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(bus.stats()["numbers"]["backpressure"], 2)
+
+        accepted = [bus.publish_nowait(topic, i) for i in range(5)]
+        self.assertEqual(accepted, [True, True, True, False, False])
+        self.assertEqual(bus.stats()["numbers"]["dropped"], 2)
+        with self.assertRaises(BusFull):
+            bus.publish_nowait(topic, 9, strict=True)
+
+    def test_async_handlers_and_follow_up_messages(self):
+        bus = MessageBus()
+        requests = Topic("requests", str)
+        replies = Topic("replies", str)
+        received = []
+
+        async def answer(batch):
+            await asyncio.sleep(0)
+            for message in batch:
+                bus.publish_nowait(replies, message.upper())
+
+        bus.subscribe(requests, answer)
+        bus.subscribe(replies, received.extend, max_batch=1)
+        bus.publish_nowait(requests, "a")
+        bus.publish_nowait(requests, "b")
+
+        asyncio.run(bus.flush())
+        self.assertEqual(received, ["A", "B"])
+        self.assertEqual(bus.stats()["replies"]["batches"], 2)
+
+class TestAgentRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=5000.0, height=5000.0, resolution=10.0, seed=42))
+
+    def test_squadron_shares_world_and_publishes_one_batch_per_tick(self):
+        runtime = AgentRuntime(self.world, 0.5)
+        batch_sizes = []
+        runtime.bus.subscribe(STATUS_TOPIC, lambda batch: batch_sizes.append(len(batch)))
+        board = StatusBoard(runtime.bus)
+        for agent in make_squadron(self.world, 50):
+            runtime.add(agent)
+
+        self.assertEqual(runtime.run(duration=5.0), 10)
+
+        self.assertEqual(batch_sizes, [50] * 10)
+        self.assertEqual(len(board.latest), 50)
+        status = board.latest["Red-7"]
+        self.assertIsInstance(status, AgentStatus)
+        self.assertAlmostEqual(status.t, 5.0)
+        self.assertEqual(status.x, runtime.agent("Red-7").aircraft.state.x)
+        self.assertEqual(runtime.stats()["topics"]["agent.status"]["published"], 500)
+
+    def test_mode_changes_are_published(self):
+        # Jam the odd-numbered half of the squadron from t=2s
+        def variance(agent, t):
+            number = int(agent.context.organization.callsign.split("-")[1])
+            return 10.0 if number % 2 and t >= 2.0 else 0.1
+
+        runtime = AgentRuntime(self.world, 0.5, status_every=4, gps_variance=variance)
+        board = StatusBoard(runtime.bus)
+        for agent in make_squadron(self.world, 10):
+            runtime.add(agent)
+        runtime.run(ticks=8)
+
+        self.assertEqual(sorted(change.callsign for change in board.mode_changes),
+                         sorted(f"Red-{i}" for i in (1, 3, 5, 7, 9)))
+        self.assertTrue(all(change.t == 2.5 and change.mode == "MAG_NAV" for change in board.mode_changes))
+        self.assertEqual(runtime.stats()["topics"]["agent.status"]["batches"], 2)
+
+    def test_rejects_duplicate_callsigns_and_foreign_worlds(self):
+        runtime = AgentRuntime(self.world, 0.5)
+        agent = make_agent(self.world)
+        runtime.add(agent)
+        with self.assertRaises(ValueError):
+            runtime.add(make_agent(self.world))
+        other = World(MapConfig(width=100.0, height=100.0, resolution=10.0, seed=0))
+        with self.assertRaises(ValueError):
+            AgentRuntime(other, 0.5).add(agent)
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+class TestDecisionPipeline(unittest.TestCase):
+
+    def make_pipeline(self, brain, **kwargs):
+        pipeline = DecisionPipeline(brain, **kwargs)
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def test_slow_brain_does_not_block_control_loop(self):
+        brain = MockBrain(latency=0.3)
+        agent = make_agent(pipeline=self.make_pipeline(brain))
+        # Healthy GPS, the brain has been asked and answered CONTINUE
+        agent.update(0.5, external_gps_variance=0.1)
+        self.assertTrue(wait_for(lambda: agent.update(0.5, 0.1) or agent.strategy is not None))
+        self.assertEqual(agent.strategy.order, Order.CONTINUE)
+
+        worst = 0.0
+        for _ in range(10):
+            start = time.perf_counter()
+            agent.update(0.5, external_gps_variance=10.0)
+            worst = max(worst, time.perf_counter() - start)
+        self.assertLess(worst, 0.1)
+        # Reflex TTP switched immediately; the CONTINUE decided for healthy
+        # GPS no longer applies and the new strategy is still pending
+        self.assertEqual(agent.context.situation.current_nav_mode, NavigationMode.MAG_NAV)
+        self.assertIsNone(agent.strategy)
+
+        self.assertTrue(wait_for(lambda: agent.update(0.5, 10.0) or (agent.strategy is not None and
+                                                                     agent.strategy.order == Order.SWITCH_MAG_NAV)))
+        self.assertEqual(agent.last_command.altitude, 50.0)
+
+    def test_stale_strategy_is_dropped_while_request_pending(self):
+        # MagNav is preferred even with healthy GPS, but only while jammed
+        def policy(context):
+            if context["gps_variance"] > 5.0:
+                return Decision(Order.SWITCH_MAG_NAV, altitude=30.0, speed=60.0)
+            time.sleep(1.0) # Slow answer for the post-jamming situation
+            return Decision(Order.CONTINUE)
+
+        agent = make_agent(pipeline=self.make_pipeline(MockBrain(latency=0.0, policy=policy)))
+        self.assertTrue(wait_for(lambda: agent.update(0.5, 10.0) or agent.strategy is not None))
+        self.assertEqual((agent.last_command.altitude, agent.last_command.speed), (30.0, 60.0))
+
+        # Jamming ends; the brain is still thinking about it
+        agent.update(0.5, external_gps_variance=0.1)
+        self.assertTrue(agent.pipeline.busy)
+        self.assertIsNone(agent.strategy)
+        self.assertEqual(agent.context.situation.current_nav_mode, NavigationMode.GPS)
+        self.assertEqual((agent.last_command.altitude, agent.last_command.speed), (100.0, 80.0))
+
+        # Jammed again: the memoized decision applies at once
+        agent.update(0.5, external_gps_variance=10.0)
+        self.assertEqual(agent.strategy.order, Order.SWITCH_MAG_NAV)
+
+    def test_decisions_are_memoized_by_situation(self):
+        brain = MockBrain(latency=0.0)
+        pipeline = self.make_pipeline(brain)
+        agent = make_agent()
+        situation = agent.context.situation
+
+        situation.gps_variance = 7.2
+        self.assertIsNone(pipeline.request(agent.context))
+        self.assertTrue(wait_for(lambda: pipeline.poll() is not None or not pipeline.busy))
+        # Same variance bin, different value: answered from the cache
+        situation.gps_variance = 0.1
+        pipeline.request(agent.context)
+        wait_for(lambda: pipeline.poll() is not None or not pipeline.busy)
+        situation.gps_variance = 7.9
+        decision = pipeline.request(agent.context)
+
+        self.assertEqual(decision.order, Order.SWITCH_MAG_NAV)
+        self.assertEqual(brain.calls, 2)
+        self.assertEqual(pipeline.stats()["cache_hits"], 1)
+
+    def test_stale_requests_are_cancelled(self):
+        brain = MockBrain(latency=0.2)
+        pipeline = self.make_pipeline(brain)
+        agent = make_agent()
+        situation = agent.context.situation
+
+        situation.gps_variance = 10.0
+        pipeline.request(agent.context)
+        situation.gps_variance = 0.1
+        pipeline.request(agent.context)
+        self.assertEqual(pipeline.stats()["cancelled"], 1)
+
+        decisions = []
+        self.assertTrue(wait_for(lambda: decisions.append(pipeline.poll()) or any(decisions)))
+        # Only the decision for the current situation is returned...
+        self.assertEqual([d.order for d in decisions if d is not None], [Order.CONTINUE])
+        # ...while the stale answer still lands in the cache
+        self.assertTrue(wait_for(lambda: pipeline.poll() is None and len(pipeline.cache) == 2))
+
+    def test_timed_out_situation_is_not_retried(self):
+        brain = MockBrain(latency=0.3)
+        pipeline = self.make_pipeline(brain, timeout=0.05)
+        agent = make_agent()
+
+        pipeline.request(agent.context)
+        time.sleep(0.1)
+        self.assertIsNone(pipeline.poll())
+        self.assertEqual(pipeline.stats()["timeouts"], 1)
+        pipeline.request(agent.context)
+        self.assertEqual(pipeline.stats()["submitted"], 1)
+
+    def test_invalid_decisions_are_rejected_and_overrides_clamped(self):
+        pipeline = self.make_pipeline(MockBrain(latency=0.0, policy=lambda context: "ABORT"))
+        agent = make_agent(pipeline=pipeline)
+        agent.update(0.5)
+        self.assertTrue(wait_for(lambda: agent.update(0.5) or not pipeline.busy))
+        self.assertIsNone(agent.strategy)
+        self.assertEqual(pipeline.stats()["errors"], 1)
+
+        loiter = Decision(Order.LOITER, altitude=5000.0, speed=500.0)
+        pipeline = self.make_pipeline(MockBrain(latency=0.0, policy=lambda context: loiter))
+        agent = make_agent(pipeline=pipeline)
+        self.assertTrue(wait_for(lambda: agent.update(0.5) or agent.strategy is loiter))
+        command = agent.last_command
+        self.assertEqual((command.altitude, command.speed), (1000.0, 100.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks import bench
+from benchmarks.bench import Benchmark, compare_results, main, time_benchmark
+
+def document(**medians):
+    return {"schema": 1, "metadata": {"hostname": "ci"},
+            "results": [{"name": name, "median": median} for name, median in medians.items()]}
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_time_benchmark_uses_returned_item_count(self):
+        calls = []
+        benchmark = Benchmark("steps", "scenario", setup=lambda: calls.append("setup") or 7,
+                              run=lambda n: n * 10, unit="step", warmup=True)
+        result = time_benchmark(benchmark, repeats=2)
+
+        self.assertEqual(calls, ["setup"] * 3)
+        self.assertEqual(len(result["times"]), 2)
+        self.assertEqual(result["items"], 70)
+        self.assertAlmostEqual(result["rate"], 70 / result["median"])
+
+    def test_filter_builds_only_selected_fixtures(self):
+        with mock.patch.object(bench, "_world", side_effect=AssertionError("world built")), \
+                mock.patch.object(bench, "environment_metadata", return_value={}):
+            document = bench.run_suite(quick=True, repeats=1, name_filter="reconstruct[global,1000]",
+                                       log=lambda *args: None)
+        self.assertEqual([r["name"] for r in document["results"]], ["reconstruct[global,1000]"])
+
+    def test_layer_creation_cold_and_warm_setup(self):
+        benchmarks = {b.name: b for b in bench.layer_benchmarks(quick=True)}
+        cold = benchmarks["layer_creation[spectral,cold]"]
+        warm = benchmarks["layer_creation[spectral,warm]"]
+
+        world = cold.setup()
+        self.assertIsNone(world._continuation)
+        cold.run(world)
+        self.assertIsNotNone(world._continuation)
+        self.assertIsNone(cold.setup()._continuation)
+
+        world = warm.setup()
+        self.assertIsNotNone(world._continuation)
+        self.assertEqual(world.layer_cache_stats.entries, 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = document(slower=1.0, faster=1.0, jitter=0.0001, same=0.5, removed=1.0)
+        current = document(slower=1.5, faster=0.5, jitter=0.0005, same=0.55, added=1.0)
+        status = {row["name"]: row["status"] for row in compare_results(baseline, current, threshold=0.2)}
+
+        self.assertEqual(status, {"slower": "regression", "faster": "improvement",
+                                  "jitter": "ok", "same": "ok"})
+
+    def test_compare_command_exit_code(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = {}
+            for label, median in (("base", 1.0), ("ok", 1.1), ("slow", 2.0)):
+                paths[label] = os.path.join(root, label + ".json")
+                with open(paths[label], "w") as f:
+                    json.dump(document(world=median), f)
+
+            self.assertEqual(main(["compare", paths["base"], paths["ok"]]), 0)
+            self.assertEqual(main(["compare", paths["base"], paths["slow"]]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
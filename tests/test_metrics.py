@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from src.core.metrics import Metrics, NULL_METRICS, Histogram
+from src.navigation.waypoint import WaypointNavigator
+from src.vehicle.aircraft import State
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counters_timers_and_histograms(self):
+        metrics = Metrics()
+        metrics.inc("steps")
+        metrics.inc("steps", 4)
+        for _ in range(3):
+            with metrics.time("phase"):
+                pass
+        for value in (1.0, 2.0, 3.0, 100.0):
+            metrics.observe("sizes", value, buckets=[1.0, 10.0])
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"steps": 5})
+        self.assertEqual(snapshot["timers"]["phase"]["count"], 3)
+        sizes = snapshot["histograms"]["sizes"]
+        self.assertEqual(sizes["bucket_counts"], [1, 2, 1])
+        self.assertEqual((sizes["min"], sizes["max"], sizes["p50"], sizes["p99"]), (1.0, 100.0, 10.0, 100.0))
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "metrics.json")
+            metrics.export_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], {"steps": 5})
+        self.assertIn("phase", metrics.report())
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "timers": {}, "histograms": {}})
+
+    def test_null_metrics_records_nothing(self):
+        NULL_METRICS.inc("x")
+        NULL_METRICS.observe("y", 1.0)
+        with NULL_METRICS.time("z"):
+            pass
+        self.assertEqual(NULL_METRICS.snapshot(), {"counters": {}, "timers": {}, "histograms": {}})
+
+    def test_empty_histogram(self):
+        self.assertEqual(Histogram().summary(), {"count": 0})
+
+    def test_waypoint_transitions(self):
+        metrics = Metrics()
+        nav = WaypointNavigator([(0.0, 0.0, 0.0), (0.0, 100.0, 0.0)], acceptance_radius=10.0, metrics=metrics)
+        nav.get_command(State(x=0.0, y=0.0))
+        for _ in range(3):
+            nav.get_command(State(x=0.0, y=100.0)) # Arrives, then loiters
+
+        self.assertTrue(nav.finished)
+        self.assertEqual(metrics.counters, {"navigator.waypoint_reached": 2, "navigator.route_completed": 1})
+
+if __name__ == '__main__':
+    unittest.main()
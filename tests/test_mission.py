@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from src.mission.planner import LawnmowerPattern
+from src.mission.route import Route
+from src.navigation.waypoint import WaypointNavigator
+from src.navigation.batch import BatchWaypointNavigator
+from src.vehicle.aircraft import Aircraft, State
+
+class TestRoute(unittest.TestCase):
+
+    def setUp(self):
+        # North 100 m, East 200 m, then a zero-length leg
+        self.route = Route([(0.0, 0.0, 50.0), (0.0, 100.0, 100.0), (200.0, 100.0, 100.0), (200.0, 100.0, 100.0)])
+
+    def test_leg_geometry(self):
+        route = self.route
+        self.assertEqual((len(route), route.num_legs), (4, 3))
+        np.testing.assert_allclose(route.leg_lengths, [100.0, 200.0, 0.0])
+        np.testing.assert_allclose(route.headings[:2], [0.0, np.pi / 2])
+        np.testing.assert_allclose(route.cumulative, [0.0, 100.0, 300.0, 300.0])
+        np.testing.assert_allclose(route.unit_vectors[2], [0.0, 0.0])
+        self.assertEqual(route[1], (0.0, 100.0, 100.0))
+
+    def test_distance_queries(self):
+        route = self.route
+        np.testing.assert_array_equal(route.leg_at([-5.0, 0.0, 99.0, 100.0, 250.0, 400.0]), [0, 0, 0, 1, 1, 2])
+        x, y, z = route.position_at(np.array([50.0, 150.0, 1000.0]))
+        np.testing.assert_allclose(x, [0.0, 50.0, 200.0])
+        np.testing.assert_allclose(y, [50.0, 100.0, 100.0])
+        np.testing.assert_allclose(z, [75.0, 100.0, 100.0])
+
+    def test_progress_and_cross_track(self):
+        # 30 m east of the northbound first leg is right of track
+        progress = self.route.progress(30.0, 40.0, 0)
+        self.assertEqual(progress.leg, 0)
+        self.assertAlmostEqual(progress.along_track, 40.0)
+        self.assertAlmostEqual(progress.cross_track, 30.0)
+        self.assertAlmostEqual(progress.remaining, 260.0)
+
+        # North of the eastbound leg is left of track
+        along, cross = self.route.project(np.array([50.0, 250.0]), np.array([110.0, 90.0]), np.array([1, 1]))
+        np.testing.assert_allclose(along, [50.0, 250.0])
+        np.testing.assert_allclose(cross, [-10.0, 10.0])
+        self.assertAlmostEqual(self.route.progress(250.0, 90.0, 1).along_track, 300.0)
+
+    def test_lawnmower_route_matches_waypoints(self):
+        planner = LawnmowerPattern(bounds=(0.0, 1000.0, 0.0, 500.0), spacing=300.0, altitude=80.0)
+        route = planner.generate_route()
+        expected = [(wp.x, wp.y, wp.z) for wp in planner.generate()]
+        self.assertEqual(list(route), expected)
+        np.testing.assert_allclose(route.points, Route(planner.generate()).points)
+
+class TestRouteNavigation(unittest.TestCase):
+
+    def test_navigator_accepts_route(self):
+        waypoints = [(0.0, 1000.0, 100.0), (1000.0, 1000.0, 100.0), (1000.0, 0.0, 100.0)]
+        nav_list = WaypointNavigator(waypoints, acceptance_radius=40.0)
+        nav_route = WaypointNavigator(Route(waypoints), acceptance_radius=40.0)
+        a = Aircraft(State(x=0.0, y=0.0, z=100.0, v=50.0))
+        b = Aircraft(State(x=0.0, y=0.0, z=100.0, v=50.0))
+
+        for _ in range(150):
+            cmd_a = nav_list.get_command(a.state)
+            cmd_b = nav_route.get_command(b.state)
+            self.assertEqual((cmd_a.heading, cmd_a.altitude), (cmd_b.heading, cmd_b.altitude))
+            a.update(0.5, cmd_a.speed, cmd_a.heading, cmd_a.altitude)
+            b.update(0.5, cmd_b.speed, cmd_b.heading, cmd_b.altitude)
+        self.assertEqual(nav_list.current_waypoint_index, nav_route.current_waypoint_index)
+
+        progress = nav_route.progress(b.state)
+        self.assertEqual(progress.leg, nav_route.current_waypoint_index - 1)
+        self.assertAlmostEqual(progress.along_track + progress.remaining, 2000.0)
+        self.assertAlmostEqual(progress.fraction, progress.along_track / 2000.0)
+        self.assertLess(abs(progress.cross_track), 50.0)
+
+    def test_single_waypoint_progress_and_reassignment(self):
+        nav = WaypointNavigator([(0.0, 100.0, 50.0)], acceptance_radius=10.0)
+        state = State(x=0.0, y=0.0, z=50.0)
+        self.assertEqual(nav.progress(state).fraction, 0.0)
+        nav.get_command(State(x=0.0, y=100.0, z=50.0))
+        self.assertTrue(nav.finished)
+        self.assertEqual(nav.progress(state).fraction, 1.0)
+
+        nav.waypoints = [(100.0, 0.0, 80.0), (200.0, 0.0, 80.0)]
+        self.assertIsInstance(nav.route, Route)
+        nav.current_waypoint_index = 0
+        cmd = nav.get_command(state)
+        self.assertAlmostEqual(cmd.heading, np.pi / 2)
+        self.assertEqual(cmd.altitude, 80.0)
+        self.assertAlmostEqual(nav.progress(state).fraction, 0.0)
+
+    def test_batch_navigator_accepts_routes(self):
+        route = LawnmowerPattern(bounds=(0.0, 1000.0, 0.0, 1000.0), spacing=250.0, altitude=100.0).generate_route()
+        batch = BatchWaypointNavigator.shared(route, 3)
+        np.testing.assert_array_equal(batch.waypoints[1], route.points)
+        # Stored once, not per vehicle
+        self.assertEqual(batch.waypoints.strides[0], 0)
+        self.assertTrue(np.shares_memory(batch.waypoints, route.points))
+        _, headings, altitudes = batch.get_commands(np.full(3, 100.0), np.full(3, 0.0), np.zeros(3))
+        np.testing.assert_allclose(headings, -np.pi / 2)
+        np.testing.assert_allclose(altitudes, 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
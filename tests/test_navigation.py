@@ -2,6 +2,11 @@ import unittest
 import numpy as np
 from src.vehicle.aircraft import State
 from src.navigation.waypoint import WaypointNavigator
+from src.navigation.batch import BatchWaypointNavigator
+from src.vehicle.aircraft import Aircraft
+from src.vehicle.fleet import AircraftFleet
+from src.world.environment import World, MapConfig
+from src.navigation.tercom import ProfileMatcher
 
 class TestWaypointNavigator(unittest.TestCase):
     
@@ -50,5 +55,77 @@ class TestWaypointNavigator(unittest.TestCase):
         # Actually logic in code: return NavigationCommand(speed=self.speed, heading=current_state.psi, altitude=current_state.z)
         self.assertEqual(cmd.heading, 1.5)
 
+class TestBatchWaypointNavigator(unittest.TestCase):
+
+    def test_matches_scalar_navigators(self):
+        rng = np.random.default_rng(0)
+        routes = [[tuple(p) for p in rng.uniform(0.0, 1000.0, (n, 3))] for n in (1, 2, 4, 3)]
+        loops = [False, True, True, False]
+        radii = [60.0, 40.0, 80.0, 50.0]
+        starts = [State(x=500.0, y=500.0, z=100.0) for _ in routes]
+
+        batch = BatchWaypointNavigator(routes, speed=60.0, acceptance_radius=radii, loop=loops)
+        fleet = AircraftFleet.from_states(starts)
+        navs = [WaypointNavigator(r, speed=60.0, acceptance_radius=rad, loop=lp) for r, rad, lp in zip(routes, radii, loops)]
+        aircraft = [Aircraft(State(**vars(s))) for s in starts]
+
+        for _ in range(400):
+            speeds, headings, altitudes = batch.get_fleet_commands(fleet)
+            fleet.update(0.5, speeds, headings, altitudes)
+            for i, (nav, a) in enumerate(zip(navs, aircraft)):
+                cmd = nav.get_command(a.state)
+                self.assertAlmostEqual(headings[i], cmd.heading)
+                self.assertEqual(altitudes[i], cmd.altitude)
+                self.assertEqual(batch.current_waypoint_index[i], nav.current_waypoint_index)
+                a.update(0.5, cmd.speed, cmd.heading, cmd.altitude)
+
+    def test_sequencing_and_loiter(self):
+        routes = [[(0.0, 100.0, 50.0), (100.0, 100.0, 50.0)], [(10.0, 0.0, 10.0)]]
+        nav = BatchWaypointNavigator(routes, acceptance_radius=[10.0, 5.0])
+
+        _, headings, _ = nav.get_commands(np.array([0.0, 10.0]), np.array([100.0, 0.0]), np.array([0.0, 1.5]))
+
+        self.assertAlmostEqual(headings[0], np.pi/2, places=2)
+        self.assertEqual(nav.current_waypoint_index[0], 1)
+        # Finished non-looping route keeps turning
+        self.assertAlmostEqual(headings[1], 1.7)
+
+class TestProfileMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=3000.0, height=3000.0, resolution=10.0, seed=42))
+        t = np.arange(0.0, 30.0, 0.2)
+        self.track_x = 1000.0 + 50.0 * t
+        self.track_y = 1200.0 + 200.0 * np.sin(t / 8.0)
+
+    def test_recovers_track_offset(self):
+        rng = np.random.default_rng(0)
+        readings = self.world.get_magnetic_field_batch(self.track_x + 130.0, self.track_y - 70.0, 100.0)
+        readings += rng.normal(0.0, 2.0, readings.size)
+
+        fix = ProfileMatcher(self.world, search_radius=500.0).match(readings, self.track_x, self.track_y, 100.0)
+
+        self.assertAlmostEqual(fix.offset_x, 130.0, delta=10.0)
+        self.assertAlmostEqual(fix.offset_y, -70.0, delta=10.0)
+        self.assertAlmostEqual(fix.x, self.track_x[-1] + fix.offset_x)
+        self.assertEqual(fix.surface.shape, (101, 101))
+
+    def test_surface_matches_direct_correlation(self):
+        readings = self.world.get_magnetic_field_batch(self.track_x, self.track_y, 0.0)
+        fix = ProfileMatcher(self.world, search_radius=100.0).match(readings, self.track_x, self.track_y, 0.0)
+
+        # Direct NCC for one candidate offset: (+3, -2) pixels
+        ix = np.rint(self.track_x / 10.0 - 0.5).astype(int) + 3
+        iy = np.rint(self.track_y / 10.0 - 0.5).astype(int) - 2
+        pixels = np.unique(np.column_stack((iy, ix)), axis=0)
+        ref = [readings[(iy == py) & (ix == px)].mean() for py, px in pixels]
+        counts = [np.sum((iy == py) & (ix == px)) for py, px in pixels]
+        mapped = self.world.magnetic_map[pixels[:, 0], pixels[:, 1]]
+        ref = np.repeat(ref, counts)
+        mapped = np.repeat(mapped, counts)
+        expected = np.corrcoef(ref, mapped)[0, 1]
+
+        self.assertAlmostEqual(fix.surface[10 - 2, 10 + 3], expected, places=6)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+from src.world.reconstruction import MapReconstructor, IncrementalReconstructor
+
+def smooth_field(x, y):
+    return 50000.0 + 100.0 * np.sin(x / 300.0) * np.cos(y / 400.0)
+
+class TestIncrementalReconstructor(unittest.TestCase):
+
+    def test_chunked_ingest_matches_single_ingest(self):
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0.0, 1000.0, 3000)
+        y = rng.uniform(0.0, 800.0, 3000)
+        v = smooth_field(x, y)
+
+        whole = IncrementalReconstructor((0.0, 1000.0, 0.0, 800.0), 20.0)
+        whole.ingest(x, y, v)
+        chunked = IncrementalReconstructor((0.0, 1000.0, 0.0, 800.0), 20.0)
+        for start in range(0, 3000, 250):
+            chunked.ingest(x[start:start + 250], y[start:start + 250], v[start:start + 250])
+
+        np.testing.assert_allclose(chunked.snapshot()[2], whole.snapshot()[2])
+        self.assertEqual(chunked.n_samples, 3000)
+        self.assertEqual(chunked.sample_count.sum(), 3000)
+
+    def test_snapshot_tracks_truth_and_reports_holes(self):
+        # Survey lines over the western half only
+        ys = np.arange(0.0, 800.0, 2.0)
+        x = np.concatenate([np.full(ys.size, line) for line in np.arange(0.0, 500.0, 20.0)])
+        y = np.tile(ys, x.size // ys.size)
+        recon = IncrementalReconstructor((0.0, 1000.0, 0.0, 800.0), 20.0)
+        recon.ingest(x, y, smooth_field(x, y))
+
+        grid_x, grid_y, grid_z = recon.snapshot()
+        covered = ~np.isnan(grid_z)
+        self.assertAlmostEqual(recon.coverage_fraction(), covered.mean())
+        self.assertTrue(np.all(grid_x[recon.holes()] > 480.0))
+        np.testing.assert_allclose(grid_z[covered], smooth_field(grid_x, grid_y)[covered], atol=5.0)
+
+        # Shape matches the batch reconstructor's grid
+        batch = MapReconstructor.reconstruct(x, y, smooth_field(x, y), (0.0, 1000.0, 0.0, 800.0), 20.0)
+        self.assertEqual(batch[2].shape, grid_z.shape)
+
+class TestTiledReconstruction(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = rng.uniform(0.0, 2000.0, 20000)
+        self.y = rng.uniform(0.0, 1500.0, 20000)
+        self.v = smooth_field(self.x, self.y)
+        self.bounds = (0.0, 2000.0, 0.0, 1500.0)
+
+    def test_tiled_matches_global_away_from_hull(self):
+        gx, gy, reference = MapReconstructor.reconstruct(self.x, self.y, self.v, self.bounds, 10.0)
+        for executor in ('thread', 'process'):
+            tx, ty, tiled = MapReconstructor.reconstruct(self.x, self.y, self.v, self.bounds, 10.0,
+                                                         engine='tiled', tile_size=40, overlap=6,
+                                                         workers=2, executor=executor)
+            np.testing.assert_array_equal(tx, gx)
+            np.testing.assert_array_equal(ty, gy)
+            # Same triangles inside the survey; only long hull-edge triangles
+            # on the outer boundary may differ
+            interior = (slice(10, -10), slice(10, -10))
+            np.testing.assert_allclose(tiled[interior], reference[interior], atol=1e-6)
+
+    def test_tiled_matches_global_on_survey_lines(self):
+        # Lawnmower survey: lines 250 m apart, sampled every 1 m along track,
+        # so the mean sample spacing is far below the line spacing. Positions
+        # are jittered like a real track (an exact lattice has ambiguous triangulations)
+        rng = np.random.default_rng(2)
+        ys = np.arange(0.0, 1500.0, 1.0)
+        x = np.repeat(np.arange(0.0, 2001.0, 250.0), ys.size) + rng.normal(0.0, 1.0, 9 * ys.size)
+        y = np.tile(ys, 9) + rng.normal(0.0, 0.1, 9 * ys.size)
+        v = smooth_field(x, y)
+        reference = MapReconstructor.reconstruct(x, y, v, self.bounds, 10.0)[2]
+        tiled = MapReconstructor.reconstruct(x, y, v, self.bounds, 10.0, engine='tiled', tile_size=40,
+                                             overlap=6, workers=2)[2]
+        interior = (slice(10, -10), slice(10, -10))
+        np.testing.assert_allclose(tiled[interior], reference[interior], atol=1e-6)
+
+    def test_tile_errors_are_not_hidden(self):
+        # Only degenerate triangulations become NaN tiles; other errors surface
+        with self.assertRaises(ValueError):
+            MapReconstructor.reconstruct(self.x, self.y, self.v, self.bounds, 10.0, engine='tiled',
+                                         tile_size=40, method='spline')
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            MapReconstructor.reconstruct(self.x, self.y, self.v, self.bounds, 10.0, engine='octree')
+
+if __name__ == '__main__':
+    unittest.main()
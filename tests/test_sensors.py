@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from src.world.environment import World, MapConfig
+from src.sensors.magnetometer import Magnetometer
+
+class TestMagnetometer(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=500.0, height=500.0, resolution=10.0, seed=1))
+        self.xs = np.linspace(10.0, 490.0, 50)
+        self.ys = np.full(50, 250.0)
+
+    def test_seed_makes_readings_reproducible(self):
+        a = Magnetometer(noise_std=2.0, seed=3).read_batch(self.world, self.xs, self.ys, 100.0)
+        b = Magnetometer(noise_std=2.0, seed=3).read_batch(self.world, self.xs, self.ys, 100.0)
+        np.testing.assert_array_equal(a, b)
+
+    def test_streaming_batch_matches_scalar_reads(self):
+        streamed = Magnetometer(noise_std=2.0, bias=1.0, seed=5, block_size=16)
+        batch = streamed.read_batch(self.world, self.xs, self.ys, 100.0)
+
+        scalar = Magnetometer(noise_std=2.0, bias=1.0, seed=5, block_size=16)
+        reads = [scalar.read(self.world, x, y, 100.0) for x, y in zip(self.xs, self.ys)]
+
+        np.testing.assert_allclose(batch, reads)
+        truth = self.world.get_magnetic_field_batch(self.xs, self.ys, 100.0)
+        self.assertLess(abs(np.mean(batch - truth) - 1.0), 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.world.environment import World, MapConfig
+from src.vehicle.aircraft import Aircraft, State
+from src.sensors.magnetometer import Magnetometer
+from src.navigation.waypoint import WaypointNavigator
+from src.simulation.runner import SimulationRunner
+from src.simulation import campaign
+from src.simulation.campaign import CampaignRunner, Scenario, grid_scenarios, route_deviation, run_scenario
+from src.simulation.scheduler import Scheduler, SensorRecorder, schedule_agent, schedule_navigation
+from src.simulation.sweep import SurveySweep, grid_cases, radial_coherence, write_csv
+from tests.test_agent import make_agent
+
+class TestSimulationRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=2000.0, height=2000.0, resolution=10.0, seed=1))
+
+    def test_matches_manual_loop_with_decimation(self):
+        waypoints = [(100.0, 1500.0, 100.0), (1500.0, 1500.0, 100.0)]
+        manual = Aircraft(State(x=100.0, y=100.0, z=100.0))
+        nav = WaypointNavigator(waypoints, speed=60.0, acceptance_radius=50.0)
+        xs, ys = [], []
+        for _ in range(100):
+            cmd = nav.get_command(manual.state)
+            manual.update(0.5, cmd.speed, cmd.heading, cmd.altitude)
+            xs.append(manual.state.x)
+            ys.append(manual.state.y)
+
+        runner = SimulationRunner(Aircraft(State(x=100.0, y=100.0, z=100.0)), dt=0.5,
+                                  navigator=WaypointNavigator(waypoints, speed=60.0, acceptance_radius=50.0),
+                                  world=self.world, sensor=Magnetometer(noise_std=0.0),
+                                  record_every=1, sample_every=3, sensor_chunk=7)
+        result = runner.run(duration=50.0)
+
+        np.testing.assert_allclose(result.x, xs)
+        np.testing.assert_allclose(result.y, ys)
+        self.assertEqual(result.measurements.size, 34)
+        np.testing.assert_allclose(result.sample_x, xs[::3])
+        np.testing.assert_allclose(result.measurements,
+                                   self.world.get_magnetic_field_batch(result.sample_x, result.sample_y, result.sample_z))
+
+    def test_stop_condition_trims_buffers(self):
+        nav = WaypointNavigator([(0.0, 500.0, 0.0)], speed=50.0, acceptance_radius=10.0)
+        runner = SimulationRunner(Aircraft(State()), dt=1.0, navigator=nav)
+        result = runner.run(max_steps=1000, until=lambda: nav.finished)
+
+        self.assertTrue(nav.finished)
+        # 10 steps to arrive, plus the step on which arrival is detected
+        self.assertEqual(result.steps, 11)
+        self.assertEqual(result.x.size, 11)
+        self.assertEqual(result.measurements.size, 0)
+
+    def test_event_integration_matches_fine_fixed_step(self):
+        # Includes a climb, so z follows the closed-form exponential
+        waypoints = [(100.0, 1500.0, 300.0), (1500.0, 1500.0, 300.0), (1500.0, 200.0, 150.0)]
+
+        def make_runner(dt):
+            nav = WaypointNavigator(waypoints, speed=50.0, acceptance_radius=20.0)
+            return nav, SimulationRunner(Aircraft(State(x=100.0, y=100.0, z=100.0)), dt=dt, navigator=nav,
+                                         world=self.world, sensor=Magnetometer(noise_std=0.0),
+                                         record_every=100, sample_every=100, sensor_chunk=5)
+
+        fixed_nav, fixed = make_runner(0.01)
+        reference = fixed.run(max_steps=100000, until=lambda: fixed_nav.finished)
+        event_nav, event = make_runner(0.01)
+        result = event.run_events()
+
+        self.assertTrue(event_nav.finished)
+        self.assertEqual(result.steps, 3)
+        np.testing.assert_allclose(result.sample_t, reference.sample_t[:result.sample_t.size])
+        n = result.sample_t.size
+        self.assertLessEqual(abs(n - reference.sample_t.size), 1)
+        # Fixed stepping detects each arrival up to one step (0.5 m) late
+        np.testing.assert_allclose(result.sample_x, reference.sample_x[:n], atol=1.5)
+        np.testing.assert_allclose(result.sample_y, reference.sample_y[:n], atol=1.5)
+        np.testing.assert_allclose(result.sample_z, reference.sample_z[:n], atol=0.5)
+        np.testing.assert_allclose(result.measurements,
+                                   self.world.get_magnetic_field_batch(result.sample_x, result.sample_y, result.sample_z))
+        # The aircraft is left at the last waypoint event
+        state = event.aircraft.state
+        self.assertAlmostEqual(np.hypot(state.x - 1500.0, state.y - 200.0), 20.0)
+
+    def test_event_integration_looping_route(self):
+        nav = WaypointNavigator([(0.0, 500.0, 0.0), (0.0, 0.0, 0.0)], speed=50.0, acceptance_radius=10.0, loop=True)
+        runner = SimulationRunner(Aircraft(State()), dt=1.0, navigator=nav)
+        with self.assertRaises(ValueError):
+            runner.run_events()
+
+        result = runner.run_events(duration=100.0)
+        self.assertFalse(nav.finished)
+        self.assertEqual(result.t[-1], 100.0)
+        # Legs of 490 m then 480 m at 50 m/s: 9.8 s, 9.6 s, 9.6 s, ...
+        self.assertEqual(result.steps, 11)
+        self.assertTrue(np.all((result.y >= -1e-9) & (result.y <= 500.0)))
+
+class TestCampaign(unittest.TestCase):
+
+    def test_route_deviation(self):
+        square = [(0.0, 0.0, 0.0), (0.0, 100.0, 0.0), (100.0, 100.0, 0.0), (100.0, 0.0, 0.0)]
+        dev = route_deviation(np.array([0.0, 50.0, 120.0]), np.array([50.0, 50.0, 50.0]), square)
+        np.testing.assert_allclose(dev, [0.0, 50.0, 20.0])
+
+    def test_campaign_streams_and_resumes(self):
+        waypoints = [(100.0, 1500.0, 100.0), (1500.0, 1500.0, 100.0), (100.0, 100.0, 100.0)]
+        scenarios = grid_scenarios(jam_variance=[2.0, 10.0], jam_start=[10.0], jam_end=[30.0],
+                                   duration=[60.0], map_size=[2000.0], waypoints=[waypoints])
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "results.jsonl")
+            runner = CampaignRunner(path, workers=2, store_root=os.path.join(root, "maps"))
+            table = runner.run(scenarios)
+
+            self.assertEqual(sorted(table["run_id"]), sorted(s.run_id for s in scenarios))
+            by_variance = dict(zip(table["jam_variance"], table["time_in_mag_nav"]))
+            self.assertEqual(by_variance[2.0], 0.0)
+            self.assertGreater(by_variance[10.0], 0.0)
+
+            # Everything is recorded, so a rerun appends nothing
+            with open(path) as f:
+                lines = f.readlines()
+            runner.run(scenarios)
+            with open(path) as f:
+                self.assertEqual(f.readlines(), lines)
+
+    def test_campaign_with_shared_worlds(self):
+        scenarios = grid_scenarios(map_seed=[1, 2], duration=[20.0], map_size=[1000.0],
+                                   waypoints=[[(100.0, 900.0, 100.0), (100.0, 100.0, 100.0)]])
+        with tempfile.TemporaryDirectory() as root:
+            table = CampaignRunner(os.path.join(root, "results.jsonl"), workers=2, share_worlds=True).run(scenarios)
+        self.assertEqual(list(table["status"]), ["ok", "ok"])
+        self.assertNotEqual(table["mean_measurement"][0], table["mean_measurement"][1])
+
+    def test_field_sampling_does_not_change_agent_run(self):
+        scenario = Scenario(n_particles=200, jam_start=5.0, jam_end=40.0, duration=50.0, map_size=1000.0,
+                            waypoints=[(100.0, 900.0, 100.0), (900.0, 900.0, 100.0), (100.0, 100.0, 100.0)])
+        sampled = run_scenario(scenario)
+        unsampled = run_scenario(scenario, sample_field=False)
+        for key in ("mean_path_deviation", "max_path_deviation", "time_in_mag_nav", "mode_switches"):
+            self.assertEqual(sampled[key], unsampled[key])
+        self.assertFalse(np.isnan(sampled["mean_measurement"]))
+
+    def test_world_cache_is_bounded(self):
+        campaign._WORLDS.clear()
+        self.addCleanup(campaign._WORLDS.clear)
+        scenarios = [Scenario(map_seed=seed, map_size=200.0) for seed in range(4)]
+        worlds = [campaign._get_world(s, None) for s in scenarios]
+        self.assertEqual(len(campaign._WORLDS), campaign.MAX_CACHED_WORLDS)
+        self.assertIs(campaign._get_world(scenarios[-1], None), worlds[-1])
+        self.assertNotIn(campaign._world_key(scenarios[0]), campaign._WORLDS)
+
+class TestSurveySweep(unittest.TestCase):
+
+    def test_radial_coherence(self):
+        rng = np.random.default_rng(0)
+        truth = rng.normal(size=(64, 64))
+        _, same = radial_coherence(truth, 3.0 * truth + 7.0, 10.0)
+        np.testing.assert_allclose(same, 1.0)
+        _, unrelated = radial_coherence(truth, rng.normal(size=(64, 64)), 10.0)
+        self.assertLess(unrelated.mean(), 0.2)
+
+    def test_sweep_scores_designs_in_parallel(self):
+        world = World(MapConfig(width=1500.0, height=1500.0, resolution=10.0, seed=3))
+        cases = grid_cases(num_passes=[30, 5], altitude=[100.0], noise_std=[1.0])
+        serial = SurveySweep(world, workers=1).run(cases)
+        parallel = SurveySweep(world, workers=2).run(cases)
+
+        for key in serial:
+            np.testing.assert_array_equal(serial[key], parallel[key])
+        dense, sparse = serial["rmse"]
+
+        # The flown samples and grids come back without flying again
+        table, data = SurveySweep(world, workers=2).run_with_data(cases)
+        self.assertEqual(list(table), list(serial))
+        self.assertEqual([survey.x.size for survey in data], list(serial["n_samples"]))
+        self.assertEqual(data[0].grid_z.shape, data[1].grid_z.shape)
+        self.assertLess(dense, sparse)
+        self.assertGreaterEqual(serial["coverage_fraction"][0], serial["coverage_fraction"][1])
+        self.assertLess(serial["resolved_wavelength"][0], serial["resolved_wavelength"][1])
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "sweep.csv")
+            write_csv(serial, path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0].split(","), list(serial))
+        self.assertEqual(len(lines), 3)
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=2000.0, height=2000.0, resolution=10.0, seed=1))
+
+    def test_deterministic_order_and_rates(self):
+        calls = []
+        scheduler = Scheduler(tick=0.1)
+        scheduler.add("physics", lambda t, dt: calls.append(("physics", round(t, 6), dt)), rate=10.0, order=30)
+        scheduler.add("decide", lambda t, dt: calls.append(("decide", round(t, 6), dt)), rate=1.0, order=20)
+        scheduler.add("sense", lambda t, dt: calls.append(("sense", round(t, 6), dt)), period=0.5, order=0)
+        scheduler.run(duration=1.0)
+
+        self.assertEqual(calls[:3], [("sense", 0.0, 0.5), ("decide", 0.0, 1.0), ("physics", 0.0, 0.1)])
+        self.assertEqual(calls[3], ("physics", 0.1, 0.1))
+        stats = scheduler.stats()
+        self.assertEqual(list(stats), ["sense", "decide", "physics"])
+        self.assertEqual([stats[n]["runs"] for n in stats], [2, 1, 10])
+        self.assertEqual(stats["decide"]["skipped"], 9)
+        with self.assertRaises(ValueError):
+            scheduler.add("bad", lambda t, dt: None, period=0.25)
+
+    def test_single_rate_agent_matches_update_loop(self):
+        variance = lambda t: 10.0 if 5.0 < t < 15.0 else 0.1
+        reference = make_agent()
+        for step in range(60):
+            reference.update(0.5, external_gps_variance=variance(step * 0.5))
+
+        agent = make_agent()
+        scheduler = Scheduler(tick=0.5)
+        schedule_agent(scheduler, agent, gps_variance=variance)
+        scheduler.run(duration=30.0)
+
+        self.assertEqual(agent.time, reference.time)
+        self.assertEqual(agent.aircraft.state, reference.aircraft.state)
+
+    def test_multi_rate_agent_and_sensor(self):
+        agent = make_agent()
+        scheduler = Scheduler(tick=0.02)
+        schedule_agent(scheduler, agent, physics_rate=50.0, sense_rate=5.0, estimate_rate=10.0, decide_rate=1.0)
+        sensor = SensorRecorder(Magnetometer(noise_std=0.0), self.world, agent.aircraft, capacity=16)
+        sensor.schedule(scheduler, rate=50.0)
+        scheduler.run(duration=10.0)
+
+        runs = {name: s["runs"] for name, s in scheduler.stats().items()}
+        self.assertEqual(runs, {"agent.sense": 50, "agent.estimate": 100, "agent.decide": 10,
+                                "agent.act": 500, "magnetometer": 500})
+        self.assertAlmostEqual(agent.time, 10.0)
+        np.testing.assert_allclose(sensor.t, 0.02 * np.arange(1, 501))
+        self.assertAlmostEqual(sensor.y[-1], agent.aircraft.state.y)
+        np.testing.assert_allclose(sensor.values, self.world.get_magnetic_field_batch(sensor.x, sensor.y, sensor.z))
+
+    def test_navigation_held_between_commands(self):
+        nav = WaypointNavigator([(0.0, 1000.0, 100.0), (1000.0, 1000.0, 100.0)], speed=50.0,
+                                acceptance_radius=20.0)
+        aircraft = Aircraft(State(z=100.0))
+        scheduler = Scheduler(tick=0.05)
+        schedule_navigation(scheduler, aircraft, nav, physics_rate=20.0, command_rate=2.0)
+        scheduler.run(duration=60.0, until=lambda: nav.finished)
+
+        self.assertTrue(nav.finished)
+        self.assertLess(np.hypot(aircraft.state.x - 1000.0, aircraft.state.y - 1000.0), 50.0)
+
+if __name__ == '__main__':
+    unittest.main()
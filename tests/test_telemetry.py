@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+import numpy as np
+from src.core.telemetry import RingBuffer, TelemetryRecorder, EventLevel, NULL_TELEMETRY, load_telemetry
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_ring_buffer_keeps_latest_rows_in_order(self):
+        buffer = RingBuffer([("t", float), ("mode", "U8")], capacity=4)
+        for i in range(6):
+            buffer.append((i, "GPS" if i % 2 else "MAG_NAV"))
+
+        self.assertEqual(len(buffer), 4)
+        arrays = buffer.arrays()
+        np.testing.assert_array_equal(arrays["t"], [2, 3, 4, 5])
+        self.assertEqual(list(arrays["mode"]), ["MAG_NAV", "GPS", "MAG_NAV", "GPS"])
+
+    def test_events_are_rate_limited_and_deduplicated(self):
+        recorder = TelemetryRecorder(min_interval=10.0)
+        # A 25 s episode longer than min_interval, a 15 s gap, then a short one
+        times = np.concatenate([np.arange(0.0, 25.0, 0.5), [40.0, 45.0]])
+        logged = [recorder.event(t, "gps_degraded", "GPS variance high", EventLevel.WARNING) for t in times]
+        recorder.event(3.0, "mode_switch", "to MAG_NAV", min_interval=0.0)
+        recorder.event(3.0, "mode_switch", "to GPS", min_interval=0.0)
+
+        self.assertEqual(sum(logged), 2) # t = 0 and 40
+        alerts = [e for e in recorder.events if e.kind == "gps_degraded"]
+        self.assertEqual([e.count for e in alerts], [50, 2])
+        self.assertEqual([(e.t, e.last_t) for e in alerts], [(0.0, 24.5), (40.0, 45.0)])
+        self.assertEqual([e.message for e in recorder.events if e.kind == "mode_switch"], ["to MAG_NAV", "to GPS"])
+
+    def test_chunked_flush_round_trip(self):
+        with tempfile.TemporaryDirectory() as root:
+            with TelemetryRecorder(root, capacity=16) as recorder:
+                recorder.channel("state", [("t", float), ("x", float)])
+                recorder.channel("mode", [("t", float), ("mode", "U16")])
+                for i in range(50):
+                    recorder.record("state", i * 0.5, 2.0 * i)
+                recorder.record("mode", 0.0, "GPS")
+                recorder.event(1.0, "gps_degraded", "GPS variance high", EventLevel.WARNING, variance=10.0)
+
+            run = load_telemetry(root)
+            state = run.channel("state")
+            np.testing.assert_array_equal(state["x"], 2.0 * np.arange(50))
+            self.assertEqual(list(run.channel("mode")["mode"]), ["GPS"])
+            self.assertEqual(sorted(run.channel_names), ["mode", "state"])
+            events = run.event_list()
+            self.assertEqual(len(events), 1)
+            self.assertEqual((events[0].level, events[0].data), (EventLevel.WARNING, {"variance": 10.0}))
+
+    def test_reused_directory_reads_only_the_latest_run(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rows in (50, 10):
+                with TelemetryRecorder(root, capacity=16) as recorder:
+                    recorder.channel("state", [("t", float), ("x", float)])
+                    for i in range(rows):
+                        recorder.record("state", i * 0.5, float(rows))
+
+            state = load_telemetry(root).channel("state")
+            np.testing.assert_array_equal(state["x"], np.full(10, 10.0))
+
+    def test_null_telemetry_discards(self):
+        NULL_TELEMETRY.channel("state", [("t", float)])
+        NULL_TELEMETRY.record("state", 1.0)
+        self.assertFalse(NULL_TELEMETRY.event(0.0, "x", "y"))
+        self.assertEqual(NULL_TELEMETRY.events, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from src.vehicle.aircraft import Aircraft, State
+from src.vehicle.fleet import AircraftFleet
+
+class TestAircraftFleet(unittest.TestCase):
+
+    def test_matches_individual_aircraft(self):
+        states = [State(x=10.0 * i, y=-5.0 * i, z=50.0 + i, psi=0.1 * i, v=40.0) for i in range(5)]
+        fleet = AircraftFleet.from_states(states)
+        aircraft = [Aircraft(State(**vars(s))) for s in states]
+
+        speeds = np.linspace(30.0, 70.0, 5)
+        headings = np.linspace(-1.0, 2.0, 5)
+        altitudes = np.full(5, 120.0)
+        for _ in range(20):
+            fleet.update(0.5, speeds, headings, altitudes)
+            for a, s, h, alt in zip(aircraft, speeds, headings, altitudes):
+                a.update(0.5, s, h, alt)
+
+        for i, a in enumerate(aircraft):
+            np.testing.assert_allclose(fleet.get_positions()[i], a.get_position())
+            self.assertAlmostEqual(fleet[i].psi, a.state.psi)
+
+    def test_state_view_reads_and_writes_arrays(self):
+        fleet = AircraftFleet(3)
+        view = fleet[-1]
+        view.x = 42.0
+        self.assertEqual(fleet.x[2], 42.0)
+        fleet.update(1.0, 10.0, 0.0, 0.0)
+        self.assertEqual(view.y, 10.0)
+        self.assertEqual(view.copy().v, 10.0)
+        with self.assertRaises(IndexError):
+            fleet[3]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from src.world.environment import World, MapConfig
+from src.world.continuation import LayerCache, SpectralContinuation, TiledContinuation
+from src.world.store import MapStore
+from src.world.tiled import TiledWorld
+from src.world import shared as shared_module
+from src.world.shared import SharedWorld, attach_world, detach_world
+
+class TestWorldFieldQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(MapConfig(width=500.0, height=400.0, resolution=10.0, seed=1))
+
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(0)
+        xs = rng.uniform(-50.0, 550.0, 200)
+        ys = rng.uniform(-50.0, 450.0, 200)
+        zs = rng.choice([0.0, 30.0], 200)
+
+        batch = self.world.get_magnetic_field_batch(xs, ys, zs)
+        scalar = [self.world.get_magnetic_field(x, y, z) for x, y, z in zip(xs, ys, zs)]
+
+        np.testing.assert_allclose(batch, scalar)
+
+    def test_pixel_centres_and_interpolation(self):
+        m = self.world.magnetic_map
+        # Pixel centres reproduce the map exactly
+        self.assertAlmostEqual(self.world.get_magnetic_field(15.0, 25.0, 0.0), m[2, 1])
+        # Halfway between two centres is their mean
+        self.assertAlmostEqual(self.world.get_magnetic_field(20.0, 25.0, 0.0), 0.5 * (m[2, 1] + m[2, 2]))
+
+    def test_out_of_bounds_returns_background(self):
+        vals = self.world.get_magnetic_field_batch([-1.0, 10.0, 500.0], [10.0, 400.0, 10.0], 0.0)
+        np.testing.assert_array_equal(vals, self.world.background_field)
+
+class TestContinuation(unittest.TestCase):
+
+    def test_spectral_continuation_attenuates_wavelength(self):
+        # A single plane wave decays as exp(-k h) under upward continuation
+        res, wavelength, height = 10.0, 400.0, 50.0
+        x = (np.arange(256) + 0.5) * res
+        grid = np.tile(100.0 * np.sin(2 * np.pi * x / wavelength), (64, 1))
+        layer = SpectralContinuation(grid, res).layer(height)
+
+        expected = grid * np.exp(-2 * np.pi / wavelength * height)
+        np.testing.assert_allclose(layer[:, 64:192], expected[:, 64:192], atol=1.0)
+
+    def test_layer_cache_evicts_least_recently_used(self):
+        layer = np.zeros((10, 10))
+        cache = LayerCache(max_bytes=2 * layer.nbytes)
+        cache.put(1, layer)
+        cache.put(2, layer.copy())
+        cache.get(1)
+        cache.put(3, layer.copy())
+
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.evictions), (1, 1))
+        self.assertEqual(stats.current_bytes, 2 * layer.nbytes)
+
+    def test_world_layer_cache_budget(self):
+        world = World(MapConfig(width=200.0, height=200.0, resolution=10.0, seed=2,
+                                layer_cache_bytes=2 * 20 * 20 * 8))
+        for z in [10.0, 20.0, 30.0, 10.0]:
+            world.get_magnetic_field(100.0, 100.0, z)
+        stats = world.layer_cache_stats
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.evictions, 2)
+
+    def test_tiled_continuation_matches_full_map(self):
+        config = MapConfig(width=1280.0, height=1280.0, resolution=10.0, seed=3)
+        full = World(config)
+        tiled = World(MapConfig(width=1280.0, height=1280.0, resolution=10.0, seed=3, tile_size=32))
+
+        rng = np.random.default_rng(1)
+        xs = rng.uniform(300.0, 980.0, 500)
+        ys = rng.uniform(300.0, 980.0, 500)
+        expected = full.get_magnetic_field_batch(xs, ys, 100.0)
+        actual = tiled.get_magnetic_field_batch(xs, ys, 100.0)
+
+        anomaly_scale = np.std(full.magnetic_map)
+        self.assertLess(np.max(np.abs(actual - expected)), 0.05 * anomaly_scale)
+        # Only the tiles under the queried region were computed
+        self.assertLess(tiled.layer_cache_stats.entries, 16 * 16)
+
+    def test_tiled_prefetch_along_heading(self):
+        world = World(MapConfig(width=1280.0, height=1280.0, resolution=10.0, seed=3, tile_size=32))
+        futures = world.prefetch_along(100.0, 100.0, 0.0, 50.0, distance=800.0)
+        for future in futures:
+            future.result()
+        self.assertEqual(world.layer_cache_stats.entries, len(futures))
+        self.assertGreater(len(futures), 0)
+
+        world.get_magnetic_field(100.0, 500.0, 50.0)
+        self.assertEqual(world.layer_cache_stats.entries, len(futures))
+
+    def test_tile_cost_does_not_grow_with_height(self):
+        world = World(MapConfig(width=5120.0, height=5120.0, resolution=10.0, seed=3))
+        engine = TiledContinuation(world.magnetic_map, 10.0, tile_size=128)
+        # The per-tile FFT window is the tile plus a fixed halo at any height
+        self.assertEqual(engine.halo_for(30.0), engine.halo_for(3000.0))
+        self.assertLess(engine.halo_for(3000.0), engine.tile_size // 2)
+
+        anomaly_scale = np.std(world.magnetic_map)
+        full = SpectralContinuation(world.magnetic_map, 10.0)
+        for height in (30.0, 300.0, 1000.0, 3000.0):
+            expected = full.layer(height)[128:256, 256:384]
+            np.testing.assert_allclose(engine.tile(height, 1, 2), expected, atol=0.02 * anomaly_scale)
+
+    def test_tile_after_shutdown_with_queued_prefetches(self):
+        grid = np.random.default_rng(0).normal(size=(256, 256))
+        engine = TiledContinuation(grid, 10.0, tile_size=32)
+        tiles = [(ty, tx) for ty in range(8) for tx in range(8)]
+        futures = engine.prefetch(50.0, tiles)
+        engine.shutdown()
+
+        cancelled = [key for key, future in zip(tiles, futures) if future.cancelled()]
+        self.assertGreater(len(cancelled), 0)
+        self.assertEqual(engine._pending, {})
+        # A cancelled prefetch is a cache miss, computed on demand
+        ty, tx = cancelled[-1]
+        np.testing.assert_array_equal(engine.tile(50.0, ty, tx), engine._compute_tile(50.0, ty, tx))
+
+    def test_public_layer_access(self):
+        world = World(MapConfig(width=400.0, height=300.0, resolution=10.0, seed=9))
+        self.assertIs(world.layer(-5.0), world.magnetic_map)
+        self.assertIs(world.layer(96.0), world.layer(100.0))
+        self.assertEqual(world.layer_altitude(96.0), 100.0)
+
+        pinned = np.zeros_like(world.magnetic_map)
+        world.pin_layer(104.0, pinned)
+        self.assertIs(world.layer(100.0), pinned)
+        world.clear_layers()
+        self.assertIsNot(world.layer(100.0), pinned)
+        self.assertEqual(world.layer_cache_stats.entries, 1)
+
+class TestMapGeneration(unittest.TestCase):
+
+    def test_spectral_generator_is_deterministic(self):
+        config = MapConfig(width=2000.0, height=1500.0, resolution=10.0, seed=7, generator="spectral")
+        a = World(config).magnetic_map
+        b = World(config).magnetic_map
+        c = World(MapConfig(width=2000.0, height=1500.0, resolution=10.0, seed=8, generator="spectral")).magnetic_map
+
+        np.testing.assert_array_equal(a, b)
+        self.assertFalse(np.array_equal(a, c))
+        self.assertEqual(a.shape, (150, 200))
+
+    def test_spectral_generator_statistics(self):
+        world = World(MapConfig(width=20000.0, height=20000.0, resolution=10.0, seed=5,
+                                generator="spectral", dtype="float32"))
+        expected_std = np.sqrt(sum(a**2 for _, a in World.ANOMALY_SCALES))
+
+        self.assertEqual(world.magnetic_map.dtype, np.float32)
+        self.assertAlmostEqual(float(world.magnetic_map.mean()), world.background_field, delta=1.0)
+        self.assertAlmostEqual(float(world.magnetic_map.std()), expected_std, delta=0.1 * expected_std)
+
+class TestMapStore(unittest.TestCase):
+
+    def test_world_reloads_map_and_layers_memory_mapped(self):
+        config = MapConfig(width=300.0, height=200.0, resolution=10.0, seed=11)
+        with tempfile.TemporaryDirectory() as root:
+            store = MapStore(root)
+            first = World(config, store=store)
+            expected = first.get_magnetic_field_batch([55.0, 120.0], [40.0, 80.0], 50.0)
+
+            second = World(config, store=store)
+            self.assertIsInstance(second.magnetic_map, np.memmap)
+            np.testing.assert_array_equal(second.magnetic_map, first.magnetic_map)
+            np.testing.assert_array_equal(second.get_magnetic_field_batch([55.0, 120.0], [40.0, 80.0], 50.0), expected)
+            self.assertIsInstance(second.layer(50.0), np.memmap)
+
+    def test_key_depends_on_map_fields_only(self):
+        base = MapConfig(width=300.0, height=200.0, resolution=10.0, seed=11)
+        with tempfile.TemporaryDirectory() as root:
+            store = MapStore(root)
+            self.assertEqual(store.key(base), store.key(MapConfig(300.0, 200.0, 10.0, seed=11, layer_cache_bytes=1)))
+            self.assertNotEqual(store.key(base), store.key(MapConfig(300.0, 200.0, 10.0, seed=12)))
+            self.assertNotEqual(store.key(base), store.key(MapConfig(300.0, 200.0, 10.0, seed=11, generator="spectral")))
+
+class TestTiledWorld(unittest.TestCase):
+
+    def test_matches_in_memory_world_across_tile_boundaries(self):
+        world = World(MapConfig(width=700.0, height=500.0, resolution=10.0, seed=4))
+        with tempfile.TemporaryDirectory() as root:
+            # Room for four tiles only, so tiles are evicted and reloaded
+            tiled = TiledWorld.from_world(root, world, tile_size=16, tile_cache_bytes=16 * 16 * 8 * 4)
+
+            self.assertEqual(tiled.get_map_bounds(), world.get_map_bounds())
+            rng = np.random.default_rng(2)
+            xs = rng.uniform(-20.0, 720.0, 1000)
+            ys = rng.uniform(-20.0, 520.0, 1000)
+            np.testing.assert_allclose(tiled.get_magnetic_field_batch(xs, ys, 0.0),
+                                       world.get_magnetic_field_batch(xs, ys, 0.0))
+            # Exactly on a tile seam (pixel 15 / 16 boundary)
+            self.assertAlmostEqual(tiled.get_magnetic_field(160.0, 55.0, 0.0),
+                                   world.get_magnetic_field(160.0, 55.0, 0.0))
+            stats = tiled.magnetic_map.cache.stats
+            self.assertLessEqual(stats.current_bytes, stats.max_bytes)
+            self.assertGreater(stats.evictions, 0)
+
+    def test_has_the_same_state_as_world(self):
+        world = World(MapConfig(width=100.0, height=100.0, resolution=10.0, seed=4))
+        with tempfile.TemporaryDirectory() as root:
+            tiled = TiledWorld.from_world(root, world, tile_size=8)
+            self.assertEqual(set(vars(tiled)) - {"root"}, set(vars(world)))
+
+    def test_reopen_and_continue(self):
+        world = World(MapConfig(width=640.0, height=640.0, resolution=10.0, seed=4))
+        with tempfile.TemporaryDirectory() as root:
+            TiledWorld.from_world(root, world, tile_size=32)
+            reopened = TiledWorld(root)
+            value = reopened.get_magnetic_field(320.0, 320.0, 30.0)
+            self.assertAlmostEqual(value, world.get_magnetic_field(320.0, 320.0, 30.0), delta=0.05 * np.std(world.magnetic_map))
+
+def _remote_field(handle, xs, ys, z):
+    world = attach_world(handle)
+    try:
+        return world.get_magnetic_field_batch(xs, ys, z), world.layer_cache_stats.misses
+    finally:
+        detach_world(world)
+
+class TestSharedWorld(unittest.TestCase):
+
+    def test_workers_attach_without_copying(self):
+        world = World(MapConfig(width=400.0, height=300.0, resolution=10.0, seed=9))
+        xs = np.linspace(5.0, 395.0, 40)
+        ys = np.linspace(5.0, 295.0, 40)
+        expected = world.get_magnetic_field_batch(xs, ys, 100.0)
+
+        with SharedWorld(world, altitudes=[100.0]) as shared:
+            attached = attach_world(shared.handle)
+            self.assertFalse(attached.magnetic_map.flags.writeable)
+            self.assertFalse(attached.magnetic_map.flags.owndata)
+            np.testing.assert_array_equal(attached.magnetic_map, world.magnetic_map)
+            detach_world(attached)
+
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                values, misses = pool.submit(_remote_field, shared.handle, xs, ys, 100.0).result()
+            np.testing.assert_allclose(values, expected)
+            # The published layer was used instead of continuing locally
+            self.assertEqual(misses, 0)
+            name = shared.handle.base.name
+            # The worker exiting did not unlink the owner's segments
+            shared_memory.SharedMemory(name=name).close()
+
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_detach_with_views_still_referenced(self):
+        world = World(MapConfig(width=400.0, height=300.0, resolution=10.0, seed=9))
+        with SharedWorld(world, altitudes=[100.0]) as shared:
+            attached = attach_world(shared.handle)
+            held = attached.layer(100.0)[:5]
+            detach_world(attached)
+            self.assertIsNone(attached.magnetic_map)
+            # The held view stays valid; its segment is closed once released
+            np.testing.assert_array_equal(held, np.asarray(world.layer(100.0))[:5])
+            self.assertEqual(len(shared_module._unclosed), 1)
+            del held
+            detach_world(attach_world(shared.handle))
+            self.assertEqual(shared_module._unclosed, [])
+
+if __name__ == '__main__':
+    unittest.main()